@@ -1,6 +1,12 @@
 """
 应用初始化模块
 """
-from app.main import app
+__all__ = ['app']
 
-__all__ = ['app']
\ No newline at end of file
+
+def __getattr__(name):
+    """按需导入 FastAPI 应用：多进程工作进程导入 app 子模块时不会创建服务和加载模型"""
+    if name == "app":
+        from app.main import app
+        return app
+    raise AttributeError(f"module 'app' has no attribute '{name}'")
\ No newline at end of file
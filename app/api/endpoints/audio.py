@@ -4,7 +4,7 @@
 from fastapi import APIRouter
 from app.models.schemas import DeviceRequest
 from app.services.audio import audio_service
-from app.services.transcription import transcription_service
+from app.services.session import session_manager
 
 router = APIRouter()
 
@@ -29,7 +29,7 @@ def select_audio_device(request: DeviceRequest):
     Returns:
         操作状态和消息
     """
-    if transcription_service.running:
+    if session_manager.any_running():
         return {"status": "error", "message": "请先停止转写再切换音频设备"}
     
     return audio_service.select_device(request.device_id)
\ No newline at end of file
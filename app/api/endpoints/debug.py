@@ -0,0 +1,71 @@
+"""
+调试相关的API端点 - 流水线追踪
+"""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.models.schemas import TracingConfigRequest
+from app.services.tracing import tracer, chrome_trace, folded_stacks, summarize
+
+router = APIRouter()
+
+# 追踪的导出格式
+TRACE_FORMATS = ("json", "chrome", "folded")
+
+
+@router.get('/debug/traces')
+def get_traces(format: str = "json", session_id: str = None, limit: int = 50):
+    """
+    获取最近的流水线追踪
+
+    Args:
+        format: json 为步骤树和按路径的耗时汇总；chrome 为 Chrome trace JSON
+            （chrome://tracing 或 Perfetto 打开）；folded 为折叠调用栈（flamegraph.pl / speedscope）
+        session_id: 只返回该会话的追踪，默认为全部会话
+        limit: 最多返回最近的多少个追踪
+
+    Returns:
+        追踪数据
+    """
+    if format not in TRACE_FORMATS:
+        return {"status": "error", "message": f"不支持的格式: {format}，可选: {', '.join(TRACE_FORMATS)}"}
+    traces = tracer.traces(session_id, max(limit, 0))
+    if format == "chrome":
+        return chrome_trace(traces)
+    if format == "folded":
+        return PlainTextResponse(folded_stacks(traces))
+    return {
+        "status": "success",
+        "tracing": tracer.settings(),
+        "summary": summarize(traces),
+        "traces": [trace.snapshot() for trace in reversed(traces)],
+    }
+
+
+@router.post('/debug/traces/config')
+def configure_tracing(request: TracingConfigRequest):
+    """
+    调整追踪设置（运行时生效，未给出的字段保持不变）
+
+    Args:
+        request: 是否启用、采样率和缓冲区大小
+
+    Returns:
+        操作状态和当前设置
+    """
+    try:
+        tracer.configure(request.enabled, request.sample_rate, request.buffer_size)
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+    return {"status": "success", "message": "追踪设置已更新", "tracing": tracer.settings()}
+
+
+@router.delete('/debug/traces')
+def clear_traces():
+    """
+    清空已保存的追踪
+
+    Returns:
+        操作状态
+    """
+    tracer.clear()
+    return {"status": "success", "message": "已清空追踪"}
@@ -0,0 +1,162 @@
+"""
+文件转写任务相关的API端点
+"""
+import asyncio
+import os
+from urllib.parse import quote
+from fastapi import APIRouter, Request
+from starlette.requests import ClientDisconnect
+from fastapi.responses import PlainTextResponse
+from app.config import JOB_CONFIG
+from app.services.jobs import job_manager, AUDIO_EXTENSIONS, RESULT_FORMATS
+
+router = APIRouter()
+
+# 字幕结果的响应类型
+SUBTITLE_MEDIA_TYPES = {"srt": "application/x-subrip", "vtt": "text/vtt"}
+
+
+def job_not_found(job_id):
+    """构造任务不存在的错误响应"""
+    return {"status": "error", "message": f"任务不存在: {job_id}"}
+
+
+async def save_upload(request, path, limit):
+    """
+    把请求体边接收边写入文件，文件读写在线程中执行，不阻塞事件循环
+
+    Args:
+        request: 请求对象
+        path: 写入路径
+        limit: 大小上限（字节），超过后停止写入
+
+    Returns:
+        int: 已接收的字节数（超过上限时大于 limit）
+
+    Raises:
+        ClientDisconnect: 上传中途客户端断开
+    """
+    size = 0
+    f = await asyncio.to_thread(open, path, "wb")
+    try:
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > limit:
+                break
+            await asyncio.to_thread(f.write, chunk)
+    finally:
+        await asyncio.to_thread(f.close)
+    return size
+
+
+@router.post('/api/jobs')
+async def create_job(request: Request, filename: str, language: str = None):
+    """
+    上传录音文件并创建转写任务
+
+    请求体为音频文件的原始字节（如 curl --data-binary @meeting.mp3），
+    边接收边写入磁盘，不在内存中缓存整个文件。
+
+    Args:
+        request: 请求对象，请求体为音频文件
+        filename: 原始文件名，扩展名须为 .wav/.flac/.mp3
+        language: 转写语言，默认为 DEFAULT_LANGUAGE，auto 为自动检测
+
+    Returns:
+        操作状态和任务ID，进度和结果通过 /api/jobs/{job_id} 查询
+    """
+    if os.path.splitext(filename)[1].lower() not in AUDIO_EXTENSIONS:
+        return {"status": "error", "message": f"不支持的文件格式，仅支持: {', '.join(AUDIO_EXTENSIONS)}"}
+
+    limit = JOB_CONFIG["max_upload_mb"] * 2**20
+    path = job_manager.new_upload_path(filename)
+    try:
+        size = await save_upload(request, path, limit)
+    except ClientDisconnect:
+        # 不保留写了一半的文件
+        os.remove(path)
+        return {"status": "error", "message": "上传中断"}
+    if size == 0 or size > limit:
+        os.remove(path)
+        message = "上传的文件为空" if size == 0 else f"文件超过大小上限: {JOB_CONFIG['max_upload_mb']}MB"
+        return {"status": "error", "message": message}
+
+    job = job_manager.submit(path, filename, language)
+    return {
+        "status": "accepted",
+        "message": f"已排队: {filename}",
+        "job_id": job.job_id,
+        "job": job.snapshot()
+    }
+
+
+@router.get('/api/jobs')
+def list_jobs():
+    """
+    列出所有文件转写任务
+
+    Returns:
+        各任务的状态和进度
+    """
+    jobs = job_manager.list()
+    return {"status": "success", "count": len(jobs), "jobs": jobs}
+
+
+@router.get('/api/jobs/{job_id}')
+def get_job(job_id: str):
+    """
+    查询任务状态和进度
+
+    Args:
+        job_id: 任务ID
+
+    Returns:
+        任务阶段、进度（已处理音频占总时长的比例）和消息
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        return job_not_found(job_id)
+    return {"status": "success", "job": job.snapshot()}
+
+
+@router.get('/api/jobs/{job_id}/result')
+def get_job_result(job_id: str, format: str = "json"):
+    """
+    获取任务的转写结果
+
+    Args:
+        job_id: 任务ID
+        format: json / srt / vtt
+
+    Returns:
+        json 格式返回全文和分段，srt/vtt 返回字幕文件
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        return job_not_found(job_id)
+    if format not in RESULT_FORMATS:
+        return {"status": "error", "message": f"不支持的结果格式: {format}"}
+    if job.status != "completed":
+        return {"status": "error", "message": f"任务尚未完成: {job.status}", "job": job.snapshot()}
+    if format == "json":
+        return {"status": "success", **job.result("json")}
+    stem = os.path.splitext(job.filename)[0]
+    return PlainTextResponse(
+        job.result(format),
+        media_type=SUBTITLE_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{quote(stem)}.{format}"}
+    )
+
+
+@router.delete('/api/jobs/{job_id}')
+def cancel_job(job_id: str):
+    """
+    取消任务
+
+    Args:
+        job_id: 任务ID
+
+    Returns:
+        操作状态和消息
+    """
+    return job_manager.cancel(job_id)
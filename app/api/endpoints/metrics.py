@@ -0,0 +1,56 @@
+"""
+Prometheus 指标导出端点
+"""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.config import SAMPLE_RATE
+from app.services.prometheus import registry, CONTENT_TYPE
+from app.services.session import session_manager
+
+router = APIRouter()
+
+# 瞬时值的标签：模型、语言和会话
+GAUGE_LABELS = ("model", "language", "session")
+
+
+def _per_session(value):
+    """
+    构造按会话采集瞬时值的函数
+
+    Args:
+        value: 以会话为参数、返回数值的函数
+
+    Returns:
+        callable: 返回 [(标签值元组, 数值), ...]
+    """
+    def collect():
+        return [
+            ((*session._metric_labels(), session.session_id), value(session))
+            for session in session_manager.sessions()
+        ]
+    return collect
+
+
+registry.gauge(
+    "whisprrt_decode_queue_depth", "待解码窗口队列的当前深度", GAUGE_LABELS,
+    _per_session(lambda session: len(session.decode_queue))
+)
+registry.gauge(
+    "whisprrt_capture_buffer_seconds", "采集缓冲区中尚未切窗的音频时长", GAUGE_LABELS,
+    _per_session(lambda session: round(len(session.buffer) / SAMPLE_RATE, 3))
+)
+registry.gauge(
+    "whisprrt_websocket_clients", "已连接的 WebSocket 客户端数", GAUGE_LABELS,
+    _per_session(lambda session: len(session.broadcaster))
+)
+
+
+@router.get('/metrics')
+def get_prometheus_metrics():
+    """
+    以 Prometheus 文本格式导出转写热路径的指标
+
+    Returns:
+        Prometheus 文本格式的指标
+    """
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,77 @@
+"""
+转写会话相关的API端点
+"""
+from fastapi import APIRouter
+from app.models.schemas import SessionRequest
+from app.services.session import session_manager, session_not_found
+
+router = APIRouter()
+
+@router.post('/sessions')
+def create_session(request: SessionRequest):
+    """
+    创建转写会话
+
+    Args:
+        request: 会话的语言、输入设备、流式模式、推测式转写、推理配置档和检测阈值，未指定的项使用默认配置
+
+    Returns:
+        操作状态和新会话信息（包含 session_id）
+    """
+    thresholds = {
+        key: value for key, value in {
+            "confidence_threshold": request.confidence_threshold,
+            "energy_threshold": request.energy_threshold,
+            "silence_threshold": request.silence_threshold,
+            "zcr_threshold": request.zcr_threshold,
+        }.items() if value is not None
+    }
+    return session_manager.create(
+        language=request.language,
+        device=request.device_id,
+        streaming=request.streaming,
+        thresholds=thresholds,
+        endpointing=request.endpointing,
+        profile=request.profile,
+        speculative=request.speculative
+    )
+
+@router.get('/sessions')
+def list_sessions():
+    """
+    列出所有转写会话
+
+    Returns:
+        各会话的概要信息
+    """
+    sessions = session_manager.list()
+    return {"status": "success", "count": len(sessions), "sessions": sessions}
+
+@router.get('/sessions/{session_id}')
+def get_session(session_id: str):
+    """
+    获取转写会话信息
+
+    Args:
+        session_id: 会话ID
+
+    Returns:
+        会话概要信息
+    """
+    session = session_manager.get(session_id)
+    if session is None:
+        return session_not_found(session_id)
+    return {"status": "success", "session": session.info()}
+
+@router.delete('/sessions/{session_id}')
+async def delete_session(session_id: str):
+    """
+    停止并删除转写会话
+
+    Args:
+        session_id: 会话ID
+
+    Returns:
+        操作状态和消息
+    """
+    return await session_manager.remove(session_id)
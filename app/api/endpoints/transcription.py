@@ -1,13 +1,22 @@
 """
 转写相关的API端点
 """
+import asyncio
 from fastapi import APIRouter
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
-from app.models.schemas import ModelRequest, LanguageRequest, TimestampRequest
-from app.services.transcription import transcription_service
+from app.models.schemas import (
+    ModelRequest, LanguageRequest, TimestampRequest, StreamingRequest, EndpointingRequest, OverloadPolicyRequest,
+    HallucinationPatternsRequest, ProfileRequest, SpeculativeRequest
+)
+from app.services.session import session_manager, session_not_found
 from app.services.whisper import whisper_service
-from app.config import AVAILABLE_MODELS, ANTI_HALLUCINATION_CONFIG, HALLUCINATION_PATTERNS
+from app.services.transcript_store import transcript_store, parse_timestamp
+from app.services.hallucination import hallucination_filter
+from app.services.profiles import inference_profiles
+from app.config import (
+    AVAILABLE_MODELS, ANTI_HALLUCINATION_CONFIG, HALLUCINATION_PATTERNS, DEFAULT_SESSION_ID, TRANSCRIPT_STORE_CONFIG
+)
 
 router = APIRouter()
 
@@ -21,83 +30,256 @@ class AntiHallucinationConfigRequest(BaseModel):
 
 @router.get('/models')
 def get_models():
-    """返回可用的模型列表"""
+    """返回可用的模型列表，以及缓存中常驻的模型和各自占用的内存"""
     return {
         "models": AVAILABLE_MODELS,
-        "current": whisper_service.model_name
+        "current": whisper_service.model_name,
+        "cache": whisper_service.cache.snapshot()
     }
 
 @router.post('/change_model')
 def change_model(request: ModelRequest):
     """
-    切换Whisper模型
+    切换Whisper模型（后台加载预热后热切换，转写不中断）
     
     Args:
         request: 包含模型名称的请求对象
     
     Returns:
-        操作状态和消息
+        操作状态和切换任务ID，进度通过 /change_model/{job_id} 查询
     """
     model_name = request.model
     
     if model_name not in AVAILABLE_MODELS:
         return {"status": "error", "message": f"不支持的模型: {model_name}"}
     
-    if transcription_service.running:
-        return {"status": "error", "message": "请先停止转写再切换模型"}
+    return whisper_service.swap_model(model_name)
+
+@router.get('/change_model/{job_id}')
+def get_change_model_job(job_id: str):
+    """
+    查询模型切换任务进度
     
-    try:
-        whisper_service.load_model(model_name)
-        return {"status": "success", "message": f"已切换到模型: {model_name}"}
-    except Exception as e:
-        return {"status": "error", "message": f"切换模型失败: {str(e)}"}
+    Args:
+        job_id: /change_model 返回的任务ID
+    
+    Returns:
+        任务阶段、进度和消息
+    """
+    job = whisper_service.get_swap_job(job_id)
+    if job is None:
+        return {"status": "error", "message": f"切换任务不存在: {job_id}"}
+    return {"status": "success", "job": job.snapshot()}
 
 @router.post('/change_language')
-def change_language(request: LanguageRequest):
+def change_language(request: LanguageRequest, session_id: str = DEFAULT_SESSION_ID):
     """
     切换转写语言
     
     Args:
         request: 包含语言代码的请求对象
+        session_id: 会话ID，默认为默认会话
+    
+    Returns:
+        操作状态和消息
+    """
+    session = session_manager.get(session_id)
+    if session is None:
+        return session_not_found(session_id)
+    return session.set_language(request.language)
+
+@router.post('/change_streaming_mode')
+def change_streaming_mode(request: StreamingRequest, session_id: str = DEFAULT_SESSION_ID):
+    """
+    切换流式转写模式（滑动窗口 + 部分结果）
+    
+    Args:
+        request: 包含是否启用流式模式的请求对象
+        session_id: 会话ID，默认为默认会话
+    
+    Returns:
+        操作状态和消息
+    """
+    session = session_manager.get(session_id)
+    if session is None:
+        return session_not_found(session_id)
+    return session.set_streaming(request.enabled)
+
+@router.post('/change_endpointing_mode')
+def change_endpointing_mode(request: EndpointingRequest, session_id: str = DEFAULT_SESSION_ID):
+    """
+    切换端点检测分段（固定窗口模式下按语音边界切分，代替固定时长窗口）
+    
+    Args:
+        request: 包含是否启用端点检测的请求对象
+        session_id: 会话ID，默认为默认会话
+    
+    Returns:
+        操作状态和消息
+    """
+    session = session_manager.get(session_id)
+    if session is None:
+        return session_not_found(session_id)
+    return session.set_endpointing(request.enabled)
+
+@router.post('/change_speculative_mode')
+def change_speculative_mode(request: SpeculativeRequest, session_id: str = DEFAULT_SESSION_ID):
+    """
+    切换推测式双模型转写（固定窗口模式下草稿模型先推送 draft 事件，当前模型校正后推送 correction 事件）
+    
+    Args:
+        request: 包含是否启用推测式转写的请求对象
+        session_id: 会话ID，默认为默认会话
     
     Returns:
         操作状态和消息
     """
-    return transcription_service.set_language(request.language)
+    session = session_manager.get(session_id)
+    if session is None:
+        return session_not_found(session_id)
+    return session.set_speculative(request.enabled)
+
+@router.get('/profiles')
+def get_profiles():
+    """返回所有推理配置档（计算精度、推理线程数、beam 搜索和 VAD 参数）及默认配置档"""
+    return {"status": "success", **inference_profiles.snapshot()}
+
+@router.post('/change_profile')
+def change_profile(request: ProfileRequest, session_id: str = DEFAULT_SESSION_ID):
+    """
+    切换会话的推理配置档（转写中也可切换，从下一个窗口起生效）
+    
+    Args:
+        request: 包含配置档名称的请求对象 (low-latency / balanced / accurate 或自定义配置档)
+        session_id: 会话ID，默认为默认会话
+    
+    Returns:
+        操作状态和消息
+    """
+    session = session_manager.get(session_id)
+    if session is None:
+        return session_not_found(session_id)
+    return session.set_profile(request.profile)
+
+@router.post('/change_overload_policy')
+def change_overload_policy(request: OverloadPolicyRequest, session_id: str = DEFAULT_SESSION_ID):
+    """
+    切换解码队列过载策略
+    
+    Args:
+        request: 包含策略名称的请求对象 (drop_oldest / merge / downgrade)
+        session_id: 会话ID，默认为默认会话
+    
+    Returns:
+        操作状态和消息
+    """
+    session = session_manager.get(session_id)
+    if session is None:
+        return session_not_found(session_id)
+    return session.set_overload_policy(request.policy)
+
+@router.get('/api/metrics')
+def get_pipeline_metrics(session_id: str = DEFAULT_SESSION_ID):
+    """
+    获取流水线指标 - 各阶段队列深度和处理耗时
+
+    Args:
+        session_id: 会话ID，默认为默认会话
+
+    Returns:
+        采集、特征/VAD、解码三个阶段的指标，以及模型池负载和跨会话批处理统计
+    """
+    session = session_manager.get(session_id)
+    if session is None:
+        return session_not_found(session_id)
+    metrics = session.get_pipeline_metrics()
+    metrics["model_pool"] = whisper_service.pool.snapshot()
+    if whisper_service.batcher is not None:
+        metrics["batching"] = whisper_service.batcher.snapshot()
+    return metrics
 
 @router.get('/anti_hallucination_config')
-def get_anti_hallucination_config():
+def get_anti_hallucination_config(session_id: str = DEFAULT_SESSION_ID):
     """
     获取当前反幻觉配置
     
+    Args:
+        session_id: 会话ID，默认为默认会话
+
     Returns:
         当前的反幻觉配置参数
     """
+    session = session_manager.get(session_id)
+    if session is None:
+        return session_not_found(session_id)
     return {
         "status": "success",
         "config": {
             "temperature": ANTI_HALLUCINATION_CONFIG["temperature"],
             "no_speech_threshold": ANTI_HALLUCINATION_CONFIG["no_speech_threshold"],
-            "confidence_threshold": transcription_service.confidence_threshold,
-            "energy_threshold": transcription_service.energy_threshold,
-            "silence_threshold": transcription_service.silence_threshold,
-            "zcr_threshold": transcription_service.zcr_threshold
+            "confidence_threshold": session.confidence_threshold,
+            "energy_threshold": session.energy_threshold,
+            "silence_threshold": session.silence_threshold,
+            "zcr_threshold": session.zcr_threshold
         },
-        "hallucination_patterns": HALLUCINATION_PATTERNS
+        "hallucination_patterns": hallucination_filter.patterns
     }
 
+@router.get('/hallucination_patterns')
+def get_hallucination_patterns():
+    """
+    获取当前的幻觉模式（所有会话共用）
+
+    Returns:
+        幻觉模式列表
+    """
+    patterns = hallucination_filter.patterns
+    return {"status": "success", "count": len(patterns), "patterns": patterns}
+
+@router.post('/hallucination_patterns')
+def update_hallucination_patterns(request: HallucinationPatternsRequest):
+    """
+    替换幻觉模式，立即对所有会话生效，无需停止转写
+
+    Args:
+        request: 包含新模式列表（正则表达式）的请求对象
+
+    Returns:
+        操作状态和消息
+    """
+    try:
+        hallucination_filter.reload(request.patterns)
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+    return {"status": "success", "message": f"已加载 {len(request.patterns)} 个幻觉模式"}
+
+@router.post('/hallucination_patterns/reset')
+def reset_hallucination_patterns():
+    """
+    恢复配置文件中的默认幻觉模式
+
+    Returns:
+        操作状态和消息
+    """
+    hallucination_filter.reload(HALLUCINATION_PATTERNS)
+    return {"status": "success", "message": f"已恢复 {len(HALLUCINATION_PATTERNS)} 个默认幻觉模式"}
+
 @router.post('/update_anti_hallucination_config')
-def update_anti_hallucination_config(request: AntiHallucinationConfigRequest):
+def update_anti_hallucination_config(request: AntiHallucinationConfigRequest, session_id: str = DEFAULT_SESSION_ID):
     """
     更新反幻觉配置参数
     
     Args:
         request: 包含要更新的配置参数的请求对象
+        session_id: 会话ID，默认为默认会话
     
     Returns:
         操作状态和消息
     """
-    if transcription_service.running:
+    session = session_manager.get(session_id)
+    if session is None:
+        return session_not_found(session_id)
+    if session.running:
         return {"status": "error", "message": "请先停止转写再调整参数"}
     
     try:
@@ -106,21 +288,21 @@ def update_anti_hallucination_config(request: AntiHallucinationConfigRequest):
         # 更新转写服务的参数
         if request.confidence_threshold is not None:
             if 0.0 <= request.confidence_threshold <= 1.0:
-                transcription_service.confidence_threshold = request.confidence_threshold
+                session.confidence_threshold = request.confidence_threshold
                 updated_params.append(f"confidence_threshold={request.confidence_threshold}")
             else:
                 return {"status": "error", "message": "confidence_threshold 必须在 0.0 到 1.0 之间"}
         
         if request.energy_threshold is not None:
             if request.energy_threshold >= 0.0:
-                transcription_service.energy_threshold = request.energy_threshold
+                session.energy_threshold = request.energy_threshold
                 updated_params.append(f"energy_threshold={request.energy_threshold}")
             else:
                 return {"status": "error", "message": "energy_threshold 必须大于等于 0.0"}
         
         if request.silence_threshold is not None:
             if request.silence_threshold >= 0.0:
-                transcription_service.silence_threshold = request.silence_threshold
+                session.silence_threshold = request.silence_threshold
                 updated_params.append(f"silence_threshold={request.silence_threshold}")
             else:
                 return {"status": "error", "message": "silence_threshold 必须大于等于 0.0"}
@@ -151,14 +333,20 @@ def update_anti_hallucination_config(request: AntiHallucinationConfigRequest):
         return {"status": "error", "message": f"更新配置失败: {str(e)}"}
 
 @router.post('/reset_anti_hallucination_config')
-def reset_anti_hallucination_config():
+def reset_anti_hallucination_config(session_id: str = DEFAULT_SESSION_ID):
     """
     重置反幻觉配置为默认值
     
+    Args:
+        session_id: 会话ID，默认为默认会话
+
     Returns:
         操作状态和消息
     """
-    if transcription_service.running:
+    session = session_manager.get(session_id)
+    if session is None:
+        return session_not_found(session_id)
+    if session.running:
         return {"status": "error", "message": "请先停止转写再重置参数"}
     
     try:
@@ -180,10 +368,10 @@ def reset_anti_hallucination_config():
         ANTI_HALLUCINATION_CONFIG.update(default_config)
         
         # 更新转写服务配置
-        transcription_service.energy_threshold = default_config["energy_threshold"]
-        transcription_service.confidence_threshold = default_config["confidence_threshold"]
-        transcription_service.silence_threshold = default_config["silence_threshold"]
-        transcription_service.zcr_threshold = default_config["zcr_threshold"]
+        session.energy_threshold = default_config["energy_threshold"]
+        session.confidence_threshold = default_config["confidence_threshold"]
+        session.silence_threshold = default_config["silence_threshold"]
+        session.zcr_threshold = default_config["zcr_threshold"]
         
         return {"status": "success", "message": "反幻觉配置已重置为默认值"}
         
@@ -191,59 +379,94 @@ def reset_anti_hallucination_config():
         return {"status": "error", "message": f"重置配置失败: {str(e)}"}
 
 @router.get('/status')
-def get_status():
+def get_status(session_id: str = DEFAULT_SESSION_ID):
     """
     获取转写服务状态
 
+    Args:
+        session_id: 会话ID，默认为默认会话
+
     Returns:
         当前转写服务的运行状态
     """
+    session = session_manager.get(session_id)
+    if session is None:
+        return session_not_found(session_id)
     return {
         "status": "success",
-        "running": transcription_service.running,
+        "session_id": session.session_id,
+        "running": session.running,
         "model": whisper_service.model_name,
-        "language": transcription_service.current_language
+        "language": session.current_language,
+        "streaming": session.streaming,
+        "endpointing": session.endpointing,
+        "speculative": session.speculative,
+        "profile": session.profile.snapshot()
     }
 
 @router.get('/start')
-def start_listening():
+def start_listening(session_id: str = DEFAULT_SESSION_ID):
     """
     开始语音转写
 
+    Args:
+        session_id: 会话ID，默认为默认会话
+
     Returns:
         操作状态
     """
-    return transcription_service.start()
+    session = session_manager.get(session_id)
+    if session is None:
+        return session_not_found(session_id)
+    return session.start()
 
 @router.get('/stop')
-def stop_listening():
+def stop_listening(session_id: str = DEFAULT_SESSION_ID):
     """
     停止语音转写
     
+    Args:
+        session_id: 会话ID，默认为默认会话
+
     Returns:
         操作状态
     """
-    return transcription_service.stop()
+    session = session_manager.get(session_id)
+    if session is None:
+        return session_not_found(session_id)
+    return session.stop()
 
 @router.get('/clear')
-def clear_transcription():
+def clear_transcription(session_id: str = DEFAULT_SESSION_ID):
     """
     清空转写记录
     
+    Args:
+        session_id: 会话ID，默认为默认会话
+
     Returns:
         操作状态
     """
-    return transcription_service.clear()
+    session = session_manager.get(session_id)
+    if session is None:
+        return session_not_found(session_id)
+    return session.clear()
 
 @router.get('/save')
-def save_transcription():
+def save_transcription(session_id: str = DEFAULT_SESSION_ID):
     """
     保存转写结果
     
+    Args:
+        session_id: 会话ID，默认为默认会话
+
     Returns:
         文件下载响应
     """
-    file_path = transcription_service.save()
+    session = session_manager.get(session_id)
+    if session is None:
+        return session_not_found(session_id)
+    file_path = session.save()
     if isinstance(file_path, str):
         return FileResponse(file_path, filename="transcript_output.txt")
     return file_path
@@ -262,43 +485,134 @@ def toggle_timestamp_display(request: TimestampRequest):
     return {"status": "success", "message": f"时间戳显示已设置为: {request.show_timestamp}"}
 
 @router.post('/change_display_mode')
-def change_display_mode(request: dict):
+def change_display_mode(request: dict, session_id: str = DEFAULT_SESSION_ID):
     """
     切换显示模式
 
     Args:
         request: 包含显示模式的请求对象
+        session_id: 会话ID，默认为默认会话
 
     Returns:
         操作状态和消息
     """
+    session = session_manager.get(session_id)
+    if session is None:
+        return session_not_found(session_id)
     mode = request.get('mode')
-    return transcription_service.set_display_mode(mode)
+    return session.set_display_mode(mode)
 
-@router.get('/api/transcripts')
-def get_transcripts():
+def _session_transcript(session_id):
     """
-    获取所有转写记录 - 外部API接口
+    获取会话的转写记录；会话已不存在（如服务重启后）时从转写记录库读取
+
+    Args:
+        session_id: 会话ID
 
     Returns:
-        所有转写记录的列表
-    """
+        TranscriptLog 或 None
+    """
+    session = session_manager.get(session_id)
+    if session is not None:
+        return session.transcript
+    if transcript_store.has_session(session_id):
+        return transcript_store.open(session_id)
+    return None
+
+def _transcript_page(transcript, start=None, end=None, limit=None, offset=0):
+    """构造分页查询的响应"""
+    page = transcript.page(start, end, limit, offset)
     return {
         "status": "success",
-        "count": len(transcription_service.transcript),
-        "transcripts": transcription_service.transcript
+        "count": len(page["transcripts"]),
+        **page
     }
 
+def _transcript_delta(transcript, after, start=None, end=None, limit=None):
+    """构造增量拉取的响应"""
+    delta = transcript.since(after, start, end, limit)
+    return {
+        "status": "success",
+        "count": len(delta["transcripts"]),
+        **delta
+    }
+
+def _time_range(start, end):
+    """解析 start/end 时间参数，格式错误时抛出 ValueError"""
+    return (None if start is None else parse_timestamp(start),
+            None if end is None else parse_timestamp(end))
+
+@router.get('/api/transcripts')
+def get_transcripts(session_id: str = DEFAULT_SESSION_ID, start: str = None, end: str = None,
+                    limit: int = None, offset: int = 0, after: int = None):
+    """
+    分页获取转写记录 - 外部API接口
+
+    Args:
+        session_id: 会话ID，默认为默认会话
+        start: 起始时间（含），HH:MM:SS 或秒数，默认不限
+        end: 结束时间（不含），HH:MM:SS 或秒数，默认不限
+        limit: 每页条数，默认 TRANSCRIPT_STORE_CONFIG["page_size"]
+        offset: 跳过的条数，取上一页响应中的 next_offset
+        after: 序号游标，给出时只返回序号大于它的记录（增量拉取，忽略 offset）
+
+    Returns:
+        按音频时间排序的一页转写记录、范围内的总条数和下一页的 offset；
+        增量拉取时为按序号排序的新记录、last_id 和 has_more
+    """
+    transcript = _session_transcript(session_id)
+    if transcript is None:
+        return session_not_found(session_id)
+    try:
+        start, end = _time_range(start, end)
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+    if after is not None:
+        return _transcript_delta(transcript, after, start, end, limit)
+    return _transcript_page(transcript, start, end, limit, offset)
+
+@router.get('/api/transcripts/poll')
+async def poll_transcripts(after: int = 0, session_id: str = DEFAULT_SESSION_ID, limit: int = None,
+                           timeout: float = None):
+    """
+    长轮询获取新的转写记录 - 外部API接口
+
+    已有序号大于 after 的记录时立即返回；否则挂起，直到有新记录写入或超时（超时返回空列表）。
+
+    Args:
+        after: 客户端已收到的最大序号（上次响应的 last_id），0 为从头开始
+        session_id: 会话ID，默认为默认会话
+        limit: 每次最多返回的条数，默认 TRANSCRIPT_STORE_CONFIG["page_size"]
+        timeout: 最长等待秒数，默认 TRANSCRIPT_STORE_CONFIG["poll_timeout"]
+
+    Returns:
+        按序号排序的新记录、last_id 和 has_more
+    """
+    transcript = _session_transcript(session_id)
+    if transcript is None:
+        return session_not_found(session_id)
+    if timeout is None:
+        timeout = TRANSCRIPT_STORE_CONFIG["poll_timeout"]
+    timeout = min(max(timeout, 0), TRANSCRIPT_STORE_CONFIG["max_poll_timeout"])
+    await transcript.wait(after, timeout)
+    return await asyncio.to_thread(_transcript_delta, transcript, after, None, None, limit)
+
 @router.get('/api/latest')
-def get_latest_transcript():
+def get_latest_transcript(session_id: str = DEFAULT_SESSION_ID):
     """
     获取最新的转写记录 - 外部API接口
 
+    Args:
+        session_id: 会话ID，默认为默认会话
+
     Returns:
         最新的转写记录
     """
-    if transcription_service.transcript:
-        latest = transcription_service.transcript[-1]
+    transcript = _session_transcript(session_id)
+    if transcript is None:
+        return session_not_found(session_id)
+    latest = transcript.latest()
+    if latest is not None:
         return {
             "status": "success",
             "transcript": latest
@@ -310,24 +624,57 @@ def get_latest_transcript():
     }
 
 @router.get('/api/transcripts/since/{timestamp}')
-def get_transcripts_since(timestamp: str):
+def get_transcripts_since(timestamp: str, session_id: str = DEFAULT_SESSION_ID,
+                          limit: int = None, offset: int = 0):
     """
     获取指定时间戳之后的转写记录 - 外部API接口
 
     Args:
         timestamp: 时间戳格式 HH:MM:SS
+        session_id: 会话ID，默认为默认会话
+        limit: 每页条数，默认 TRANSCRIPT_STORE_CONFIG["page_size"]
+        offset: 跳过的条数，取上一页响应中的 next_offset
 
     Returns:
-        指定时间之后的转写记录
+        时间戳晚于指定时间（按秒比较）的一页转写记录
     """
-    filtered_transcripts = [
-        t for t in transcription_service.transcript
-        if t.get('timestamp', '') > timestamp
-    ]
+    transcript = _session_transcript(session_id)
+    if transcript is None:
+        return session_not_found(session_id)
+    try:
+        since = parse_timestamp(timestamp)
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+    # 时间戳精确到秒：晚于 HH:MM:SS 即不早于下一整秒
+    return _transcript_page(transcript, int(since) + 1, None, limit, offset)
+
+@router.get('/api/search')
+def search_transcripts(q: str, session_id: str = DEFAULT_SESSION_ID, limit: int = 20, offset: int = 0,
+                       history: bool = False):
+    """
+    全文检索转写记录 - 外部API接口
+
+    Args:
+        q: 查询字符串，中文等按子串匹配，英文等按单词前缀匹配，空格分隔的多个词须同时出现
+        session_id: 会话ID，默认为默认会话
+        limit: 最多返回的条数
+        offset: 跳过的条数
+        history: 是否同时检索本会话之前的转写（开始转写或清空记录前的记录）
+
+    Returns:
+        按相关度排序的匹配记录，带时间戳和标出匹配的片段
+    """
+    transcript = _session_transcript(session_id)
+    if transcript is None:
+        return session_not_found(session_id)
+    if not transcript_store.searchable:
+        return {"status": "error", "message": "当前 SQLite 不支持 FTS5，全文检索不可用"}
+    results = transcript.search(q, limit, offset, history)
     return {
         "status": "success",
-        "count": len(filtered_transcripts),
-        "transcripts": filtered_transcripts
+        "query": q,
+        "count": len(results),
+        "results": results
     }
 
 @router.get('/api/info')
@@ -348,21 +695,62 @@ def get_api_info():
                 "description": "实时WebSocket连接，推送转写结果",
                 "events": {
                     "status": "连接状态和配置信息",
-                    "transcription": "实时转写结果",
+                    "transcription": "实时转写结果（最终结果）",
+                    "partial": "流式模式下的部分结果，可能被后续结果修正",
+                    "draft": "推测式转写的草稿（轻量模型），data 含 draft_id 和 text（草稿全文）",
+                    "correction": "当前模型校正后的结果，data 含对应草稿的 draft_id 和替换用的 transcripts",
                     "error": "错误信息"
                 }
             },
+            "audio_ingest": {
+                "url": "ws://localhost:8000/ws/audio",
+                "description": "推送 16kHz 单声道 PCM 音频（int16/float32），在同一连接上返回转写结果",
+                "messages": {
+                    "config": "协商样本格式、声道数、语言和流式模式",
+                    "binary": "PCM 音频帧",
+                    "end": "音频结束，处理完剩余音频后推送 end 事件并关闭连接"
+                }
+            },
             "rest": {
                 "/api/info": "获取API信息",
-                "/api/transcripts": "获取所有转写记录",
+                "/api/transcripts": "分页获取转写记录（start/end 时间范围，limit/offset 分页，after 按序号增量拉取）",
+                "/api/transcripts/poll?after=": "长轮询：有新记录或超时后返回",
+                "/api/search?q=": "全文检索转写记录（中文按子串匹配），按相关度返回带时间戳的片段",
                 "/api/latest": "获取最新转写记录",
-                "/api/transcripts/since/{timestamp}": "获取指定时间后的记录"
+                "/api/transcripts/since/{timestamp}": "获取指定时间后的记录",
+                "/api/metrics": "获取流水线各阶段的队列深度和耗时",
+                "/metrics": "Prometheus 文本格式的指标（延迟、实时率、VAD、拒绝原因、队列深度等）"
+            },
+            "debug": {
+                "GET /debug/traces?format=": "最近被采样窗口的步骤耗时树（json/chrome/folded）",
+                "POST /debug/traces/config": "启用/关闭追踪，调整采样率和缓冲区大小",
+                "DELETE /debug/traces": "清空已保存的追踪"
+            },
+            "sessions": {
+                "POST /sessions": "创建转写会话",
+                "GET /sessions": "列出所有会话",
+                "GET /sessions/{session_id}": "获取会话信息",
+                "DELETE /sessions/{session_id}": "停止并删除会话"
+            },
+            "jobs": {
+                "POST /api/jobs?filename=": "上传录音文件（请求体为文件内容），创建后台转写任务",
+                "GET /api/jobs": "列出所有文件转写任务",
+                "GET /api/jobs/{job_id}": "查询任务状态和进度",
+                "GET /api/jobs/{job_id}/result?format=": "获取转写结果（json/srt/vtt）",
+                "DELETE /api/jobs/{job_id}": "取消任务"
             },
             "control": {
                 "/status": "获取服务状态",
                 "/start": "开始转写",
                 "/stop": "停止转写",
-                "/clear": "清空记录"
+                "/clear": "清空记录",
+                "POST /hallucination_patterns": "运行时替换幻觉模式（所有会话立即生效）",
+                "POST /change_endpointing_mode": "切换端点检测分段（按语音边界切分）",
+                "POST /change_speculative_mode": "切换推测式转写（轻量模型先出草稿，当前模型校正后替换）",
+                "GET /profiles": "列出推理配置档（计算精度、线程数、beam、VAD 参数）",
+                "POST /change_profile": "切换会话的推理配置档（转写中从下一个窗口起生效）",
+                "POST /change_model": "后台热切换模型，返回任务ID",
+                "/change_model/{job_id}": "查询模型切换进度"
             }
         },
         "examples": {
@@ -1,37 +1,205 @@
 """
 WebSocket相关的API端点
 """
+import asyncio
+import json
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from app.services.transcription import transcription_service
+from app.services.session import session_manager
 from app.services.whisper import whisper_service
+from app.services.broadcast import encode_event
+from app.services.ingest import parse_stream_config, default_stream_config, decode_pcm
 from app.core.logging import logger
+from app.config import DEFAULT_SESSION_ID, WS_AUDIO_CONFIG
 
 router = APIRouter()
 
 @router.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
+async def websocket_endpoint(websocket: WebSocket, session_id: str = DEFAULT_SESSION_ID):
     """
     处理WebSocket连接
     
     Args:
         websocket: WebSocket连接对象
+        session_id: 要订阅的会话ID，默认为默认会话
     """
     await websocket.accept()
-    transcription_service.connected_websockets.add(websocket)
+    session = session_manager.get(session_id)
+    if session is None:
+        await websocket.send_json({"event": "error", "data": {"message": f"会话不存在: {session_id}"}})
+        await websocket.close()
+        return
+    broadcaster = session.broadcaster
     
     try:
         await websocket.send_json({
             "event": "status",
             "data": {
                 'status': 'connected',
+                'session_id': session.session_id,
                 'model': whisper_service.model_name,
-                'language': transcription_service.current_language
+                'language': session.current_language
             }
         })  
+        # 注册发送通道，转写事件由独立的发送任务推送
+        await broadcaster.register(websocket)
         # 保持连接
         while True:
             data = await websocket.receive_text()
     except WebSocketDisconnect:
         logger.info("客户端已断开连接")
     finally:
-        transcription_service.connected_websockets.remove(websocket)
\ No newline at end of file
+        await broadcaster.unregister(websocket)
+
+
+async def _send_error(websocket, message):
+    """向音频接入客户端发送错误事件"""
+    await websocket.send_json({"event": "error", "data": {"message": message}})
+
+
+async def _open_audio_session(websocket, message):
+    """
+    根据 config 消息准备会话并开始远程音频转写
+
+    未指定 session_id 时为本连接创建专属会话，连接结束后删除；
+    指定时使用已存在且未在转写的会话（其他 /ws 客户端可提前订阅）。
+
+    Args:
+        websocket: WebSocket连接对象
+        message: config 消息
+
+    Returns:
+        tuple: (会话, 流配置, 是否为本连接创建)，失败时会话为 None
+    """
+    config, error = parse_stream_config(message)
+    if error:
+        await _send_error(websocket, error)
+        return None, None, False
+
+    session_id = message.get("session_id")
+    if session_id:
+        session = session_manager.get(session_id)
+        if session is None:
+            await _send_error(websocket, f"会话不存在: {session_id}")
+            return None, None, False
+        if session.running:
+            await _send_error(websocket, f"会话正在转写，不能接入音频流: {session_id}")
+            return None, None, False
+        if message.get("language"):
+            session.set_language(message["language"])
+        if message.get("streaming") is not None:
+            session.set_streaming(message["streaming"])
+        if message.get("endpointing") is not None:
+            session.set_endpointing(message["endpointing"])
+        if message.get("speculative") is not None:
+            session.set_speculative(message["speculative"])
+        owned = False
+    else:
+        result = session_manager.create(
+            language=message.get("language"), streaming=message.get("streaming"), endpointing=message.get("endpointing"),
+            speculative=message.get("speculative")
+        )
+        if result["status"] != "success":
+            await _send_error(websocket, result["message"])
+            return None, None, False
+        session = session_manager.get(result["session"]["session_id"])
+        owned = True
+
+    session.start(source="remote")
+    await websocket.send_json({
+        "event": "config",
+        "data": {
+            "status": "accepted",
+            "session_id": session.session_id,
+            "model": whisper_service.model_name,
+            "language": session.current_language,
+            "streaming": session.streaming,
+            "endpointing": session.endpointing,
+            "speculative": session.speculative,
+            **config
+        }
+    })
+    logger.info(f"音频流已接入会话: {session.session_id} ({config['format']}, {config['channels']} 声道)")
+    return session, config, owned
+
+
+@router.websocket("/ws/audio")
+async def audio_ingest_endpoint(websocket: WebSocket):
+    """
+    接收客户端推送的 PCM 音频并在同一连接上返回转写结果
+
+    协议：先发送 config 文本消息协商格式（可省略，默认 16kHz 单声道 int16），
+    随后发送二进制音频帧，最后发送 {"type": "end"}；服务端处理完剩余音频后
+    推送 end 事件并关闭连接。
+
+    Args:
+        websocket: WebSocket连接对象
+    """
+    await websocket.accept()
+    session, config, owned, channel = None, None, False, None
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                logger.info("音频流客户端已断开连接")
+                break
+
+            if message.get("text") is not None:
+                try:
+                    control = json.loads(message["text"])
+                except ValueError:
+                    await _send_error(websocket, "控制消息必须是 JSON")
+                    continue
+                kind = control.get("type")
+                if kind == "config":
+                    if session is not None:
+                        await _send_error(websocket, "音频流已开始，不能重新配置")
+                        continue
+                    session, config, owned = await _open_audio_session(websocket, control)
+                    if session is not None:
+                        channel = await session.broadcaster.register(websocket)
+                elif kind == "end":
+                    if session is None:
+                        await _send_error(websocket, "尚未发送任何音频")
+                        continue
+                    # 在线程中等待剩余音频切窗和解码完成，不阻塞事件循环
+                    finished = await asyncio.to_thread(session.drain, WS_AUDIO_CONFIG["drain_timeout"])
+                    # 经由发送通道推送，保证排在所有转写事件之后
+                    channel.offer(encode_event("end", {
+                        "session_id": session.session_id,
+                        "completed": finished,
+                        "transcripts": len(session.transcript),
+                        "dropped_samples": session.buffer.dropped
+                    }))
+                    await channel.flush(timeout=5)
+                    await websocket.close()
+                    break
+                else:
+                    await _send_error(websocket, f"未知的控制消息类型: {kind}")
+                continue
+
+            data = message.get("bytes")
+            if data is None:
+                continue
+            if session is None:
+                session, config, owned = await _open_audio_session(websocket, default_stream_config())
+                if session is None:
+                    break
+                channel = await session.broadcaster.register(websocket)
+            samples, error = decode_pcm(data, config)
+            if error:
+                await _send_error(websocket, error)
+                continue
+            # 背压：客户端快于实时发送时，等待解码阶段追上
+            while session.running and session.backlogged(len(samples)):
+                await asyncio.sleep(0.02)
+            session.feed_audio(samples)
+    except WebSocketDisconnect:
+        logger.info("音频流客户端已断开连接")
+    finally:
+        if session is not None:
+            session.stop()
+            if owned:
+                await session_manager.remove(session.session_id)
+            else:
+                await session.broadcaster.unregister(websocket)
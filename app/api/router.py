@@ -2,7 +2,7 @@
 API路由注册
 """
 from fastapi import APIRouter
-from app.api.endpoints import audio, transcription, websocket
+from app.api.endpoints import audio, transcription, websocket, session, jobs, metrics, debug
 
 # 创建主路由
 api_router = APIRouter()
@@ -10,4 +10,8 @@ api_router = APIRouter()
 # 注册各模块路由
 api_router.include_router(audio.router, tags=["audio"])
 api_router.include_router(transcription.router, tags=["transcription"])
-api_router.include_router(websocket.router, tags=["websocket"])
\ No newline at end of file
+api_router.include_router(websocket.router, tags=["websocket"])
+api_router.include_router(session.router, tags=["session"])
+api_router.include_router(jobs.router, tags=["jobs"])
+api_router.include_router(metrics.router, tags=["metrics"])
+api_router.include_router(debug.router, tags=["debug"])
\ No newline at end of file
@@ -1,12 +1,148 @@
 """
 配置模块 - WhisprRT 应用的所有配置参数
 """
+import os
 from typing import Dict, List
 
+# 项目根目录；数据文件默认放在这里，环境变量 WHISPRRT_DATA_DIR 可指定其他目录
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.environ.get("WHISPRRT_DATA_DIR", PROJECT_ROOT)
+
 # ============ 音频配置 ============
 SAMPLE_RATE = 16000
 BLOCK_SIZE = 2000  # 从4000减少到2000，减少音频块延迟
 BUFFER_SECONDS = 3  # 从5秒减少到3秒，这是最大的延迟优化
+RING_BUFFER_HEADROOM_SECONDS = 5  # 环形缓冲区余量，容纳推理期间继续采集的音频
+FEATURE_FRAME_SIZE = 512  # 帧级特征（能量、零交叉率、频谱中心）的帧长，32ms
+
+# 语音活动检测配置 - 在特征/VAD 阶段运行一次，只把语音片段送入 Whisper（Whisper 内部不再做 VAD）
+VAD_CONFIG = {
+    "engine": "silero",  # energy（帧级特征启发式）/ silero（faster-whisper 自带的 ONNX 模型）/ webrtc（需安装 webrtcvad）
+    "threshold": 0.5,  # silero 语音概率阈值
+    "webrtc_mode": 2,  # webrtc 激进程度 0-3
+    "min_speech_ms": 250,  # 短于该时长的语音片段丢弃
+    "min_silence_ms": 500,  # 片段之间短于该时长的静音会被合并
+    "speech_pad_ms": 400,  # 每个语音片段两侧保留的填充
+}
+
+# 端点检测分段配置 - 固定窗口模式下按语音边界切分，代替每 BUFFER_SECONDS 切一次
+ENDPOINTING_CONFIG = {
+    "enabled": False,
+    "silence_gap_ms": 800,  # 语音后出现超过该时长的静音即结束当前分段
+    "max_segment_seconds": 10.0,  # 分段最大长度，持续讲话时也会在此长度内切分
+    "min_speech_ms": 300,  # 分段内语音短于该时长时不送入解码
+    "check_ms": 200,  # 检查端点的间隔（音频时长）
+}
+
+# 文件转写任务配置 - POST /api/jobs 上传的录音在后台队列中转写
+JOB_CONFIG = {
+    "workers": 1,  # 同时处理的任务数
+    "chunk_workers": 4,  # 每个任务并发提交的语音块数（由批处理调度器和模型池并行解码）
+    "chunk_seconds": 30,  # 长音频在静音处切块，每块不超过该时长
+    "max_upload_mb": 1024,  # 上传文件大小上限
+    "upload_dir": None,  # 上传文件的暂存目录，None 为系统临时目录下的 whisprrt_jobs
+    "history": 100,  # 保留的已结束任务数
+    # 长音频多进程模式：每个进程加载独立的模型（内存占用随进程数增加），0 表示不启用
+    "process_workers": 0,
+    "process_threads": None,  # 每个进程的推理线程数，None 取默认推理配置档的线程数（计算精度同样取自配置档）
+    "process_min_seconds": 600,  # 音频不短于该时长时使用多进程模式
+    "pin_cores": False,  # 是否把每个进程绑定到互不重叠的核心（仅 Linux）
+}
+
+# 转写记录存储配置 - 追加写入 SQLite（WAL 模式），内存中只保留最近的若干条
+TRANSCRIPT_STORE_CONFIG = {
+    "path": os.path.join(DATA_DIR, "transcripts.db"),  # 数据库文件路径（不随启动目录变化），None 为仅内存（重启后丢失）
+    "tail_size": 200,  # 每个会话在内存中保留的最近记录数
+    "page_size": 500,  # 查询接口默认每页条数
+    "max_page_size": 5000,  # 每页条数上限
+    "poll_timeout": 25,  # 长轮询默认等待秒数
+    "max_poll_timeout": 60,  # 长轮询等待上限
+    "search_window": 2000,  # 全文检索只在最近的这么多条匹配中按相关度排序，保证高频词的查询耗时
+}
+
+# 流水线追踪配置 - 按采样率记录每个音频窗口各处理步骤的耗时树，在 /debug/traces 查看
+TRACING_CONFIG = {
+    "enabled": False,  # 是否启用追踪（可通过 POST /debug/traces/config 在运行时调整）
+    "sample_rate": 0.05,  # 被追踪的窗口比例，生产环境保持较低的采样率
+    "buffer_size": 256,  # 环形缓冲区保留的最近追踪数
+}
+
+# 流式转写配置 - 滑动窗口 + 本地一致性提交
+STREAMING_CONFIG = {
+    "enabled": False,  # 启用后推送部分结果（partial），文本稳定后再推送最终结果
+    "hop_seconds": 1.0,  # 解码间隔，决定部分结果的刷新频率
+    "window_seconds": 10.0,  # 未提交音频的最大窗口长度
+    "overlap_seconds": 2.0,  # 窗口超长被强制提交时保留的重叠音频
+    "agreement": 2,  # 连续几次解码结果一致的前缀才会被提交
+}
+
+# 推测式双模型转写配置 - 固定窗口模式下轻量模型先推送草稿，当前模型在后台重新解码同一段音频后原位替换草稿
+SPECULATIVE_CONFIG = {
+    "enabled": False,  # 新会话默认是否启用（流式模式下不生效）
+    "draft_model": "tiny",  # 出草稿的轻量模型（取自 AVAILABLE_MODELS，建议 tiny 或 base）
+    "correction_queue_size": 8,  # 等待校正的窗口数上限，超出时最早的草稿不经校正直接作为最终结果
+}
+
+# 流水线配置 - 采集、特征/VAD、解码三个阶段之间使用有界队列
+PIPELINE_CONFIG = {
+    "decode_queue_size": 4,  # 待解码窗口队列容量
+    "overload_policy": "drop_oldest",  # 队列满时的策略: drop_oldest / merge / downgrade
+    "max_merge_seconds": 15,  # merge 策略下合并后窗口的最大时长
+    "fallback_model": "tiny",  # downgrade 策略下过载时临时使用的模型
+}
+
+# 模型池配置 - K 个模型副本并行推理，每个副本有独立的 CPU 线程预算（计算精度和线程数取自推理配置档）
+MODEL_POOL_CONFIG = {
+    "replicas": 1,  # 模型副本数 K（每个副本占用一份模型内存）
+    "pin_cores": False,  # 是否把每个副本绑定到互不重叠的 CPU 核心（仅 Linux）
+}
+
+# 推理配置档 - 计算精度、推理线程数、beam 搜索和 VAD 参数的命名组合，会话可在运行时切换
+# cpu_threads 为 None 时按 CPU 亲和性取可用核心数并在模型副本间均分；vad 中的项覆盖 VAD_CONFIG
+# 环境变量 WHISPRRT_PROFILE 选择默认配置档，WHISPRRT_PROFILES_FILE 指向的 JSON 文件可覆盖或新增配置档
+INFERENCE_PROFILES = {
+    "low-latency": {
+        "compute_type": "int8",
+        "cpu_threads": None,
+        "beam_size": 1,
+        "best_of": 1,
+        "vad": {"min_silence_ms": 300, "speech_pad_ms": 200},  # 更短的填充，语音片段更快送入解码
+    },
+    "balanced": {
+        "compute_type": "int8_float32",
+        "cpu_threads": None,
+        "beam_size": 1,
+        "best_of": 1,
+        "vad": {},
+    },
+    "accurate": {
+        "compute_type": "float32",
+        "cpu_threads": None,
+        "beam_size": 5,
+        "best_of": 5,
+        "vad": {"threshold": 0.4, "min_silence_ms": 700, "speech_pad_ms": 500},  # 保留更多弱语音和上下文
+    },
+}
+INFERENCE_PROFILE = os.environ.get("WHISPRRT_PROFILE", "balanced")  # 新会话和模型池默认使用的配置档
+
+# 模型缓存配置 - 已加载的模型按 LRU 保留，来回切换时无需重新加载
+MODEL_CACHE_CONFIG = {
+    "memory_budget_mb": 6144,  # 缓存模型的内存预算，超出时淘汰最久未使用且未在使用中的模型；0 表示不限制
+    "preload": [],  # 启动时在后台预加载的模型（取自 AVAILABLE_MODELS），如 ["tiny", "large-v3-turbo"]
+}
+
+# 模型热切换配置 - 新模型在后台加载预热后切换，不中断转写
+MODEL_SWAP_CONFIG = {
+    "history": 20,  # 保留供查询的切换任务数
+    "release_timeout": 60,  # 切换后等待旧模型上的推理结束的最长时间（秒）
+}
+
+# 跨会话动态批处理配置 - 多个会话同时有待解码窗口时合并为一次批量推理
+BATCHING_CONFIG = {
+    "enabled": False,  # 多个会话同时转写时开启；单会话下每个窗口都要白等 max_delay_ms
+    "max_batch_size": 8,  # 每批最多合并的窗口数
+    "max_delay_ms": 20,  # 收到第一个窗口后最多等待其他窗口的时间
+}
 
 # 模型配置
 AVAILABLE_MODELS = {
@@ -18,6 +154,10 @@ AVAILABLE_MODELS = {
 DEFAULT_MODEL = "large-v3-turbo"
 DEFAULT_LANGUAGE = "zh"
 
+# 会话配置 - 每个会话拥有独立的缓冲区、语言、阈值和转写记录，共享已加载的模型
+DEFAULT_SESSION_ID = "default"  # 不指定 session_id 时使用的默认会话
+MAX_SESSIONS = 8  # 同时存在的会话数上限
+
 # 反幻觉配置 - 速度优化
 ANTI_HALLUCINATION_CONFIG = {
     "temperature": 0.0,  # 保持确定性
@@ -55,6 +195,14 @@ HALLUCINATION_PATTERNS = [
 # ============ 服务器配置 ============
 HOST = "0.0.0.0"
 PORT = 5444
+WEBSOCKET_SEND_QUEUE_SIZE = 256  # 每个WebSocket客户端的发送队列容量，满时丢弃最早的消息
+
+# WebSocket 音频接入配置（/ws/audio）- 客户端推送 16kHz 单声道 PCM
+WS_AUDIO_CONFIG = {
+    "default_format": "int16",  # 未发送 config 消息时的样本格式: int16 / float32
+    "max_frame_seconds": 2,  # 单个二进制帧的最大音频时长
+    "drain_timeout": 120,  # 音频流结束后等待剩余音频解码完成的最长时间（秒）
+}
 
 # ============ 应用配置 ============
 APP_NAME = "WhisprRT"
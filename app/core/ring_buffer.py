@@ -0,0 +1,171 @@
+"""
+音频环形缓冲区模块
+"""
+import threading
+import time
+from collections import deque
+import numpy as np
+
+
+class AudioRingBuffer:
+    """
+    固定容量的 float32 单声道环形缓冲区
+
+    采用镜像存储：每个样本同时写入 i 和 i + capacity 两个位置，
+    因此任意长度不超过 capacity 的区间都是底层数组中的一段连续内存，
+    读取时可以直接返回零拷贝视图，无需在回绕处拼接。
+
+    写入方（音频回调线程）和读取方（转写线程）通过内部锁同步。
+    样本位置使用自启动以来的绝对样本序号表示，便于上层按位置裁剪。
+    每次写入记录首个样本的位置和写入时间，用于计算从采集到出字的延迟。
+    """
+
+    def __init__(self, capacity):
+        """
+        初始化环形缓冲区
+
+        Args:
+            capacity: 最多可保留的样本数
+        """
+        if capacity <= 0:
+            raise ValueError("capacity 必须大于 0")
+        self.capacity = int(capacity)
+        self._data = np.zeros(2 * self.capacity, dtype=np.float32)
+        self._write_pos = 0  # 已写入样本总数（绝对位置）
+        self._read_pos = 0   # 最早的未消费样本的绝对位置
+        self._cond = threading.Condition(threading.Lock())
+        self._writes = deque()  # 未消费音频的各次写入 (首个样本的绝对位置, 写入时间)
+        self.dropped = 0     # 因缓冲区溢出而被覆盖的样本数
+
+    def __len__(self):
+        """返回当前未消费的样本数"""
+        return self._write_pos - self._read_pos
+
+    @property
+    def write_position(self):
+        """已写入样本总数（绝对位置）"""
+        return self._write_pos
+
+    @property
+    def read_position(self):
+        """最早的未消费样本的绝对位置"""
+        return self._read_pos
+
+    def write(self, samples):
+        """
+        写入一块音频样本，缓冲区满时覆盖最早的样本
+
+        Args:
+            samples: 音频样本，形状为 (n,) 或 (n, 1)
+        """
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        n = len(samples)
+        if n == 0:
+            return
+        cap = self.capacity
+        with self._cond:
+            skipped = 0
+            if n > cap:
+                skipped = n - cap
+                samples = samples[skipped:]
+            start = (self._write_pos + skipped) % cap
+            first = min(len(samples), cap - start)
+            rest = len(samples) - first
+            self._data[start:start + first] = samples[:first]
+            self._data[start + cap:start + cap + first] = samples[:first]
+            if rest:
+                self._data[:rest] = samples[first:]
+                self._data[cap:cap + rest] = samples[first:]
+            self._writes.append((self._write_pos, time.time()))
+            self._write_pos += n
+            overflow = self._write_pos - self._read_pos - cap
+            if overflow > 0:
+                self._read_pos += overflow
+                self.dropped += overflow
+            # 只保留仍含未消费样本的写入记录
+            while len(self._writes) > 1 and self._writes[1][0] <= self._read_pos:
+                self._writes.popleft()
+            self._cond.notify_all()
+
+    def _view(self, start_pos, length):
+        """返回从绝对位置 start_pos 开始、长度为 length 的连续视图"""
+        start = start_pos % self.capacity
+        view = self._data[start:start + length]
+        view.flags.writeable = False
+        return view
+
+    def peek(self, n=None):
+        """
+        返回最早的 n 个未消费样本的只读视图（不消费）
+
+        Args:
+            n: 样本数，默认为全部未消费样本
+
+        Returns:
+            numpy.ndarray: 零拷贝视图，在缓冲区被覆盖前有效
+        """
+        with self._cond:
+            available = self._write_pos - self._read_pos
+            length = available if n is None else min(int(n), available)
+            return self._view(self._read_pos, length)
+
+    def since(self, position):
+        """
+        返回从绝对位置 position 到最新写入位置的只读视图（不消费）
+
+        Args:
+            position: 起始绝对位置；早于最早的未消费样本时从最早的未消费样本开始
+
+        Returns:
+            tuple: (视图实际的起始绝对位置, 零拷贝视图)
+        """
+        with self._cond:
+            start = min(max(int(position), self._read_pos), self._write_pos)
+            return start, self._view(start, self._write_pos - start)
+
+    def write_time(self, position):
+        """
+        返回绝对位置 position 处的样本写入缓冲区的时间
+
+        Args:
+            position: 未消费样本的绝对位置
+
+        Returns:
+            float: 包含该样本的那次写入的时间（time.time()），没有记录时为 None
+        """
+        with self._cond:
+            written = None
+            for start, stamp in self._writes:
+                if start > position:
+                    break
+                written = stamp
+            return written
+
+    def consume(self, n):
+        """
+        丢弃最早的 n 个未消费样本
+
+        Args:
+            n: 要丢弃的样本数
+        """
+        with self._cond:
+            self._read_pos = min(self._read_pos + max(int(n), 0), self._write_pos)
+
+    def clear(self):
+        """丢弃所有未消费样本"""
+        with self._cond:
+            self._read_pos = self._write_pos
+
+    def wait_for_data(self, position, timeout=None):
+        """
+        等待写入位置超过给定的绝对位置
+
+        Args:
+            position: 上次观察到的写入位置
+            timeout: 超时时间（秒）
+
+        Returns:
+            bool: 是否有新数据写入
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: self._write_pos > position, timeout)
@@ -1,6 +1,7 @@
 """
 应用入口模块 - WhisprRT 实时语音转文字服务
 """
+import asyncio
 from typing import Dict, Any
 import uvicorn
 from fastapi import FastAPI, Request
@@ -11,6 +12,9 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.api.router import api_router
 from app.core.logging import logger
 from app.config import HOST, PORT
+from app.services.broadcast import bind_event_loop
+from app.services.session import session_manager
+from app.services.whisper import whisper_service
 
 # 创建FastAPI应用
 app = FastAPI(
@@ -43,12 +47,17 @@ app.include_router(api_router)
 async def startup_event() -> None:
     """应用启动时的事件处理"""
     logger.info("WhisprRT application starting up...")
+    # 转写线程通过该事件循环向WebSocket客户端推送事件
+    bind_event_loop(asyncio.get_running_loop())
+    # 在后台预加载配置的模型，之后切换模型无需等待加载
+    whisper_service.start_preload()
     logger.info(f"Server will be available at http://{HOST}:{PORT}")
 
 @app.on_event("shutdown")
 async def shutdown_event() -> None:
     """应用关闭时的事件处理"""
     logger.info("WhisprRT application shutting down...")
+    await session_manager.shutdown()
 
 @app.get('/', response_class=HTMLResponse)
 async def index(request: Request) -> HTMLResponse:
@@ -1,6 +1,7 @@
 """
 Pydantic 模型定义
 """
+from typing import List, Optional
 from pydantic import BaseModel
 
 class ModelRequest(BaseModel):
@@ -17,4 +18,47 @@ class TimestampRequest(BaseModel):
 
 class DeviceRequest(BaseModel):
     """音频设备选择请求"""
-    device_id: str
\ No newline at end of file
+    device_id: str
+
+class StreamingRequest(BaseModel):
+    """流式转写模式设置请求"""
+    enabled: bool
+
+class EndpointingRequest(BaseModel):
+    """端点检测分段设置请求"""
+    enabled: bool
+
+class SpeculativeRequest(BaseModel):
+    """推测式双模型转写设置请求"""
+    enabled: bool
+
+class ProfileRequest(BaseModel):
+    """推理配置档切换请求"""
+    profile: str
+
+class OverloadPolicyRequest(BaseModel):
+    """解码队列过载策略设置请求"""
+    policy: str
+
+class HallucinationPatternsRequest(BaseModel):
+    """幻觉模式替换请求"""
+    patterns: List[str]
+
+class SessionRequest(BaseModel):
+    """转写会话创建请求"""
+    language: Optional[str] = None
+    device_id: Optional[int] = None
+    streaming: Optional[bool] = None
+    endpointing: Optional[bool] = None
+    speculative: Optional[bool] = None
+    profile: Optional[str] = None
+    confidence_threshold: Optional[float] = None
+    energy_threshold: Optional[float] = None
+    silence_threshold: Optional[float] = None
+    zcr_threshold: Optional[float] = None
+
+class TracingConfigRequest(BaseModel):
+    """流水线追踪设置请求（未给出的字段保持不变）"""
+    enabled: Optional[bool] = None
+    sample_rate: Optional[float] = None
+    buffer_size: Optional[int] = None
\ No newline at end of file
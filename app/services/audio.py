@@ -83,7 +83,7 @@ class AudioService:
             logger.error(f"选择音频设备失败: {str(e)}")
             return {"status": "error", "message": f"选择音频设备失败: {str(e)}"}
     
-    def create_input_stream(self, samplerate, channels, dtype, callback, blocksize):
+    def create_input_stream(self, samplerate, channels, dtype, callback, blocksize, device=None):
         """
         创建音频输入流
         
@@ -93,6 +93,7 @@ class AudioService:
             dtype: 数据类型
             callback: 回调函数
             blocksize: 块大小
+            device: 设备ID，默认使用当前选择的设备
             
         Returns:
             InputStream: 音频输入流
@@ -103,7 +104,7 @@ class AudioService:
             dtype=dtype,
             callback=callback, 
             blocksize=blocksize, 
-            device=self.current_device
+            device=self.current_device if device is None else device
         )
 
 # 创建全局音频服务实例
@@ -0,0 +1,185 @@
+"""
+WebSocket 广播服务
+"""
+import asyncio
+import json
+import time
+from app.core.logging import logger
+
+# 服务器（uvicorn）的事件循环，启动时绑定；WebSocket 对象只能在该循环中使用
+_event_loop = None
+
+
+def bind_event_loop(loop):
+    """
+    绑定服务器事件循环，工作线程发布的事件将交给该循环发送
+
+    Args:
+        loop: asyncio 事件循环
+    """
+    global _event_loop
+    _event_loop = loop
+
+
+def encode_event(event_type, data):
+    """将事件序列化为 JSON 文本（与 send_json 的格式一致）"""
+    return json.dumps({"event": event_type, "data": data}, separators=(",", ":"), ensure_ascii=False)
+
+
+class ClientChannel:
+    """
+    单个 WebSocket 客户端的发送通道
+
+    每个客户端有独立的有界发送队列和发送任务，慢客户端只会让自己的队列积压，
+    队列满时丢弃最早的消息，不会阻塞其他客户端。
+    """
+
+    def __init__(self, websocket, maxsize):
+        """
+        初始化发送通道（需在事件循环中调用）
+
+        Args:
+            websocket: WebSocket 连接对象
+            maxsize: 发送队列容量
+        """
+        self.websocket = websocket
+        self.queue = asyncio.Queue(maxsize)
+        self.dropped = 0
+        self.task = asyncio.create_task(self._writer())
+
+    def offer(self, text):
+        """
+        放入一条待发送消息，队列满时丢弃最早的消息
+
+        Args:
+            text: 已序列化的消息文本
+        """
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.queue.task_done()
+            self.dropped += 1
+        self.queue.put_nowait(text)
+
+    async def _writer(self):
+        """按顺序发送队列中的消息"""
+        try:
+            while True:
+                text = await self.queue.get()
+                await self.websocket.send_text(text)
+                self.queue.task_done()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"WebSocket发送消息失败: {str(e)}")
+
+    async def flush(self, timeout=None):
+        """
+        等待队列中的消息全部发送完毕
+
+        Args:
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            bool: 是否在超时前发送完毕
+        """
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+class WebSocketBroadcaster:
+    """WebSocket 广播器：管理客户端通道，并把工作线程的事件投递到服务器事件循环"""
+
+    def __init__(self, queue_size=256, on_fan_out=None):
+        """
+        初始化广播器
+
+        Args:
+            queue_size: 每个客户端的发送队列容量
+            on_fan_out: 每次分发后以分发耗时（秒）调用的回调，用于记录指标
+        """
+        self.queue_size = queue_size
+        self.on_fan_out = on_fan_out
+        self.clients = {}
+        self.dropped = 0  # 已断开客户端累计丢弃的消息数
+
+    def __len__(self):
+        """返回已连接的客户端数量"""
+        return len(self.clients)
+
+    async def register(self, websocket):
+        """
+        注册客户端并启动其发送任务
+
+        Args:
+            websocket: 已 accept 的 WebSocket 连接
+
+        Returns:
+            ClientChannel: 客户端发送通道
+        """
+        channel = ClientChannel(websocket, self.queue_size)
+        self.clients[websocket] = channel
+        return channel
+
+    async def unregister(self, websocket):
+        """
+        注销客户端并停止其发送任务
+
+        Args:
+            websocket: WebSocket 连接
+        """
+        channel = self.clients.pop(websocket, None)
+        if channel is not None:
+            self.dropped += channel.dropped
+            channel.task.cancel()
+            await asyncio.gather(channel.task, return_exceptions=True)
+
+    @property
+    def total_dropped(self):
+        """慢客户端发送队列累计丢弃的消息数"""
+        return self.dropped + sum(channel.dropped for channel in self.clients.values())
+
+    def _fan_out(self, text):
+        """在事件循环中把消息放入所有客户端的发送队列"""
+        t0 = time.perf_counter()
+        for channel in list(self.clients.values()):
+            channel.offer(text)
+        if self.on_fan_out is not None:
+            self.on_fan_out(time.perf_counter() - t0)
+
+    async def broadcast(self, event_type, data):
+        """
+        在事件循环内广播事件
+
+        Args:
+            event_type: 事件类型
+            data: 要发送的数据
+        """
+        self._fan_out(encode_event(event_type, data))
+
+    def publish(self, event_type, data):
+        """
+        从任意线程发布事件（线程安全，不阻塞调用方）
+
+        消息只序列化一次，然后通过 call_soon_threadsafe 交给服务器事件循环，
+        由各客户端的发送任务并发发送。
+
+        Args:
+            event_type: 事件类型
+            data: 要发送的数据
+        """
+        loop = _event_loop
+        if loop is None or loop.is_closed() or not self.clients:
+            return
+        loop.call_soon_threadsafe(self._fan_out, encode_event(event_type, data))
+
+    async def close(self):
+        """停止所有客户端的发送任务并关闭连接"""
+        channels = list(self.clients.values())
+        self.clients.clear()
+        for channel in channels:
+            channel.task.cancel()
+        await asyncio.gather(*(channel.task for channel in channels), return_exceptions=True)
+        await asyncio.gather(*(channel.websocket.close() for channel in channels), return_exceptions=True)
@@ -0,0 +1,267 @@
+"""
+帧级音频特征 - 短帧能量、零交叉率和频谱中心，随音频到达增量计算
+"""
+import numpy as np
+
+# 每帧统计量的列：平均幅度、峰值、零交叉数、频谱中心分子、频谱中心分母
+ENERGY, PEAK, CROSSINGS, CENTROID_NUM, CENTROID_DEN = range(5)
+
+
+def centroid_bins(frame_size, sample_rate):
+    """
+    预先计算帧的 rfft 频率 bin（只取前 frame_size // 2 个正频率，与整窗 FFT 取前半部分一致）
+
+    Args:
+        frame_size: 帧长
+        sample_rate: 采样率
+
+    Returns:
+        numpy.ndarray: 频率 bin
+    """
+    return np.fft.rfftfreq(frame_size, 1 / sample_rate)[:frame_size // 2]
+
+
+def frame_stats(frames, freqs, prev_positive=None):
+    """
+    计算一组等长帧的统计量
+
+    Args:
+        frames: 形状为 (帧数, 帧长) 的 float32 数组
+        freqs: centroid_bins 返回的频率 bin
+        prev_positive: 上一帧最后一个样本是否为正，用于统计跨帧边界的过零
+
+    Returns:
+        numpy.ndarray: 形状为 (帧数, 5) 的统计量
+    """
+    stats = np.empty((len(frames), 5))
+    magnitude = np.abs(frames)
+    stats[:, ENERGY] = magnitude.mean(axis=1)
+    stats[:, PEAK] = magnitude.max(axis=1)
+
+    positive = frames > 0
+    crossings = np.count_nonzero(positive[:, 1:] != positive[:, :-1], axis=1)
+    # 帧与帧之间的过零计入后一帧，使各帧之和等于整段音频的过零数
+    crossings[1:] += positive[1:, 0] != positive[:-1, -1]
+    if prev_positive is not None:
+        crossings[0] += positive[0, 0] != prev_positive
+    stats[:, CROSSINGS] = crossings
+
+    spectrum = np.abs(np.fft.rfft(frames, axis=1))[:, :len(freqs)]
+    stats[:, CENTROID_NUM] = spectrum @ freqs
+    stats[:, CENTROID_DEN] = spectrum.sum(axis=1)
+    return stats
+
+
+def silence_rule(energy, zcr, centroid, thresholds):
+    """
+    静音判定：低能量且低零交叉率，或能量偏低且频谱中心异常
+
+    Args:
+        energy: 平均幅度（标量或每帧数组）
+        zcr: 零交叉率
+        centroid: 频谱中心（Hz）
+        thresholds: (silence_threshold, zcr_threshold, energy_threshold)
+
+    Returns:
+        bool 或 numpy.ndarray: 是否为静音
+    """
+    silence_threshold, zcr_threshold, energy_threshold = thresholds
+    return ((energy < silence_threshold) & (zcr < zcr_threshold)) | \
+           ((energy < energy_threshold) & (centroid < 100))
+
+
+def speech_frames(stats, frame_size, thresholds):
+    """
+    逐帧应用静音规则得到语音掩码（能量按这些帧的峰值归一化，与窗口级判断一致）
+
+    Args:
+        stats: frame_stats 返回的统计量
+        frame_size: 帧长
+        thresholds: (silence_threshold, zcr_threshold, energy_threshold)
+
+    Returns:
+        numpy.ndarray: 布尔数组，True 表示该帧为语音
+    """
+    if not len(stats):
+        return np.zeros(0, dtype=bool)
+    peak = stats[:, PEAK].max()
+    energy = stats[:, ENERGY] * (0.5 / peak if peak > 0 else 0.5)
+    zcr = stats[:, CROSSINGS] / frame_size
+    den = stats[:, CENTROID_DEN]
+    centroid = np.divide(stats[:, CENTROID_NUM], den, out=np.zeros_like(den), where=den > 0)
+    return ~silence_rule(energy, zcr, centroid, thresholds)
+
+
+def summarize(stats, n_samples, normalize=False):
+    """
+    把帧统计量聚合为窗口级的能量、零交叉率和频谱中心
+
+    Args:
+        stats: frame_stats 返回的统计量
+        n_samples: 这些帧覆盖的样本数
+        normalize: 是否按窗口峰值换算为预处理（0.5 * x / max|x|）后的能量
+
+    Returns:
+        tuple: (energy, zcr, centroid)
+    """
+    energy = float(stats[:, ENERGY].mean())
+    if normalize:
+        peak = float(stats[:, PEAK].max())
+        energy *= 0.5 / peak if peak > 0 else 0.5
+    zcr = float(stats[:, CROSSINGS].sum()) / max(n_samples - 1, 1)
+    den = float(stats[:, CENTROID_DEN].sum())
+    centroid = float(stats[:, CENTROID_NUM].sum()) / den if den > 0 else 0.0
+    return energy, zcr, centroid
+
+
+def analyze(audio, frame_size, freqs):
+    """
+    对一段完整音频计算窗口级特征（能量和零交叉率按整段计算，频谱中心按短帧聚合）
+
+    Args:
+        audio: 音频数据
+        frame_size: 帧长
+        freqs: centroid_bins 返回的频率 bin
+
+    Returns:
+        tuple: (energy, zcr, centroid)
+    """
+    audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+    n_frames = len(audio) // frame_size
+    if n_frames:
+        frames = audio[:n_frames * frame_size].reshape(n_frames, frame_size)
+    else:
+        frames = np.zeros((1, frame_size), dtype=np.float32)
+        frames[0, :len(audio)] = audio
+    stats = frame_stats(frames, freqs)
+    energy = float(np.abs(audio).mean())
+    positive = audio > 0
+    zcr = np.count_nonzero(positive[1:] != positive[:-1]) / max(len(audio) - 1, 1)
+    den = float(stats[:, CENTROID_DEN].sum())
+    centroid = float(stats[:, CENTROID_NUM].sum()) / den if den > 0 else 0.0
+    return energy, zcr, centroid
+
+
+class FrameFeatures:
+    """
+    帧级特征的增量计算与环形存储
+
+    新音频到达时按 frame_size 切成短帧，只对新帧计算统计量（不足一帧的尾部留到下次）。
+    帧以绝对样本位置定位，窗口级静音判断和逐帧语音掩码都只对已有的帧统计量做聚合，
+    不再对整个窗口重新计算。
+    """
+
+    def __init__(self, frame_size, capacity_frames, sample_rate):
+        """
+        初始化特征存储
+
+        Args:
+            frame_size: 帧长（样本数）
+            capacity_frames: 保留的最近帧数
+            sample_rate: 采样率
+        """
+        self.frame_size = int(frame_size)
+        self.capacity = max(1, int(capacity_frames))
+        self.freqs = centroid_bins(self.frame_size, sample_rate)
+        self._stats = np.zeros((self.capacity, 5))
+        self._carry = np.empty(self.frame_size, dtype=np.float32)
+        self.reset(0)
+
+    def reset(self, position):
+        """
+        清空特征，从绝对位置 position 重新开始
+
+        Args:
+            position: 下一个样本的绝对位置
+        """
+        self.origin = int(position)
+        self.frames = 0
+        self._carry_len = 0
+        self._prev_positive = None
+
+    @property
+    def position(self):
+        """已计入特征（含未满一帧的尾部）的下一个样本的绝对位置"""
+        return self.origin + self.frames * self.frame_size + self._carry_len
+
+    def frame_start(self, index):
+        """第 index 帧首个样本的绝对位置"""
+        return self.origin + index * self.frame_size
+
+    def _append(self, frames):
+        """计算新帧的统计量并写入环形存储"""
+        stats = frame_stats(frames, self.freqs, self._prev_positive)
+        rows = np.arange(self.frames, self.frames + len(frames)) % self.capacity
+        self._stats[rows] = stats
+        self.frames += len(frames)
+        self._prev_positive = bool(frames[-1, -1] > 0)
+
+    def push(self, samples):
+        """
+        计入新到达的音频
+
+        Args:
+            samples: 紧接 position 之后的音频样本
+        """
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        size, n, i = self.frame_size, len(samples), 0
+        if self._carry_len:
+            take = min(size - self._carry_len, n)
+            self._carry[self._carry_len:self._carry_len + take] = samples[:take]
+            self._carry_len += take
+            i = take
+            if self._carry_len < size:
+                return
+            self._append(self._carry[None, :])
+            self._carry_len = 0
+        full = (n - i) // size
+        if full:
+            self._append(samples[i:i + full * size].reshape(full, size))
+            i += full * size
+        rest = n - i
+        self._carry[:rest] = samples[i:]
+        self._carry_len = rest
+
+    def frame_range(self, start, end):
+        """
+        完全落在 [start, end) 内且仍在存储中的帧序号范围
+
+        Returns:
+            tuple: (首帧序号, 末帧序号 + 1)
+        """
+        first = -(-(start - self.origin) // self.frame_size)
+        last = (end - self.origin) // self.frame_size
+        first = max(first, self.frames - self.capacity, 0)
+        last = min(last, self.frames)
+        return first, max(first, last)
+
+    def stats(self, first, last):
+        """返回帧序号 [first, last) 的统计量"""
+        return self._stats[np.arange(first, last) % self.capacity]
+
+    def window_summary(self, start, end):
+        """
+        窗口 [start, end) 的能量（按预处理归一化）、零交叉率和频谱中心
+
+        Returns:
+            tuple: (energy, zcr, centroid)；窗口内没有完整的帧时返回 None
+        """
+        first, last = self.frame_range(start, end)
+        if last <= first:
+            return None
+        return summarize(self.stats(first, last), (last - first) * self.frame_size, normalize=True)
+
+    def speech_mask(self, start, end, thresholds):
+        """
+        窗口 [start, end) 内逐帧的语音掩码（能量按窗口峰值归一化，与窗口级判断一致）
+
+        Args:
+            start: 起始绝对位置
+            end: 结束绝对位置
+            thresholds: (silence_threshold, zcr_threshold, energy_threshold)
+
+        Returns:
+            tuple: (首帧序号, 布尔数组，True 表示该帧为语音)
+        """
+        first, last = self.frame_range(start, end)
+        return first, speech_frames(self.stats(first, last), self.frame_size, thresholds)
@@ -0,0 +1,138 @@
+"""
+幻觉内容过滤 - 模式合并为预编译的正则，重复检测线性时间完成，模式可在运行时替换
+"""
+import re
+from app.config import HALLUCINATION_PATTERNS
+
+# 全是标点符号或特殊字符的文本
+NON_LINGUISTIC = re.compile(r'^[^\w\s]*$')
+
+
+def compile_patterns(patterns):
+    """
+    编译幻觉模式
+
+    所有模式合并为一个非捕获分组的选择结构，一次扫描即可判断是否命中；命中（少见）时再逐个查找是哪个模式，
+    只用于日志。不含大小写字母的模式（如中文）单独合并且不加 IGNORECASE，
+    否则正则引擎无法使用字面前缀快速查找，长文本上会比逐个模式检测更慢。
+
+    Args:
+        patterns: 正则表达式列表
+
+    Returns:
+        tuple: (合并后的正则列表, 逐个编译的正则列表)
+
+    Raises:
+        ValueError: 某个模式无法编译，或无法放入合并的正则（如含全局内联标志）
+    """
+    individual = []
+    for pattern in patterns:
+        try:
+            compiled = re.compile(pattern, re.IGNORECASE)
+        except re.error as e:
+            raise ValueError(f"无效的幻觉模式 '{pattern}': {e}") from None
+        try:
+            # 合并时模式包在非捕获分组中，(?i) 这类全局内联标志只能出现在整个正则开头
+            re.compile(f"(?:{pattern})")
+        except re.error as e:
+            raise ValueError(
+                f"幻觉模式 '{pattern}' 无法与其他模式合并: {e}；全局内联标志请改用作用域形式，如 (?i:...)"
+            ) from None
+        individual.append(compiled)
+    plain = [pattern for pattern in patterns if pattern.lower() == pattern.upper()]
+    cased = [pattern for pattern in patterns if pattern.lower() != pattern.upper()]
+    try:
+        merged = [
+            re.compile("|".join(f"(?:{pattern})" for pattern in group), flags)
+            for group, flags in ((plain, 0), (cased, re.IGNORECASE)) if group
+        ]
+    except re.error as e:
+        raise ValueError(f"幻觉模式无法合并: {e}") from None
+    return merged, individual
+
+
+def repeated_trigram(text, limit=3):
+    """
+    查找不重叠出现次数超过 limit 的三字片段
+
+    与对每个位置调用 text.count(text[i:i+3]) 的结果相同（str.count 统计的是从左到右、
+    互不重叠的出现次数），但只扫描一遍：每个片段记录已计数的次数和下一次可以计数的位置。
+
+    Args:
+        text: 文本
+        limit: 允许的最多出现次数
+
+    Returns:
+        str: 第一个超过次数的片段，没有时为 None
+    """
+    seen = {}
+    for i in range(len(text) - 2):
+        substr = text[i:i + 3]
+        count, next_start = seen.get(substr, (0, 0))
+        if i >= next_start:
+            count += 1
+            if count > limit:
+                return substr
+            seen[substr] = (count, i + 3)
+    return None
+
+
+class HallucinationFilter:
+    """幻觉内容过滤器（所有会话共用）"""
+
+    def __init__(self, patterns):
+        """
+        初始化
+
+        Args:
+            patterns: 幻觉模式（正则表达式）列表
+        """
+        self.reload(patterns)
+
+    def reload(self, patterns):
+        """
+        替换幻觉模式；新模式先完整编译，再一次性替换，正在进行的检测不受影响
+
+        Args:
+            patterns: 新的正则表达式列表
+
+        Raises:
+            ValueError: 某个模式无法编译（此时保留原有模式）
+        """
+        patterns = list(patterns)
+        merged, individual = compile_patterns(patterns)
+        # 合并后的正则和逐个编译的正则作为一个元组整体替换，检测时读到的总是同一版本
+        self._state = (merged, individual)
+
+    @property
+    def patterns(self):
+        """当前的幻觉模式"""
+        return [compiled.pattern for compiled in self._state[1]]
+
+    def check(self, text):
+        """
+        检测文本是否为幻觉内容
+
+        Args:
+            text: 去掉首尾空白的文本
+
+        Returns:
+            tuple: (原因, 详情)，原因为 pattern / repetition / non_linguistic；未检测到时为 None
+        """
+        merged, individual = self._state
+        if any(compiled.search(text) for compiled in merged):
+            return "pattern", next(compiled.pattern for compiled in individual if compiled.search(text))
+
+        # 检查重复内容（同一三字片段出现超过 3 次）
+        if len(text) > 10:
+            substr = repeated_trigram(text)
+            if substr is not None:
+                return "repetition", substr
+
+        if NON_LINGUISTIC.match(text):
+            return "non_linguistic", text
+        return None
+
+
+# 创建全局幻觉过滤器实例
+hallucination_filter = HallucinationFilter(HALLUCINATION_PATTERNS)
@@ -0,0 +1,75 @@
+"""
+远程音频接入 - 解析客户端推送的 PCM 音频流
+"""
+import numpy as np
+from app.config import SAMPLE_RATE, WS_AUDIO_CONFIG
+
+# 支持的样本格式：名称 -> 小端字节序的 numpy 类型和归一化系数
+PCM_FORMATS = {
+    "int16": (np.dtype("<i2"), 1.0 / 32768),
+    "float32": (np.dtype("<f4"), 1.0),
+}
+
+
+def parse_stream_config(message):
+    """
+    校验客户端发送的音频流配置
+
+    Args:
+        message: config 消息，如 {"type": "config", "format": "int16", "sample_rate": 16000, "channels": 1}
+
+    Returns:
+        tuple: (配置字典, 错误信息)，校验通过时错误信息为 None
+    """
+    fmt = message.get("format", WS_AUDIO_CONFIG["default_format"])
+    if fmt not in PCM_FORMATS:
+        return None, f"不支持的样本格式: {fmt}，可选: {', '.join(PCM_FORMATS)}"
+    try:
+        sample_rate = int(message.get("sample_rate", SAMPLE_RATE))
+        channels = int(message.get("channels", 1))
+    except (TypeError, ValueError):
+        return None, "sample_rate 和 channels 必须是整数"
+    if sample_rate != SAMPLE_RATE:
+        return None, f"仅支持 {SAMPLE_RATE} Hz 采样率，收到: {sample_rate}"
+    if channels < 1:
+        return None, f"声道数无效: {channels}"
+    return {"format": fmt, "sample_rate": sample_rate, "channels": channels}, None
+
+
+def default_stream_config():
+    """未发送 config 消息时使用的默认配置"""
+    return {"format": WS_AUDIO_CONFIG["default_format"], "sample_rate": SAMPLE_RATE, "channels": 1}
+
+
+def max_frame_bytes(config):
+    """单个二进制帧允许的最大字节数"""
+    dtype, _ = PCM_FORMATS[config["format"]]
+    return int(WS_AUDIO_CONFIG["max_frame_seconds"] * SAMPLE_RATE) * dtype.itemsize * config["channels"]
+
+
+def decode_pcm(data, config):
+    """
+    将二进制 PCM 帧转换为 16kHz 单声道 float32 样本
+
+    Args:
+        data: 二进制帧（交错的多声道样本）
+        config: parse_stream_config 返回的配置
+
+    Returns:
+        tuple: (样本数组, 错误信息)，转换成功时错误信息为 None
+    """
+    dtype, scale = PCM_FORMATS[config["format"]]
+    frame_size = dtype.itemsize * config["channels"]
+    if len(data) % frame_size:
+        return None, f"帧长度 {len(data)} 不是 {frame_size} 字节的整数倍"
+    if len(data) > max_frame_bytes(config):
+        return None, f"单帧音频不能超过 {WS_AUDIO_CONFIG['max_frame_seconds']} 秒"
+
+    samples = np.frombuffer(data, dtype=dtype)
+    if config["channels"] > 1:
+        # 多声道取平均混为单声道
+        samples = samples.reshape(-1, config["channels"]).mean(axis=1)
+    samples = samples.astype(np.float32)
+    if scale != 1.0:
+        samples *= scale
+    return samples, None
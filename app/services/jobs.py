@@ -0,0 +1,391 @@
+"""
+文件转写任务 - 上传的录音文件在后台队列中转写
+"""
+import os
+import queue
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import numpy as np
+from faster_whisper.audio import decode_audio
+from app.core.logging import logger
+from app.config import SAMPLE_RATE, DEFAULT_LANGUAGE, JOB_CONFIG, VAD_CONFIG
+from app.services.whisper import whisper_service, decode_options
+from app.services.profiles import inference_profiles
+from app.services.vad import create_vad_engine, collect_speech
+from app.services.long_audio import LongAudioDecoder, plan_chunks
+
+# 支持上传的音频格式和结果格式
+AUDIO_EXTENSIONS = (".wav", ".flac", ".mp3")
+RESULT_FORMATS = ("json", "srt", "vtt")
+
+
+def _segment(start, end, text, avg_logprob):
+    """构造结果分段（时间为整段音频中的秒数）"""
+    return {
+        "start": round(start, 3),
+        "end": round(end, 3),
+        "text": text.strip(),
+        "confidence": round(float(np.exp(avg_logprob)), 3),
+    }
+
+
+def _timestamp(seconds, separator):
+    """格式化字幕时间戳 HH:MM:SS,mmm（VTT 使用小数点）"""
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+
+def format_srt(segments):
+    """
+    生成 SRT 字幕
+
+    Args:
+        segments: 分段列表，每项包含 start、end、text
+
+    Returns:
+        str: SRT 文本
+    """
+    blocks = []
+    for index, seg in enumerate(segments, 1):
+        blocks.append(f"{index}\n{_timestamp(seg['start'], ',')} --> {_timestamp(seg['end'], ',')}\n{seg['text']}\n")
+    return "\n".join(blocks)
+
+
+def format_vtt(segments):
+    """
+    生成 WebVTT 字幕
+
+    Args:
+        segments: 分段列表，每项包含 start、end、text
+
+    Returns:
+        str: VTT 文本
+    """
+    blocks = ["WEBVTT\n"]
+    for seg in segments:
+        blocks.append(f"{_timestamp(seg['start'], '.')} --> {_timestamp(seg['end'], '.')}\n{seg['text']}\n")
+    return "\n".join(blocks)
+
+
+class TranscriptionJob:
+    """一个文件转写任务：排队 -> 解码音频 -> 检测语音 -> 分块转写"""
+
+    def __init__(self, path, filename, language):
+        """
+        初始化任务
+
+        Args:
+            path: 上传文件在磁盘上的路径
+            filename: 原始文件名
+            language: 转写语言
+        """
+        self.job_id = uuid.uuid4().hex[:12]
+        self.path = path
+        self.filename = filename
+        self.language = language
+        self.status = "queued"
+        self.message = "等待处理"
+        self.duration = None
+        self.processed_seconds = 0.0
+        self.chunks = 0
+        self.segments = []
+        self.mode = None  # thread: 本进程内经 whisper_service 解码；process: 多进程长音频解码
+        self.real_time_factor = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancelled = threading.Event()
+
+    @property
+    def done(self):
+        """任务是否已结束"""
+        return self.status in ("completed", "failed", "cancelled")
+
+    @property
+    def progress(self):
+        """已处理音频占总时长的比例（0-1）"""
+        if self.status == "completed":
+            return 1.0
+        if not self.duration:
+            return 0.0
+        return min(self.processed_seconds / self.duration, 1.0)
+
+    def update(self, status, message):
+        """
+        更新任务阶段
+
+        Args:
+            status: 当前阶段
+            message: 阶段说明
+        """
+        self.status = status
+        self.message = message
+        if self.done:
+            self.finished_at = time.time()
+        logger.info(f"文件转写任务 {self.job_id}: {message}")
+
+    def snapshot(self):
+        """
+        导出任务状态
+
+        Returns:
+            dict: 任务ID、文件、阶段、进度和耗时
+        """
+        return {
+            "job_id": self.job_id,
+            "filename": self.filename,
+            "language": self.language,
+            "status": self.status,
+            "message": self.message,
+            "progress": round(self.progress, 3),
+            "duration": None if self.duration is None else round(self.duration, 3),
+            "processed_seconds": round(self.processed_seconds, 3),
+            "chunks": self.chunks,
+            "segments": len(self.segments),
+            "mode": self.mode,
+            "real_time_factor": None if self.real_time_factor is None else round(self.real_time_factor, 4),
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+    def result(self, fmt="json"):
+        """
+        导出转写结果
+
+        Args:
+            fmt: json / srt / vtt
+
+        Returns:
+            dict 或 str: json 为分段列表，srt/vtt 为字幕文本
+        """
+        if fmt == "srt":
+            return format_srt(self.segments)
+        if fmt == "vtt":
+            return format_vtt(self.segments)
+        return {"job": self.snapshot(), "text": "".join(seg["text"] for seg in self.segments),
+                "segments": self.segments}
+
+
+class JobManager:
+    """
+    文件转写任务队列
+
+    上传的文件先写入磁盘，任务进入队列后由固定数量的工作线程依次处理。每个任务
+    解码整段音频，用 VAD 引擎检测语音片段后在静音处切成若干块，各块并发提交给
+    whisper_service（由批处理调度器和模型池并行解码），结果按时间顺序合并。
+    配置了 process_workers 时，超过 process_min_seconds 的长音频改由多进程解码器处理，
+    每个进程持有独立的模型和一份 CPU 核心。
+    """
+
+    def __init__(self, config):
+        """
+        初始化任务队列
+
+        Args:
+            config: JOB_CONFIG 形式的参数
+        """
+        self.config = config
+        self.upload_dir = config["upload_dir"] or os.path.join(tempfile.gettempdir(), "whisprrt_jobs")
+        self.jobs = OrderedDict()
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._workers = []
+        self._decoder = None
+
+    def new_upload_path(self, filename):
+        """
+        为上传文件分配磁盘路径
+
+        Args:
+            filename: 原始文件名
+
+        Returns:
+            str: 保留原扩展名的唯一路径
+        """
+        os.makedirs(self.upload_dir, exist_ok=True)
+        return os.path.join(self.upload_dir, uuid.uuid4().hex + os.path.splitext(filename)[1].lower())
+
+    def _start_workers(self):
+        """首次提交任务时启动工作线程（需持有 _lock）"""
+        while len(self._workers) < max(1, int(self.config["workers"])):
+            thread = threading.Thread(target=self._worker, daemon=True)
+            thread.start()
+            self._workers.append(thread)
+
+    def submit(self, path, filename, language=None):
+        """
+        提交一个已写入磁盘的文件
+
+        Args:
+            path: 文件路径
+            filename: 原始文件名
+            language: 转写语言，默认为 DEFAULT_LANGUAGE
+
+        Returns:
+            TranscriptionJob: 新任务
+        """
+        job = TranscriptionJob(path, filename, language or DEFAULT_LANGUAGE)
+        with self._lock:
+            self.jobs[job.job_id] = job
+            # 只淘汰已结束的旧任务
+            finished = [job_id for job_id, old in self.jobs.items() if old.done]
+            for job_id in finished[:max(len(self.jobs) - self.config["history"], 0)]:
+                del self.jobs[job_id]
+            self._start_workers()
+        self._queue.put(job)
+        logger.info(f"文件转写任务已排队: {job.job_id} ({filename})")
+        return job
+
+    def get(self, job_id):
+        """按ID获取任务，不存在时返回 None"""
+        return self.jobs.get(job_id)
+
+    def list(self):
+        """列出所有任务的状态"""
+        return [job.snapshot() for job in list(self.jobs.values())]
+
+    def cancel(self, job_id):
+        """
+        取消任务：排队中的任务不再处理，进行中的任务在当前块完成后停止
+
+        Args:
+            job_id: 任务ID
+
+        Returns:
+            dict: 操作状态和消息
+        """
+        job = self.get(job_id)
+        if job is None:
+            return {"status": "error", "message": f"任务不存在: {job_id}"}
+        if job.done:
+            return {"status": "error", "message": f"任务已结束: {job.status}"}
+        job.cancelled.set()
+        return {"status": "success", "message": f"已取消任务: {job_id}"}
+
+    def _worker(self):
+        """工作线程：依次处理队列中的任务"""
+        while True:
+            job = self._queue.get()
+            try:
+                if job.cancelled.is_set():
+                    job.update("cancelled", "任务已取消")
+                else:
+                    self._run(job)
+            except Exception as e:
+                logger.error(f"文件转写任务 {job.job_id} 失败: {str(e)}")
+                job.update("failed", f"转写失败: {str(e)}")
+            finally:
+                if os.path.exists(job.path):
+                    os.remove(job.path)
+
+    def _long_audio_decoder(self):
+        """
+        获取多进程长音频解码器，首次使用或模型、推理配置档已切换时（重新）启动进程池
+
+        计算精度取自默认推理配置档（与进程内的模型池一致），线程数未在 JOB_CONFIG 中指定时也取自配置档。
+
+        Returns:
+            LongAudioDecoder: 使用当前模型的解码器
+        """
+        profile = inference_profiles.default
+        settings = (
+            whisper_service.model_name, profile.compute_type, self.config["process_threads"] or profile.cpu_threads
+        )
+        with self._lock:
+            decoder = self._decoder
+            if decoder is not None and (decoder.model_name, decoder.compute_type, decoder.cpu_threads) != settings:
+                decoder.close(wait=False)  # 已提交的块仍由旧进程完成
+                decoder = None
+            if decoder is None:
+                model_name, compute_type, cpu_threads = settings
+                decoder = LongAudioDecoder(
+                    model_name,
+                    self.config["process_workers"],
+                    cpu_threads=cpu_threads,
+                    pin_cores=self.config["pin_cores"],
+                    compute_type=compute_type,
+                )
+                self._decoder = decoder
+            return decoder
+
+    def _run(self, job):
+        """执行一个任务"""
+        job.started_at = time.time()
+        job.update("decoding", "正在解码音频")
+        audio = decode_audio(job.path, sampling_rate=SAMPLE_RATE)
+        job.duration = len(audio) / SAMPLE_RATE
+
+        job.update("detecting", "正在检测语音片段")
+        spans = create_vad_engine(VAD_CONFIG["engine"], VAD_CONFIG).speech_spans(audio)
+        chunks = plan_chunks(spans, int(self.config["chunk_seconds"] * SAMPLE_RATE), len(audio))
+        job.chunks = len(chunks)
+        # 每块的进度覆盖从上一块结束到本块结束的音频（包括跳过的静音）
+        extents = (np.diff([0] + [end for _, end, _ in chunks]) / SAMPLE_RATE).tolist()
+        silent_tail = job.duration - (chunks[-1][1] / SAMPLE_RATE if chunks else 0.0)
+
+        language = None if job.language == "auto" else job.language
+        use_processes = self.config["process_workers"] > 0 and job.duration >= self.config["process_min_seconds"]
+        job.mode = "process" if use_processes else "thread"
+        job.update("transcribing", f"正在转写 {len(chunks)} 个语音块")
+        t0 = time.perf_counter()
+        if use_processes:
+            segments = self._transcribe_processes(job, audio, chunks, extents, language)
+        else:
+            segments = self._transcribe_threads(job, audio, chunks, extents, language)
+        if job.cancelled.is_set():
+            job.update("cancelled", "任务已取消")
+            return
+        job.real_time_factor = (time.perf_counter() - t0) / job.duration if job.duration else None
+        job.processed_seconds += silent_tail
+        job.segments = sorted((seg for seg in segments if seg["text"]), key=lambda seg: seg["start"])
+        job.update("completed", f"转写完成: {len(job.segments)} 个分段")
+
+    def _transcribe_threads(self, job, audio, chunks, extents, language):
+        """在本进程中并发提交各块给 whisper_service"""
+        segments = []
+        with ThreadPoolExecutor(max_workers=max(1, int(self.config["chunk_workers"]))) as executor:
+            futures = {
+                executor.submit(self._transcribe_chunk, job, audio, chunk, language): extent
+                for chunk, extent in zip(chunks, extents)
+            }
+            for future in as_completed(futures):
+                segments.extend(future.result())
+                job.processed_seconds += futures[future]
+        return segments
+
+    def _transcribe_processes(self, job, audio, chunks, extents, language):
+        """把各块分发到多进程长音频解码器"""
+        def on_chunk(index):
+            job.processed_seconds += extents[index]
+
+        results, _ = self._long_audio_decoder().transcribe(
+            audio, chunks, language, decode_options(), on_chunk=on_chunk, cancelled=job.cancelled
+        )
+        return [_segment(start, end, text, logprob) for start, end, text, logprob in results]
+
+    @staticmethod
+    def _transcribe_chunk(job, audio, chunk, language):
+        """转写一个语音块，时间戳换算为整段音频中的时间"""
+        if job.cancelled.is_set():
+            return []
+        start, end, spans = chunk
+        samples, span_map = collect_speech(audio[start:end], spans)
+        segments, _ = whisper_service.transcribe(samples, language)
+        offset = start / SAMPLE_RATE
+        restore = (lambda t, end=False: t) if span_map is None else span_map.restore
+        return [
+            _segment(offset + restore(seg.start), offset + restore(seg.end, end=True), seg.text, seg.avg_logprob)
+            for seg in segments
+        ]
+
+
+# 创建全局任务队列
+job_manager = JobManager(JOB_CONFIG)
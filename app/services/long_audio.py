@@ -0,0 +1,186 @@
+"""
+长音频并行解码 - 在静音处切块，分发到多进程工作池，每个进程持有独立的模型和一份 CPU 核心
+
+本模块会在工作进程中导入，只依赖配置、VAD 和模型加载，不导入持有全局模型的 whisper 服务。
+"""
+import multiprocessing
+import os
+import queue
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from app.core.logging import logger
+from app.config import SAMPLE_RATE
+from app.services.model_pool import available_cores, replica_core_sets, load_model
+from app.services.vad import collect_speech
+
+# 工作进程内的模型实例（由 _init_worker 加载）
+_worker_model = None
+
+# 工作进程领取核心的等待时间（秒），进程崩溃后补上的新进程领不到时不绑定核心
+CORE_SET_TIMEOUT = 1.0
+
+
+def plan_chunks(spans, max_len, length):
+    """
+    在静音处把长音频切成不超过 max_len 的块
+
+    相邻的语音片段合并到同一块，块只在片段之间（静音处）切分；单个片段超过 max_len 时直接切分。
+
+    Args:
+        spans: 整段音频的语音片段 [(起始样本, 结束样本), ...]
+        max_len: 每块的最大样本数
+        length: 音频总样本数
+
+    Returns:
+        list: [(块起始样本, 块结束样本, 相对块开头的语音片段), ...]
+    """
+    chunks = []
+    current = []
+    for start, end in spans:
+        while end - start > max_len:
+            if current:
+                chunks.append(current)
+                current = []
+            chunks.append([(start, start + max_len)])
+            start += max_len
+        if current and end - current[0][0] > max_len:
+            chunks.append(current)
+            current = []
+        current.append((start, end))
+    if current:
+        chunks.append(current)
+    return [
+        (group[0][0], min(group[-1][1], length), [(s - group[0][0], e - group[0][0]) for s, e in group])
+        for group in chunks
+    ]
+
+
+def _init_worker(model_name, cpu_threads, compute_type, core_sets):
+    """
+    工作进程初始化：领取一份核心并加载模型
+
+    Args:
+        model_name: 模型名称
+        cpu_threads: 推理线程数
+        compute_type: 计算精度
+        core_sets: 各进程核心列表的队列，每个进程取一份；None 表示不绑定核心
+    """
+    global _worker_model
+    cores = None
+    if core_sets is not None:
+        try:
+            cores = core_sets.get(timeout=CORE_SET_TIMEOUT)
+        except queue.Empty:
+            # 原进程崩溃后由进程池补上的新进程：核心已被领完，不绑定
+            logger.warning("长音频工作进程未领到核心，不绑定核心")
+    if cores:
+        # 整个进程绑定到这份核心，CTranslate2 线程随后继承
+        os.sched_setaffinity(0, cores)
+    _worker_model = load_model(model_name, cpu_threads, compute_type)
+
+
+def _decode_chunk(samples, spans, language, options):
+    """
+    在工作进程中解码一个语音块
+
+    Args:
+        samples: 块音频
+        spans: 相对块开头的语音片段
+        language: 语言代码，None 表示自动检测
+        options: 推理参数
+
+    Returns:
+        list: [(开始时间, 结束时间, 文本, avg_logprob), ...]，时间相对块开头
+    """
+    audio, span_map = collect_speech(samples, spans)
+    segments, _ = _worker_model.transcribe(audio, language=language, vad_filter=False, **options)
+    results = []
+    for seg in segments:
+        start, end = seg.start, seg.end
+        if span_map is not None:
+            start, end = span_map.restore(start), span_map.restore(end, end=True)
+        results.append((start, end, seg.text, seg.avg_logprob))
+    return results
+
+
+class LongAudioDecoder:
+    """
+    多进程长音频解码器
+
+    启动 workers 个进程（spawn 方式，不继承父进程的模型和线程），每个进程加载自己的模型，
+    分得 cpu_threads 个线程，可选绑定到互不重叠的核心。长音频在静音处切成的块分发给
+    各进程并行解码，结果按块的顺序拼接，时间戳换算为整段音频中的时间。
+    """
+
+    def __init__(self, model_name, workers, cpu_threads=None, pin_cores=False, compute_type="int8"):
+        """
+        启动工作进程池
+
+        Args:
+            model_name: 模型名称
+            workers: 进程数
+            cpu_threads: 每个进程的推理线程数，默认平分可用核心
+            pin_cores: 是否把每个进程绑定到独立的核心（仅 Linux）
+            compute_type: 计算精度
+        """
+        self.model_name = model_name
+        self.compute_type = compute_type
+        self.workers = max(1, int(workers))
+        self.cpu_threads = cpu_threads or max(1, len(available_cores()) // self.workers)
+        context = multiprocessing.get_context("spawn")
+        core_sets = None
+        planned = replica_core_sets(self.workers, self.cpu_threads, pin_cores)
+        if any(planned):
+            core_sets = context.Queue()
+            for cores in planned:
+                core_sets.put(cores)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(model_name, self.cpu_threads, compute_type, core_sets),
+        )
+        logger.info(f"长音频解码进程池已启动: {model_name} x {self.workers} (每进程线程: {self.cpu_threads})")
+
+    def transcribe(self, audio, chunks, language, options, on_chunk=None, cancelled=None):
+        """
+        并行解码各块并按时间顺序拼接
+
+        Args:
+            audio: 整段 16kHz 音频
+            chunks: plan_chunks 返回的块
+            language: 语言代码，None 表示自动检测
+            options: 推理参数
+            on_chunk: 每完成一块时的回调 on_chunk(块序号)
+            cancelled: 可选的 threading.Event，设置后不再提交新的块
+
+        Returns:
+            tuple: (分段列表 [(开始时间, 结束时间, 文本, avg_logprob), ...], 统计信息)
+        """
+        t0 = time.perf_counter()
+        futures = {}
+        for index, (start, end, spans) in enumerate(chunks):
+            if cancelled is not None and cancelled.is_set():
+                break
+            futures[self._executor.submit(_decode_chunk, audio[start:end], spans, language, options)] = index
+        results = [None] * len(chunks)
+        for future in as_completed(futures):
+            index = futures[future]
+            offset = chunks[index][0] / SAMPLE_RATE
+            results[index] = [(offset + s, offset + e, text, logprob) for s, e, text, logprob in future.result()]
+            if on_chunk is not None:
+                on_chunk(index)
+        elapsed = time.perf_counter() - t0
+        duration = len(audio) / SAMPLE_RATE
+        segments = [seg for chunk_segments in results if chunk_segments for seg in chunk_segments]
+        return segments, {
+            "workers": self.workers,
+            "cpu_threads": self.cpu_threads,
+            "chunks": len(futures),
+            "elapsed_seconds": round(elapsed, 3),
+            "real_time_factor": round(elapsed / duration, 4) if duration else None,
+        }
+
+    def close(self, wait=True):
+        """关闭进程池（已提交的块仍会完成）"""
+        self._executor.shutdown(wait=wait)
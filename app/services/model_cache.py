@@ -0,0 +1,208 @@
+"""
+Whisper 模型缓存 - 按 LRU 和内存预算保留已加载的模型
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from app.core.logging import logger
+
+
+def resident_bytes():
+    """
+    当前进程的常驻内存（RSS）
+
+    Returns:
+        int: 字节数；平台不支持时返回 None
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class CacheEntry:
+    """缓存中的一个模型实例"""
+
+    def __init__(self, key, model, memory_bytes, load_seconds):
+        """
+        初始化缓存条目
+
+        Args:
+            key: (模型名称, 计算精度, 线程数, 副本槽位)
+            model: WhisperModel 实例
+            memory_bytes: 加载前后的常驻内存增量，无法测量时为 None
+            load_seconds: 加载耗时
+        """
+        self.key = key
+        self.model = model
+        self.memory_bytes = memory_bytes
+        self.load_seconds = load_seconds
+        self.loaded_at = time.time()
+        self.last_used = self.loaded_at
+        self.refs = 0
+        self.hits = 0
+
+    def snapshot(self):
+        """导出条目信息"""
+        name, compute_type, cpu_threads, slot = self.key
+        return {
+            "model": name,
+            "compute_type": compute_type,
+            "cpu_threads": cpu_threads,
+            "slot": slot,
+            "memory_mb": None if self.memory_bytes is None else round(self.memory_bytes / 2**20, 1),
+            "in_use": self.refs > 0,
+            "refs": self.refs,
+            "hits": self.hits,
+            "load_seconds": round(self.load_seconds, 3),
+            "loaded_at": self.loaded_at,
+            "last_used": self.last_used,
+        }
+
+
+class ModelCache:
+    """
+    进程内模型缓存
+
+    以 (模型名称, 计算精度, 线程数, 副本槽位) 为键保留 WhisperModel 实例。模型池的第 i 个副本
+    使用槽位 i，因此 K 个副本对应 K 个条目。正在被模型池使用的条目不会被淘汰；
+    总内存超过预算时，按最近最少使用的顺序淘汰未使用的条目。
+    """
+
+    def __init__(self, memory_budget_mb, loader):
+        """
+        初始化缓存
+
+        Args:
+            memory_budget_mb: 内存预算（MB），0 或 None 表示不限制
+            loader: 加载函数 loader(model_name, cpu_threads, compute_type, cores) -> WhisperModel
+        """
+        self.memory_budget = int(memory_budget_mb * 2**20) if memory_budget_mb else None
+        self._loader = loader
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()  # 串行加载，使常驻内存增量能对应到单个模型
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(model_name, compute_type, cpu_threads, slot=0):
+        """构造缓存键"""
+        return (model_name, compute_type, int(cpu_threads), int(slot))
+
+    def __contains__(self, key):
+        """键是否已在缓存中"""
+        return key in self._entries
+
+    @property
+    def used_bytes(self):
+        """缓存条目的内存总量（无法测量的条目不计入）"""
+        return sum(entry.memory_bytes or 0 for entry in list(self._entries.values()))
+
+    def _take(self, key):
+        """命中时增加引用并移到 LRU 队尾（需持有 _lock）"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry.refs += 1
+            entry.hits += 1
+            entry.last_used = time.time()
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return entry
+
+    def acquire(self, model_name, compute_type, cpu_threads, slot=0, cores=None):
+        """
+        获取模型实例，未缓存时加载；调用方用完后需调用 release
+
+        Args:
+            model_name: 模型名称
+            compute_type: 计算精度
+            cpu_threads: 推理线程数
+            slot: 副本槽位
+            cores: 加载时绑定的核心列表
+
+        Returns:
+            WhisperModel: 模型实例
+        """
+        key = self.make_key(model_name, compute_type, cpu_threads, slot)
+        with self._lock:
+            entry = self._take(key)
+        if entry is not None:
+            return entry.model
+
+        with self._load_lock:
+            with self._lock:
+                entry = self._take(key)  # 等待期间可能已被其他线程加载
+            if entry is not None:
+                return entry.model
+            before = resident_bytes()
+            t0 = time.perf_counter()
+            model = self._loader(model_name, cpu_threads, compute_type, cores)
+            load_seconds = time.perf_counter() - t0
+            after = resident_bytes()
+            memory = max(after - before, 0) if before is not None and after is not None else None
+            entry = CacheEntry(key, model, memory, load_seconds)
+            entry.refs = 1
+            with self._lock:
+                self.misses += 1
+                self._entries[key] = entry
+                self._evict()
+        size = "未知" if memory is None else f"{memory / 2**20:.0f}MB"
+        logger.info(f"模型已加载并缓存: {key} (内存: {size}, 耗时: {load_seconds:.1f}s)")
+        return model
+
+    def release(self, model_name, compute_type, cpu_threads, slot=0):
+        """
+        释放一次引用，条目保留在缓存中直到被淘汰
+
+        Args:
+            model_name: 模型名称
+            compute_type: 计算精度
+            cpu_threads: 推理线程数
+            slot: 副本槽位
+        """
+        key = self.make_key(model_name, compute_type, cpu_threads, slot)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.refs > 0:
+                entry.refs -= 1
+                entry.last_used = time.time()
+            self._evict()
+
+    def _evict(self):
+        """超出内存预算时淘汰最久未使用且未被引用的条目（需持有 _lock）"""
+        if self.memory_budget is None:
+            return
+        for key in list(self._entries):
+            if self.used_bytes <= self.memory_budget:
+                return
+            entry = self._entries[key]
+            if entry.refs > 0:
+                continue
+            del self._entries[key]
+            entry.model = None
+            self.evictions += 1
+            logger.info(f"模型缓存超出预算，已淘汰: {key}")
+        if self.used_bytes > self.memory_budget:
+            logger.warning("使用中的模型已超出缓存内存预算")
+
+    def snapshot(self):
+        """
+        导出缓存状态
+
+        Returns:
+            dict: 预算、用量、命中统计和各常驻模型
+        """
+        with self._lock:
+            entries = [entry.snapshot() for entry in reversed(self._entries.values())]
+        return {
+            "memory_budget_mb": None if self.memory_budget is None else round(self.memory_budget / 2**20, 1),
+            "memory_used_mb": round(self.used_bytes / 2**20, 1),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "resident": entries,
+        }
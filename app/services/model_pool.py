@@ -0,0 +1,284 @@
+"""
+Whisper 模型池 - 多个模型副本，按负载分发推理
+"""
+import contextlib
+import os
+import threading
+import time
+import numpy as np
+from faster_whisper import WhisperModel
+from app.core.logging import logger
+from app.config import SAMPLE_RATE
+from app.services.tracing import instrument_model
+
+
+def available_cores():
+    """
+    当前进程可用的 CPU 核心
+
+    Returns:
+        list: 核心编号（按 CPU 亲和性；不支持时按 CPU 数量）
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def plan_core_sets(replicas, cpu_threads, cores=None):
+    """
+    为每个副本分配互不重叠的 CPU 核心
+
+    Args:
+        replicas: 副本数
+        cpu_threads: 每个副本的线程数
+        cores: 可用核心列表，默认取当前进程的 CPU 亲和性
+
+    Returns:
+        list: 每个副本的核心列表；核心不足以互不重叠时返回 None
+    """
+    cores = available_cores() if cores is None else list(cores)
+    if replicas * cpu_threads > len(cores):
+        return None
+    return [cores[i * cpu_threads:(i + 1) * cpu_threads] for i in range(replicas)]
+
+
+def replica_core_sets(replicas, cpu_threads, pin_cores=False):
+    """
+    计算模型池各副本绑定的核心
+
+    Args:
+        replicas: 副本数
+        cpu_threads: 每个副本的线程数
+        pin_cores: 是否绑定核心
+
+    Returns:
+        list: 每个副本的核心列表，不绑定的副本为 None
+    """
+    core_sets = [None] * replicas
+    if pin_cores:
+        if not hasattr(os, "sched_setaffinity"):
+            logger.warning("当前平台不支持设置 CPU 亲和性，副本不绑定核心")
+        else:
+            planned = plan_core_sets(replicas, cpu_threads)
+            if planned is None:
+                logger.warning(f"可用核心不足以为 {replicas} 个副本各分配 {cpu_threads} 个核心，副本不绑定核心")
+            else:
+                core_sets = planned
+    return core_sets
+
+
+def load_model(model_name, cpu_threads=8, compute_type="int8", cores=None):
+    """
+    加载一个 WhisperModel，可选绑定到指定 CPU 核心
+
+    CTranslate2 的工作线程在构造模型时创建并继承创建线程的 CPU 亲和性，
+    因此在独立线程中先设置亲和性再构造模型，不影响调用方线程。
+
+    Args:
+        model_name: 模型名称
+        cpu_threads: 推理线程数
+        compute_type: 计算精度
+        cores: 绑定的核心列表，None 表示不绑定
+
+    Returns:
+        WhisperModel: 模型实例
+    """
+    def build():
+        # 编码、解码方法加上追踪，被采样的窗口可以看到两者各自的耗时
+        return instrument_model(WhisperModel(
+            model_name,
+            device="cpu",
+            compute_type=compute_type,
+            cpu_threads=cpu_threads,
+            num_workers=1
+        ))
+
+    if not cores:
+        return build()
+
+    result = {}
+
+    def pinned_build():
+        try:
+            os.sched_setaffinity(0, cores)
+            result["model"] = build()
+        except Exception as e:
+            result["error"] = e
+
+    thread = threading.Thread(target=pinned_build)
+    thread.start()
+    thread.join()
+    if "error" in result:
+        raise result["error"]
+    return result["model"]
+
+
+class ModelReplica:
+    """模型池中的一个副本及其负载统计"""
+
+    def __init__(self, index, model, cpu_threads, cores=None):
+        """
+        初始化副本
+
+        Args:
+            index: 副本编号
+            model: WhisperModel 实例
+            cpu_threads: 推理线程数
+            cores: 绑定的核心列表
+        """
+        self.index = index
+        self.model = model
+        self.cpu_threads = cpu_threads
+        self.cores = cores
+        self.inflight = 0
+        self.processed = 0
+        self.busy_seconds = 0.0
+
+    def snapshot(self):
+        """导出副本负载统计"""
+        return {
+            "index": self.index,
+            "cpu_threads": self.cpu_threads,
+            "cores": self.cores,
+            "inflight": self.inflight,
+            "processed": self.processed,
+            "busy_seconds": round(self.busy_seconds, 3),
+        }
+
+
+class ModelPool:
+    """
+    Whisper 模型池
+
+    加载 K 个模型副本，每个副本有独立的 CPU 线程预算，可选绑定到互不重叠的核心。
+    acquire() 把推理分发给当前负载最小的副本。传入 ModelCache 时副本从缓存获取，
+    关闭模型池只释放引用，模型留在缓存中供下次切换直接使用。
+    """
+
+    def __init__(self, model_name, replicas=1, cpu_threads=8, pin_cores=False, compute_type="int8", cache=None):
+        """
+        加载模型池
+
+        Args:
+            model_name: 模型名称
+            replicas: 副本数 K
+            cpu_threads: 每个副本的推理线程数
+            pin_cores: 是否把每个副本绑定到独立的核心（仅 Linux）
+            compute_type: 计算精度
+            cache: 可选的 ModelCache
+        """
+        core_sets = replica_core_sets(max(1, int(replicas)), cpu_threads, pin_cores)
+        self.model_name = model_name
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.cache = cache
+        self.replicas = []
+        try:
+            for index, cores in enumerate(core_sets):
+                if cache is not None:
+                    model = cache.acquire(model_name, compute_type, cpu_threads, index, cores)
+                else:
+                    model = load_model(model_name, cpu_threads, compute_type, cores)
+                self.replicas.append(ModelReplica(index, model, cpu_threads, cores))
+                logger.info(f"模型副本 {index} 已就绪: {model_name} (线程: {cpu_threads}, 核心: {cores or '不绑定'})")
+        except Exception:
+            self._release_replicas()
+            raise
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """返回副本数"""
+        return len(self.replicas)
+
+    @property
+    def model(self):
+        """第一个副本的模型（兼容只使用单个模型的调用方）"""
+        return self.replicas[0].model
+
+    @contextlib.contextmanager
+    def acquire(self):
+        """
+        选出负载最小的副本用于一次推理
+
+        Yields:
+            ModelReplica: 进行中请求最少的副本，相同时选处理量较少的；
+            模型池已关闭（模型已切换）时为 None
+        """
+        with self._lock:
+            if self.closed:
+                replica = None
+            else:
+                replica = min(self.replicas, key=lambda r: (r.inflight, r.processed))
+                replica.inflight += 1
+        if replica is None:
+            yield None
+            return
+        t0 = time.perf_counter()
+        try:
+            yield replica
+        finally:
+            with self._lock:
+                replica.inflight -= 1
+                replica.processed += 1
+                replica.busy_seconds += time.perf_counter() - t0
+
+    def warm_up(self, language=None):
+        """
+        用一段静音对每个副本做一次解码预热（首次推理会初始化内部缓存和线程）
+
+        Args:
+            language: 预热使用的语言代码
+        """
+        dummy = np.zeros(SAMPLE_RATE, dtype=np.float32)
+        for replica in self.replicas:
+            segments, _ = replica.model.transcribe(dummy, language=language, beam_size=1, vad_filter=False)
+            list(segments)
+
+    def busy(self):
+        """是否还有进行中的推理"""
+        with self._lock:
+            return any(replica.inflight for replica in self.replicas)
+
+    def close(self, timeout=None):
+        """
+        停止分配新的推理，等待进行中的推理结束后释放所有副本
+
+        Args:
+            timeout: 最长等待时间（秒），超时后不再等待，由最后的引用释放
+
+        Returns:
+            bool: 是否在超时前空闲并已释放
+        """
+        with self._lock:
+            self.closed = True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.busy():
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.05)
+        self._release_replicas()
+        return True
+
+    def _release_replicas(self):
+        """释放所有副本（有缓存时归还引用）"""
+        for replica in self.replicas:
+            if self.cache is not None:
+                self.cache.release(self.model_name, self.compute_type, self.cpu_threads, replica.index)
+            replica.model = None
+        self.replicas = []
+
+    def snapshot(self):
+        """
+        导出模型池状态
+
+        Returns:
+            dict: 模型名称、副本数和各副本负载
+        """
+        return {
+            "model": self.model_name,
+            "compute_type": self.compute_type,
+            "closed": self.closed,
+            "size": len(self.replicas),
+            "replicas": [replica.snapshot() for replica in self.replicas],
+        }
@@ -0,0 +1,317 @@
+"""
+转写流水线 - 阶段间的有界队列与各阶段指标
+"""
+import threading
+import time
+from collections import deque
+from typing import NamedTuple, Optional
+import numpy as np
+
+# 队列满时支持的过载策略
+OVERLOAD_POLICIES = ("drop_oldest", "merge", "downgrade")
+
+
+class AudioWindow(NamedTuple):
+    """
+    待解码的音频窗口
+
+    start 为窗口首个样本在环形缓冲区中的绝对位置，captured_at 为该样本写入环形缓冲区的时间；samples 为 None
+    表示语音结束标记（流式模式据此提交剩余的部分结果）。spans 为 VAD
+    检测到的语音片段（相对窗口开头的样本区间），None 表示整个窗口送入解码。
+    trace 为被采样窗口的追踪（见 app/services/tracing.py），未采样时为 None。
+    """
+    start: int
+    samples: Optional[np.ndarray]
+    captured_at: float
+    enqueued_at: float = 0.0
+    spans: Optional[list] = None
+    trace: Optional[object] = None
+
+
+class DraftWindow(NamedTuple):
+    """
+    已推送草稿、等待当前模型重新解码的窗口（推测式双模型转写）
+
+    draft_id 与推送给客户端的 draft 事件对应；audio 为送入解码的语音（已按 VAD 片段拼接），
+    span_map 把解码时间还原为窗口内时间，window_start 为窗口相对转写开始的秒数；
+    segments 为草稿中通过质量验证的分段 [(文本, 置信度, 相对转写开始的秒数)]，校正积压时直接提交。
+    """
+    draft_id: int
+    audio: np.ndarray
+    span_map: Optional[object]
+    window_start: float
+    segments: list
+    captured_at: float
+    enqueued_at: float = 0.0
+
+
+class StageMetrics:
+    """单个流水线阶段的处理计数和耗时统计"""
+
+    def __init__(self, window=256):
+        """
+        初始化阶段指标
+
+        Args:
+            window: 计算分位数时保留的最近样本数
+        """
+        self.processed = 0
+        self.total_seconds = 0.0
+        self._latencies = deque(maxlen=window)
+        self._waits = deque(maxlen=window)
+
+    def record(self, seconds, wait=None):
+        """
+        记录一次处理耗时
+
+        Args:
+            seconds: 本阶段处理耗时
+            wait: 在上游队列中的等待时间（可选）
+        """
+        self.processed += 1
+        self.total_seconds += seconds
+        self._latencies.append(seconds)
+        if wait is not None:
+            self._waits.append(wait)
+
+    @staticmethod
+    def _summary(values):
+        """计算耗时分位数（毫秒）"""
+        if not values:
+            return {"p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+        arr = np.fromiter(values, dtype=np.float64) * 1000
+        return {
+            "p50_ms": round(float(np.percentile(arr, 50)), 3),
+            "p95_ms": round(float(np.percentile(arr, 95)), 3),
+            "max_ms": round(float(arr.max()), 3),
+        }
+
+    def snapshot(self):
+        """
+        导出当前指标
+
+        Returns:
+            dict: 处理次数、平均耗时及最近样本的分位数
+        """
+        result = {
+            "processed": self.processed,
+            "avg_ms": round(self.total_seconds / self.processed * 1000, 3) if self.processed else 0.0,
+            "latency": self._summary(list(self._latencies)),
+        }
+        if self._waits:
+            result["queue_wait"] = self._summary(list(self._waits))
+        return result
+
+
+class BoundedStageQueue:
+    """
+    阶段间的有界队列
+
+    队列满时按过载策略处理新窗口：
+    - drop_oldest: 丢弃最早的窗口
+    - merge: 将新窗口并入队尾窗口（相邻窗口拼接，重叠窗口以新窗口为准）
+    - downgrade: 标记过载，解码阶段改用轻量模型，直到队列回落到一半以下；
+      若仍然写满则丢弃最早的窗口
+    """
+
+    def __init__(self, maxsize, policy="drop_oldest", max_merge_samples=None):
+        """
+        初始化有界队列
+
+        Args:
+            maxsize: 队列容量
+            policy: 过载策略
+            max_merge_samples: merge 策略下合并后窗口的最大样本数
+        """
+        if policy not in OVERLOAD_POLICIES:
+            raise ValueError(f"不支持的过载策略: {policy}")
+        self.maxsize = max(1, int(maxsize))
+        self.policy = policy
+        self.max_merge_samples = max_merge_samples
+        self.dropped = 0
+        self.merged = 0
+        self.overloaded = False
+        self._items = deque()
+        self._cond = threading.Condition(threading.Lock())
+
+    def __len__(self):
+        """返回当前队列深度"""
+        return len(self._items)
+
+    def _merge_tail(self, window):
+        """尝试将窗口并入队尾窗口，成功返回 True"""
+        tail = self._items[-1]
+        if tail.samples is None or window.samples is None:
+            return False
+        offset = window.start - tail.start
+        if offset < 0 or offset > len(tail.samples):
+            return False
+        merged_len = offset + len(window.samples)
+        if self.max_merge_samples and merged_len > self.max_merge_samples:
+            return False
+        samples = np.concatenate((tail.samples[:offset], window.samples))
+        spans = None
+        if tail.spans is not None and window.spans is not None:
+            spans = [(a, min(b, offset)) for a, b in tail.spans if a < offset]
+            spans += [(a + offset, b + offset) for a, b in window.spans]
+        self._items[-1] = tail._replace(samples=samples, spans=spans)
+        return True
+
+    def put(self, window):
+        """
+        放入一个窗口，队列满时按过载策略处理
+
+        Args:
+            window: AudioWindow 实例
+        """
+        window = window._replace(enqueued_at=time.time())
+        with self._cond:
+            if len(self._items) >= self.maxsize:
+                if self.policy == "merge" and self._merge_tail(window):
+                    self.merged += 1
+                    self._cond.notify()
+                    return
+                if self.policy == "downgrade":
+                    self.overloaded = True
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(window)
+            if self.policy == "downgrade" and len(self._items) >= self.maxsize:
+                self.overloaded = True
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """
+        取出最早的窗口
+
+        Args:
+            timeout: 超时时间（秒）
+
+        Returns:
+            AudioWindow: 窗口，超时返回 None
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items, timeout):
+                return None
+            window = self._items.popleft()
+            if self.overloaded and len(self._items) <= self.maxsize // 2:
+                self.overloaded = False
+            self._cond.notify_all()  # 唤醒等待空位的生产者
+            return window
+
+    def wait_for_room(self, timeout=None):
+        """
+        等待队列有空位（生产者不希望按过载策略丢弃窗口时使用）
+
+        Args:
+            timeout: 超时时间（秒）
+
+        Returns:
+            bool: 是否有空位
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: len(self._items) < self.maxsize, timeout)
+
+    def clear(self):
+        """清空队列"""
+        with self._cond:
+            self._items.clear()
+            self.overloaded = False
+            self._cond.notify_all()
+
+    def snapshot(self):
+        """
+        导出队列状态
+
+        Returns:
+            dict: 深度、容量、策略和丢弃/合并计数
+        """
+        return {
+            "depth": len(self._items),
+            "capacity": self.maxsize,
+            "policy": self.policy,
+            "overloaded": self.overloaded,
+            "dropped": self.dropped,
+            "merged": self.merged,
+        }
+
+
+class CorrectionQueue:
+    """
+    草稿到校正阶段的有界队列
+
+    队列满时不丢弃窗口：最早的窗口被移出并交还给调用方，由调用方把它的草稿直接作为最终结果提交，
+    使校正跟不上时草稿到最终结果的延迟仍然有界。
+    """
+
+    def __init__(self, maxsize):
+        """
+        初始化
+
+        Args:
+            maxsize: 队列容量
+        """
+        self.maxsize = max(1, int(maxsize))
+        self.promoted = 0  # 因队列满未经校正即提交的窗口数
+        self._items = deque()
+        self._cond = threading.Condition(threading.Lock())
+
+    def __len__(self):
+        """返回当前队列深度"""
+        return len(self._items)
+
+    def put(self, window):
+        """
+        放入一个窗口
+
+        Args:
+            window: DraftWindow 实例
+
+        Returns:
+            DraftWindow: 队列满时被移出的最早窗口，否则为 None
+        """
+        window = window._replace(enqueued_at=time.time())
+        evicted = None
+        with self._cond:
+            if len(self._items) >= self.maxsize:
+                evicted = self._items.popleft()
+                self.promoted += 1
+            self._items.append(window)
+            self._cond.notify()
+        return evicted
+
+    def get(self, timeout=None):
+        """
+        取出最早的窗口
+
+        Args:
+            timeout: 超时时间（秒）
+
+        Returns:
+            DraftWindow: 窗口，超时返回 None
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items, timeout):
+                return None
+            return self._items.popleft()
+
+    def drain(self):
+        """
+        取出所有剩余窗口
+
+        Returns:
+            list: DraftWindow 列表（按放入顺序）
+        """
+        with self._cond:
+            items = list(self._items)
+            self._items.clear()
+            return items
+
+    def snapshot(self):
+        """
+        导出队列状态
+
+        Returns:
+            dict: 深度、容量和直接提交的窗口数
+        """
+        return {"depth": len(self._items), "capacity": self.maxsize, "promoted": self.promoted}
@@ -0,0 +1,165 @@
+"""
+推理配置档 - 计算精度、推理线程数、beam 搜索和 VAD 参数的命名组合，会话按名称选择
+"""
+import json
+import os
+from typing import NamedTuple
+from app.core.logging import logger
+from app.config import INFERENCE_PROFILES, INFERENCE_PROFILE, MODEL_POOL_CONFIG, VAD_CONFIG
+from app.services.model_pool import available_cores
+
+# CPU 上可用的 CTranslate2 计算精度
+COMPUTE_TYPES = ("int8", "int8_float32", "int16", "float32")
+
+# 覆盖配置档的 JSON 文件路径（环境变量）
+PROFILES_FILE_ENV = "WHISPRRT_PROFILES_FILE"
+
+
+class InferenceProfile(NamedTuple):
+    """一个推理配置档（cpu_threads 已按 CPU 亲和性解析为具体数值）"""
+    name: str
+    compute_type: str
+    cpu_threads: int
+    beam_size: int
+    best_of: int
+    vad: dict  # 完整的 VAD_CONFIG 形式参数
+
+    def snapshot(self):
+        """导出为字典"""
+        return self._asdict()
+
+
+def affinity_threads(replicas=1):
+    """
+    按 CPU 亲和性计算每个模型副本的推理线程数
+
+    Args:
+        replicas: 模型副本数
+
+    Returns:
+        int: 可用核心数 / 副本数，至少为 1
+    """
+    return max(1, len(available_cores()) // max(1, int(replicas)))
+
+
+def build_profile(name, settings, replicas=1):
+    """
+    校验配置并创建配置档
+
+    Args:
+        name: 配置档名称
+        settings: INFERENCE_PROFILES 中的一项
+        replicas: 模型副本数，用于解析 cpu_threads 为 None 的情况
+
+    Returns:
+        InferenceProfile: 配置档
+
+    Raises:
+        ValueError: 参数无效
+    """
+    compute_type = settings.get("compute_type")
+    if compute_type not in COMPUTE_TYPES:
+        raise ValueError(f"配置档 {name}: 不支持的计算精度 {compute_type}，可选 {', '.join(COMPUTE_TYPES)}")
+    values = {}
+    for key in ("cpu_threads", "beam_size", "best_of"):
+        value = settings.get(key)
+        if key == "cpu_threads" and value is None:
+            value = affinity_threads(replicas)
+        if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+            raise ValueError(f"配置档 {name}: {key} 必须为正整数")
+        values[key] = value
+    vad = settings.get("vad") or {}
+    unknown = sorted(set(vad) - set(VAD_CONFIG))
+    if unknown:
+        raise ValueError(f"配置档 {name}: 未知的 VAD 参数 {', '.join(unknown)}")
+    return InferenceProfile(name, compute_type, vad={**VAD_CONFIG, **vad}, **values)
+
+
+def load_profiles(profiles=None, path=None):
+    """
+    读取配置档，再用 JSON 文件中的项覆盖（同名配置档按字段合并，新名称以 balanced 为基础）
+
+    Args:
+        profiles: 配置档定义，默认为 INFERENCE_PROFILES
+        path: 覆盖文件路径，默认取环境变量 WHISPRRT_PROFILES_FILE
+
+    Returns:
+        dict: {名称: 配置档定义}
+
+    Raises:
+        ValueError: 覆盖文件无法读取或格式错误
+    """
+    merged = {name: dict(settings) for name, settings in (profiles or INFERENCE_PROFILES).items()}
+    path = path or os.environ.get(PROFILES_FILE_ENV)
+    if not path:
+        return merged
+    try:
+        with open(path, encoding="utf-8") as f:
+            overrides = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"无法读取推理配置档文件 {path}: {e}") from None
+    if not isinstance(overrides, dict) or not all(isinstance(v, dict) for v in overrides.values()):
+        raise ValueError(f"推理配置档文件 {path} 应为 {{名称: {{参数: 值}}}} 形式的 JSON 对象")
+    for name, settings in overrides.items():
+        merged[name] = {**merged.get(name, merged.get("balanced", {})), **settings}
+    logger.info(f"已从 {path} 加载 {len(overrides)} 个推理配置档")
+    return merged
+
+
+class ProfileRegistry:
+    """推理配置档（所有会话共用，启动时加载）"""
+
+    def __init__(self, profiles, default, replicas=1):
+        """
+        初始化
+
+        Args:
+            profiles: {名称: 配置档定义}
+            default: 默认配置档名称
+            replicas: 模型副本数
+
+        Raises:
+            ValueError: 配置档无效或默认配置档不存在
+        """
+        self._profiles = {name: build_profile(name, settings, replicas) for name, settings in profiles.items()}
+        if default not in self._profiles:
+            raise ValueError(f"默认推理配置档不存在: {default}，可选 {', '.join(self._profiles)}")
+        self.default = self._profiles[default]
+
+    def __contains__(self, name):
+        """配置档是否存在"""
+        return name in self._profiles
+
+    def get(self, name=None):
+        """
+        按名称获取配置档
+
+        Args:
+            name: 配置档名称，None 为默认配置档
+
+        Returns:
+            InferenceProfile: 配置档，不存在时返回 None
+        """
+        if name is None:
+            return self.default
+        return self._profiles.get(name)
+
+    def names(self):
+        """所有配置档名称"""
+        return list(self._profiles)
+
+    def snapshot(self):
+        """
+        导出所有配置档
+
+        Returns:
+            dict: 默认配置档名称和各配置档参数
+        """
+        return {
+            "default": self.default.name,
+            "profiles": {name: profile.snapshot() for name, profile in self._profiles.items()},
+        }
+
+
+# 创建全局推理配置档实例
+inference_profiles = ProfileRegistry(load_profiles(), INFERENCE_PROFILE, MODEL_POOL_CONFIG["replicas"])
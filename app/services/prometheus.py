@@ -0,0 +1,270 @@
+"""
+Prometheus 指标 - 转写热路径上的计数器和直方图，以文本格式在 /metrics 导出
+
+写入不加锁：每个线程写自己的分片（单一写入者，不存在竞争），导出时再把各分片求和；
+已结束线程的分片在导出时并入汇总分片，分片数量不会随会话启停无限增长。
+"""
+import bisect
+import math
+import threading
+
+# 导出格式的 Content-Type
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value):
+    """转义标签值"""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    """格式化标签，如 {model="tiny",language="zh"}"""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)] + list(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    """格式化样本值"""
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """指标基类：按线程分片存储 {标签值元组: 数据}"""
+
+    kind = None
+
+    def __init__(self, name, documentation, labels=()):
+        """
+        初始化
+
+        Args:
+            name: 指标名
+            documentation: HELP 说明
+            labels: 标签名
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._local = threading.local()
+        self._shards = []  # [(线程, 分片)]
+        self._retired = {}  # 已结束线程的分片汇总
+        self._lock = threading.Lock()  # 只在线程首次写入和导出时使用
+
+    def _shard(self):
+        """当前线程的分片，首次写入时注册"""
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def _new(self):
+        """新标签组合的初始数据"""
+        raise NotImplementedError
+
+    @staticmethod
+    def _merge(total, data):
+        """把一个分片的数据累加到汇总中"""
+        for i, value in enumerate(data):
+            total[i] += value
+
+    def collect(self):
+        """
+        汇总所有分片
+
+        Returns:
+            dict: {标签值元组: 数据列表}
+        """
+        with self._lock:
+            live = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    live.append((thread, shard))
+                else:
+                    for key, data in shard.copy().items():
+                        self._merge(self._retired.setdefault(key, self._new()), list(data))
+            self._shards = live
+            totals = {key: list(data) for key, data in self._retired.items()}
+            shards = [shard for _, shard in live]
+        for shard in shards:
+            for key, data in shard.copy().items():
+                self._merge(totals.setdefault(key, self._new()), list(data))
+        return totals
+
+
+class Counter(_Metric):
+    """只增不减的计数器"""
+
+    kind = "counter"
+
+    def _new(self):
+        return [0]
+
+    def inc(self, *labels, amount=1):
+        """
+        计数增加
+
+        Args:
+            *labels: 按顺序给出的标签值
+            amount: 增加量
+        """
+        shard = self._shard()
+        data = shard.get(labels)
+        if data is None:
+            data = shard[labels] = self._new()
+        data[0] += amount
+
+    def render(self):
+        """导出为文本格式的样本行"""
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(data[0])}"
+                for key, data in sorted(self.collect().items())]
+
+
+class Histogram(_Metric):
+    """直方图：各桶计数、总和与次数"""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labels=(), buckets=()):
+        """
+        初始化
+
+        Args:
+            name: 指标名
+            documentation: HELP 说明
+            labels: 标签名
+            buckets: 递增的桶上界（不含 +Inf）
+        """
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+
+    def _new(self):
+        # 各桶（非累计）计数、+Inf 桶计数、总和、次数
+        return [0] * (len(self.buckets) + 1) + [0.0, 0]
+
+    def observe(self, value, *labels):
+        """
+        记录一个观测值
+
+        Args:
+            value: 观测值
+            *labels: 按顺序给出的标签值
+        """
+        shard = self._shard()
+        data = shard.get(labels)
+        if data is None:
+            data = shard[labels] = self._new()
+        data[bisect.bisect_left(self.buckets, value)] += 1
+        data[-2] += value
+        data[-1] += 1
+
+    def render(self):
+        """导出为文本格式的样本行（桶计数为累计值）"""
+        lines = []
+        for key, data in sorted(self.collect().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), data):
+                cumulative += count
+                le = f'le="{_format_value(float(bound))}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, (le,))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(data[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {data[-1]}")
+        return lines
+
+
+class Registry:
+    """指标注册表：导出时依次输出各指标，另可注册在导出时采集的瞬时值（gauge）"""
+
+    def __init__(self):
+        """初始化"""
+        self._metrics = []
+        self._gauges = []
+
+    def counter(self, name, documentation, labels=()):
+        """创建并注册计数器"""
+        metric = Counter(name, documentation, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, documentation, labels=(), buckets=()):
+        """创建并注册直方图"""
+        metric = Histogram(name, documentation, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def gauge(self, name, documentation, labels, collect):
+        """
+        注册导出时才采集的瞬时值
+
+        Args:
+            name: 指标名
+            documentation: HELP 说明
+            labels: 标签名
+            collect: 无参函数，返回 [(标签值元组, 数值), ...]
+        """
+        self._gauges.append((name, documentation, tuple(labels), collect))
+
+    def render(self):
+        """
+        导出所有指标
+
+        Returns:
+            str: Prometheus 文本格式
+        """
+        lines = []
+        for metric in self._metrics:
+            lines += [f"# HELP {metric.name} {metric.documentation}", f"# TYPE {metric.name} {metric.kind}"]
+            lines += metric.render()
+        for name, documentation, labels, collect in self._gauges:
+            lines += [f"# HELP {name} {documentation}", f"# TYPE {name} gauge"]
+            lines += [f"{name}{_format_labels(labels, key)} {_format_value(value)}" for key, value in collect()]
+        return "\n".join(lines) + "\n"
+
+
+# 全局注册表和转写热路径上的指标（标签均含模型和语言）
+registry = Registry()
+LABELS = ("model", "language")
+
+capture_to_text_seconds = registry.histogram(
+    "whisprrt_capture_to_text_seconds", "窗口首个样本写入环形缓冲区到转写结果推送的延迟", LABELS,
+    (0.1, 0.25, 0.5, 1, 2, 3, 5, 8, 13, 20, 30)
+)
+decode_seconds = registry.histogram(
+    "whisprrt_decode_seconds", "每个窗口的解码耗时", LABELS,
+    (0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 16)
+)
+real_time_factor = registry.histogram(
+    "whisprrt_real_time_factor", "每个窗口的实时率（解码耗时 / 音频时长）", LABELS,
+    (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 1.5, 2, 4)
+)
+vad_windows = registry.counter(
+    "whisprrt_vad_windows_total", "特征/VAD 阶段处理的窗口数，result 为 speech（送入解码）或 skipped（静音跳过）",
+    LABELS + ("result",)
+)
+vad_audio_seconds = registry.counter(
+    "whisprrt_vad_audio_seconds_total", "特征/VAD 阶段检查的音频时长，result 为 speech（送入解码）或 skipped（未送入解码）",
+    LABELS + ("result",)
+)
+rejected_segments = registry.counter(
+    "whisprrt_rejected_segments_total",
+    "未通过质量验证的分段，reason 为 pattern / repetition / non_linguistic / low_confidence / too_short",
+    LABELS + ("reason",)
+)
+fan_out_seconds = registry.histogram(
+    "whisprrt_websocket_fan_out_seconds", "一条事件放入所有 WebSocket 客户端发送队列的耗时", LABELS,
+    (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.1)
+)
+capture_to_draft_seconds = registry.histogram(
+    "whisprrt_capture_to_draft_seconds", "推测式转写中窗口首个样本写入环形缓冲区到草稿推送的延迟（model 为草稿模型）", LABELS,
+    (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 2, 4)
+)
+corrections = registry.counter(
+    "whisprrt_corrections_total",
+    "推测式转写中完成校正的窗口，result 为 changed（文本被修改）/ unchanged / promoted（积压时未经校正直接提交）",
+    LABELS + ("result",)
+)
@@ -0,0 +1,108 @@
+"""
+转写记录全文检索 - 中日韩文字按字二元组（bigram）切分，配合 SQLite FTS5 倒排索引
+"""
+import html
+import re
+
+# 中日韩文字（汉字、假名、韩文）连续片段，以及其他语言的单词
+CJK_RANGES = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff"
+TOKEN_PATTERN = re.compile(f"([{CJK_RANGES}]+)|([^\\W_{CJK_RANGES}]+)")
+
+
+def _cjk_grams(run):
+    """
+    中日韩文字片段切分为相邻的二元组，末尾补一个单字
+
+    "会议纪要" -> ["会议", "议纪", "纪要", "要"]：任意子串对应连续的若干个二元组，
+    末尾的单字让只出现在片段末尾的字也能被单字查询匹配。
+    """
+    return [run[i:i + 2] for i in range(len(run) - 1)] + [run[-1]]
+
+
+def index_tokens(text):
+    """
+    把转写文本转换为写入 FTS5 索引的词序列
+
+    Args:
+        text: 转写文本
+
+    Returns:
+        str: 空格分隔的词（FTS5 unicode61 分词器按空格切分）
+    """
+    tokens = []
+    for cjk, word in TOKEN_PATTERN.findall(text.lower()):
+        if cjk:
+            tokens.extend(_cjk_grams(cjk))
+        else:
+            tokens.append(word)
+    return " ".join(tokens)
+
+
+def query_terms(query):
+    """
+    拆分查询中的中日韩文字片段和单词
+
+    Args:
+        query: 查询字符串
+
+    Returns:
+        list: 小写的片段和单词
+    """
+    return [cjk or word for cjk, word in TOKEN_PATTERN.findall(query.lower())]
+
+
+def match_expression(query):
+    """
+    把查询转换为 FTS5 MATCH 表达式，各片段之间为 AND
+
+    多字片段转为二元组短语（相邻二元组连续出现即原文包含该子串），
+    单字转为前缀查询（匹配以该字开头的二元组或末尾单字），单词按前缀匹配。
+
+    Args:
+        query: 查询字符串
+
+    Returns:
+        str: MATCH 表达式，查询中没有可检索的文字时为 None
+    """
+    clauses = []
+    for term in query_terms(query):
+        if not re.match(f"[{CJK_RANGES}]", term):
+            clauses.append(f'"{term}"*')
+        elif len(term) == 1:
+            clauses.append(f'"{term}"*')
+        else:
+            clauses.append('"' + " ".join(term[i:i + 2] for i in range(len(term) - 1)) + '"')
+    return " AND ".join(clauses) or None
+
+
+def snippet(text, query, width=20, mark=("<mark>", "</mark>")):
+    """
+    截取包含查询片段的上下文并标出匹配
+
+    Args:
+        text: 转写文本
+        query: 查询字符串
+        width: 第一个匹配前后各保留的字符数
+        mark: 匹配前后插入的标记
+
+    Returns:
+        str: 片段文本，转写文本已做 HTML 转义，只有 mark 标记是原样插入的
+    """
+    terms = sorted(set(query_terms(query)), key=len, reverse=True)
+    if not terms:
+        return html.escape(text[:2 * width])
+    pattern = re.compile("|".join(re.escape(term) for term in terms), re.IGNORECASE)
+    first = pattern.search(text)
+    if first is None:
+        return html.escape(text[:2 * width])
+    start, end = max(first.start() - width, 0), min(first.end() + width, len(text))
+    parts = []
+    position = start
+    for match in pattern.finditer(text, start, end):
+        # 先转义原文再插入标记，转写文本中的 HTML 不会被当作标签
+        parts.append(html.escape(text[position:match.start()]))
+        parts.append(f"{mark[0]}{html.escape(match.group(0))}{mark[1]}")
+        position = match.end()
+    parts.append(html.escape(text[position:end]))
+    body = "".join(parts).replace(mark[1] + mark[0], "")  # 相邻的匹配合并为一处
+    return ("…" if start > 0 else "") + body + ("…" if end < len(text) else "")
@@ -0,0 +1,146 @@
+"""
+转写会话管理服务
+"""
+import threading
+import uuid
+from app.core.logging import logger
+from app.config import DEFAULT_SESSION_ID, MAX_SESSIONS
+from app.services.transcription import TranscriptionService, transcription_service
+from app.services.profiles import inference_profiles
+
+
+def session_not_found(session_id):
+    """
+    构造会话不存在的错误响应
+
+    Args:
+        session_id: 会话ID
+
+    Returns:
+        dict: 错误状态和消息
+    """
+    return {"status": "error", "message": f"会话不存在: {session_id}"}
+
+
+class SessionManager:
+    """
+    会话管理类
+
+    每个会话是一个独立的 TranscriptionService 实例，拥有自己的缓冲区、语言、
+    阈值、转写记录和WebSocket客户端；所有会话共享 whisper_service 中已加载的模型。
+    """
+
+    def __init__(self, default_session):
+        """
+        初始化会话管理器
+
+        Args:
+            default_session: 默认会话（兼容不带 session_id 的旧接口）
+        """
+        self._sessions = {default_session.session_id: default_session}
+        self._lock = threading.Lock()
+        self.default = default_session
+
+    def get(self, session_id=DEFAULT_SESSION_ID):
+        """
+        获取会话
+
+        Args:
+            session_id: 会话ID
+
+        Returns:
+            TranscriptionService: 会话实例，不存在时返回 None
+        """
+        return self._sessions.get(session_id or DEFAULT_SESSION_ID)
+
+    def list(self):
+        """
+        列出所有会话
+
+        Returns:
+            list: 各会话的概要信息
+        """
+        return [session.info() for session in list(self._sessions.values())]
+
+    def sessions(self):
+        """
+        获取所有会话实例
+
+        Returns:
+            list: TranscriptionService 实例列表
+        """
+        return list(self._sessions.values())
+
+    def any_running(self):
+        """是否有会话正在转写"""
+        return any(session.running for session in list(self._sessions.values()))
+
+    def create(self, language=None, device=None, streaming=None, thresholds=None, endpointing=None, profile=None,
+               speculative=None):
+        """
+        创建新会话
+
+        Args:
+            language: 转写语言
+            device: 音频输入设备ID
+            streaming: 是否启用流式转写
+            thresholds: 覆盖的检测阈值
+            endpointing: 是否按语音边界分段
+            profile: 推理配置档名称
+            speculative: 是否先推送草稿再由当前模型校正
+
+        Returns:
+            dict: 操作状态和会话信息
+        """
+        if profile is not None and profile not in inference_profiles:
+            return {"status": "error", "message": f"不支持的推理配置档: {profile}"}
+        with self._lock:
+            if len(self._sessions) >= MAX_SESSIONS:
+                return {"status": "error", "message": f"会话数已达上限: {MAX_SESSIONS}"}
+            session_id = uuid.uuid4().hex[:12]
+            session = TranscriptionService(
+                session_id=session_id,
+                language=language,
+                device=device,
+                streaming=streaming,
+                thresholds=thresholds,
+                endpointing=endpointing,
+                profile=profile,
+                speculative=speculative
+            )
+            self._sessions[session_id] = session
+        logger.info(f"已创建会话: {session_id}")
+        return {"status": "success", "session": session.info()}
+
+    async def remove(self, session_id):
+        """
+        停止并删除会话，关闭其WebSocket客户端连接
+
+        Args:
+            session_id: 会话ID
+
+        Returns:
+            dict: 操作状态和消息
+        """
+        if session_id == DEFAULT_SESSION_ID:
+            return {"status": "error", "message": "默认会话不能删除"}
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is None:
+            return session_not_found(session_id)
+        session.stop()
+        await session.broadcaster.close()
+        logger.info(f"已删除会话: {session_id}")
+        return {"status": "success", "message": f"已删除会话: {session_id}"}
+
+    async def shutdown(self):
+        """停止所有会话并关闭所有WebSocket连接（应用关闭时调用）"""
+        sessions = list(self._sessions.values())
+        for session in sessions:
+            session.stop()
+        for session in sessions:
+            await session.broadcaster.close()
+
+
+# 创建全局会话管理器，默认会话即原有的全局转写服务实例
+session_manager = SessionManager(transcription_service)
@@ -0,0 +1,144 @@
+"""
+流式转写服务 - 滑动窗口的本地一致性（local agreement）提交策略
+"""
+from collections import deque
+from typing import List, NamedTuple
+
+# 句末标点，遇到时将已提交的词组成一个最终分段
+SENTENCE_END_CHARS = "。！？!?.…"
+
+
+class StreamingWord(NamedTuple):
+    """带绝对时间戳的词（时间单位：秒，相对于转写开始）"""
+    start: float
+    end: float
+    text: str
+    confidence: float
+
+
+def _normalize(word):
+    """用于一致性比较的词归一化"""
+    return word.text.strip().lower()
+
+
+class LocalAgreement:
+    """
+    本地一致性提交策略
+
+    每次解码得到一个完整假设（词序列）。当最近连续 agreement 次假设的
+    最长公共前缀稳定时，该前缀被提交为最终结果；其余部分作为仍可能变化的
+    部分假设返回。已提交的音频由调用方从缓冲区裁掉，不会被重复转写。
+    """
+
+    def __init__(self, agreement=2):
+        """
+        初始化提交策略
+
+        Args:
+            agreement: 需要保持一致的连续解码次数（至少为 1）
+        """
+        self.agreement = max(1, int(agreement))
+        self.committed_end = 0.0  # 已提交音频的结束时间
+        self._history = deque(maxlen=self.agreement - 1)
+        self._pending = []  # 最近一次假设中未提交的部分
+        self._tail = deque(maxlen=5)  # 最近提交的词，用于去除窗口边界处的重复
+
+    @property
+    def pending(self):
+        """最近一次假设中尚未提交的词"""
+        return list(self._pending)
+
+    def reset(self):
+        """清空所有状态"""
+        self.committed_end = 0.0
+        self._history.clear()
+        self._pending = []
+        self._tail.clear()
+
+    def _drop_committed(self, words):
+        """去掉落在已提交音频内、或与已提交尾部重复的词"""
+        words = [w for w in words if w.end > self.committed_end + 0.05]
+        tail = [_normalize(w) for w in self._tail]
+        for n in range(min(len(tail), len(words)), 0, -1):
+            if tail[-n:] == [_normalize(w) for w in words[:n]]:
+                return words[n:]
+        return words
+
+    def _commit(self, count, keep_history=True):
+        """提交最近假设的前 count 个词"""
+        committed = self._pending[:count]
+        if committed:
+            self.committed_end = max(self.committed_end, committed[-1].end)
+            self._tail.extend(committed)
+        self._pending = self._pending[count:]
+        if keep_history:
+            # 历史假设与本次共享被提交的前缀，去掉前缀后继续参与比较
+            self._history = deque((h[count:] for h in self._history), maxlen=self.agreement - 1)
+        else:
+            self._history.clear()
+        return committed
+
+    def insert(self, words: List[StreamingWord]) -> List[StreamingWord]:
+        """
+        加入一次新的解码假设
+
+        Args:
+            words: 本次解码得到的词序列（绝对时间戳）
+
+        Returns:
+            list: 本次新提交的词
+        """
+        words = self._drop_committed(words)
+        hypotheses = list(self._history) + [words]
+        if len(hypotheses) < self.agreement:
+            self._history.append(words)
+            self._pending = words
+            return []
+
+        count = 0
+        for column in zip(*hypotheses):
+            first = _normalize(column[0])
+            if any(_normalize(w) != first for w in column[1:]):
+                break
+            count += 1
+
+        self._pending = words
+        committed = self._commit(count)
+        self._history.append(self._pending)
+        return committed
+
+    def commit_until(self, time_limit):
+        """
+        强制提交结束时间不晚于 time_limit 的未提交词
+
+        Args:
+            time_limit: 绝对时间（秒）
+
+        Returns:
+            list: 被强制提交的词
+        """
+        count = 0
+        for word in self._pending:
+            if word.end > time_limit:
+                break
+            count += 1
+        return self._commit(count, keep_history=False)
+
+    def flush(self):
+        """
+        提交所有未提交的词（语音结束或停止转写时调用）
+
+        Returns:
+            list: 被提交的词
+        """
+        return self._commit(len(self._pending), keep_history=False)
+
+
+def join_words(words):
+    """将词序列拼接为文本（英文词自带前导空格，中文词直接相连）"""
+    return "".join(w.text for w in words).strip()
+
+
+def ends_sentence(words):
+    """判断词序列是否以句末标点结束"""
+    return bool(words) and words[-1].text.strip()[-1:] in SENTENCE_END_CHARS
@@ -0,0 +1,463 @@
+"""
+流水线追踪 - 按采样率为音频窗口记录各处理步骤的耗时树，保存在环形缓冲区中
+
+一个窗口的追踪从切窗开始，经解码队列、Whisper 推理、质量验证到结果推送结束。
+追踪在采集/VAD 线程中创建，随 AudioWindow 交给解码线程，再随解码请求交给批处理执行线程；
+同一时刻只有一个线程在写同一个追踪。各函数通过线程局部的"当前追踪"添加步骤，
+未被采样的窗口没有当前追踪，span() 返回共享的空上下文，开销只有一次属性查找。
+"""
+import itertools
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from app.config import TRACING_CONFIG
+
+_local = threading.local()
+
+
+class _NullSpan:
+    """未采样时使用的空上下文"""
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """追踪中的一个步骤"""
+
+    __slots__ = ("name", "start", "end", "attrs", "children")
+
+    def __init__(self, name, start, end=None, attrs=None):
+        """
+        初始化
+
+        Args:
+            name: 步骤名称
+            start: 开始时间（perf_counter 时钟）
+            end: 结束时间，None 表示尚未结束
+            attrs: 附加属性
+        """
+        self.name = name
+        self.start = start
+        self.end = end
+        self.attrs = attrs or {}
+        self.children = []
+
+    def snapshot(self, origin):
+        """
+        导出为字典
+
+        Args:
+            origin: 追踪开始时间，各步骤的时间相对于它
+
+        Returns:
+            dict: 步骤名称、相对开始时间、耗时、属性和子步骤（毫秒）
+        """
+        end = self.end if self.end is not None else self.start
+        data = {
+            "name": self.name,
+            "start_ms": round((self.start - origin) * 1000, 3),
+            "duration_ms": round((end - self.start) * 1000, 3),
+        }
+        if self.attrs:
+            data["attrs"] = self.attrs
+        if self.children:
+            data["children"] = [child.snapshot(origin) for child in self.children]
+        return data
+
+
+class _SpanContext:
+    """Trace.span 返回的上下文：进入时压栈，退出时记录结束时间"""
+
+    __slots__ = ("trace", "span")
+
+    def __init__(self, trace, span):
+        self.trace = trace
+        self.span = span
+
+    def __enter__(self):
+        self.trace._stack.append(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        self.span.end = time.perf_counter()
+        if exc_type is not None:
+            self.span.attrs["error"] = str(exc)
+        self.trace._stack.pop()
+        return False
+
+
+class Trace:
+    """一个音频窗口的追踪：根步骤 window 及其下的步骤树"""
+
+    def __init__(self, trace_id, session_id, attrs=None):
+        """
+        初始化
+
+        Args:
+            trace_id: 追踪ID
+            session_id: 会话ID
+            attrs: 根步骤的属性（模型、语言等）
+        """
+        self.trace_id = trace_id
+        self.session_id = session_id
+        self.started_at = time.time()
+        self.root = Span("window", time.perf_counter(), attrs=dict(attrs or {}))
+        self._stack = [self.root]
+
+    def span(self, name, **attrs):
+        """
+        在当前步骤下开始一个子步骤
+
+        Args:
+            name: 步骤名称
+            **attrs: 附加属性
+
+        Returns:
+            上下文管理器，退出时记录结束时间
+        """
+        span = Span(name, time.perf_counter(), attrs=attrs)
+        self._stack[-1].children.append(span)
+        return _SpanContext(self, span)
+
+    def add(self, name, start, end, **attrs):
+        """
+        在当前步骤下添加已结束的子步骤（如在其他线程中测得的排队时间）
+
+        Args:
+            name: 步骤名称
+            start: 开始时间（perf_counter 时钟）
+            end: 结束时间
+            **attrs: 附加属性
+        """
+        self._stack[-1].children.append(Span(name, start, end, attrs))
+
+    def wall_to_perf(self, wall):
+        """把 time.time() 时间换算为本追踪使用的 perf_counter 时钟"""
+        return self.root.start + (wall - self.started_at)
+
+    def snapshot(self):
+        """
+        导出为字典
+
+        Returns:
+            dict: 追踪ID、会话、开始时间、总耗时和步骤树
+        """
+        root = self.root.snapshot(self.root.start)
+        return {
+            "trace_id": self.trace_id,
+            "session_id": self.session_id,
+            "started_at": self.started_at,
+            "duration_ms": root["duration_ms"],
+            "root": root,
+        }
+
+    def chrome_events(self, pid=1):
+        """
+        导出为 Chrome trace 的完整事件（ph=X），每个追踪占一行（tid）
+
+        Args:
+            pid: 进程ID字段
+
+        Returns:
+            list: 事件列表，时间单位为微秒
+        """
+        events = []
+        stack = [self.root]
+        while stack:
+            span = stack.pop()
+            end = span.end if span.end is not None else span.start
+            events.append({
+                "name": span.name,
+                "ph": "X",
+                "ts": round((self.started_at + span.start - self.root.start) * 1e6, 1),
+                "dur": round((end - span.start) * 1e6, 1),
+                "pid": pid,
+                "tid": self.trace_id,
+                "args": dict(span.attrs, session_id=self.session_id) if span is self.root else span.attrs,
+            })
+            stack.extend(span.children)
+        return events
+
+    def folded(self):
+        """
+        按调用路径统计各步骤的自身耗时（不含子步骤）
+
+        Returns:
+            list: [(路径元组, 自身耗时秒数), ...]
+        """
+        stacks = []
+        pending = [((self.root.name,), self.root)]
+        while pending:
+            path, span = pending.pop()
+            end = span.end if span.end is not None else span.start
+            covered = sum(
+                (child.end if child.end is not None else child.start) - child.start for child in span.children
+            )
+            stacks.append((path, max(end - span.start - covered, 0.0)))
+            pending.extend((path + (child.name,), child) for child in span.children)
+        return stacks
+
+
+class Tracer:
+    """追踪器：按采样率创建追踪，已结束的追踪保存在环形缓冲区中"""
+
+    def __init__(self, enabled=False, sample_rate=0.05, buffer_size=256):
+        """
+        初始化
+
+        Args:
+            enabled: 是否启用追踪
+            sample_rate: 采样率（0-1），每个窗口以该概率被追踪
+            buffer_size: 保留的最近追踪数
+        """
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self._traces = deque(maxlen=max(1, int(buffer_size)))
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.sampled = 0
+
+    def configure(self, enabled=None, sample_rate=None, buffer_size=None):
+        """
+        调整追踪设置，未给出的参数保持不变
+
+        Args:
+            enabled: 是否启用追踪
+            sample_rate: 采样率（0-1）
+            buffer_size: 保留的最近追踪数
+
+        Raises:
+            ValueError: 参数超出范围
+        """
+        if sample_rate is not None and not 0 <= sample_rate <= 1:
+            raise ValueError(f"采样率必须在 0 到 1 之间: {sample_rate}")
+        if buffer_size is not None and buffer_size < 1:
+            raise ValueError(f"缓冲区大小必须大于 0: {buffer_size}")
+        if enabled is not None:
+            self.enabled = enabled
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+        if buffer_size is not None:
+            with self._lock:
+                self._traces = deque(self._traces, maxlen=int(buffer_size))
+
+    def begin(self, session_id, **attrs):
+        """
+        按采样率决定是否追踪一个新窗口
+
+        Args:
+            session_id: 会话ID
+            **attrs: 根步骤的属性
+
+        Returns:
+            Trace: 新的追踪，未被采样时为 None
+        """
+        if not self.enabled or random.random() >= self.sample_rate:
+            return None
+        return Trace(next(self._ids), session_id, attrs)
+
+    def finish(self, trace):
+        """
+        结束追踪并放入环形缓冲区
+
+        Args:
+            trace: 追踪，None 时忽略
+        """
+        if trace is None:
+            return
+        trace.root.end = time.perf_counter()
+        with self._lock:
+            self._traces.append(trace)
+            self.sampled += 1
+
+    def clear(self):
+        """清空已保存的追踪"""
+        with self._lock:
+            self._traces.clear()
+
+    def traces(self, session_id=None, limit=None):
+        """
+        获取已保存的追踪（从旧到新）
+
+        Args:
+            session_id: 只返回该会话的追踪，None 为全部
+            limit: 最多返回最近的多少个
+
+        Returns:
+            list: Trace 列表
+        """
+        with self._lock:
+            traces = list(self._traces)
+        if session_id is not None:
+            traces = [trace for trace in traces if trace.session_id == session_id]
+        if limit is not None:
+            traces = traces[-limit:] if limit > 0 else []
+        return traces
+
+    def settings(self):
+        """
+        导出追踪设置
+
+        Returns:
+            dict: 是否启用、采样率、缓冲区大小和已采样数
+        """
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "buffer_size": self._traces.maxlen,
+            "buffered": len(self._traces),
+            "sampled": self.sampled,
+        }
+
+
+def current():
+    """当前线程正在记录的追踪，没有时为 None"""
+    return getattr(_local, "trace", None)
+
+
+@contextmanager
+def activate(trace):
+    """
+    在当前线程中把 trace 设为当前追踪，退出时恢复
+
+    Args:
+        trace: 追踪，None 表示本段代码不追踪
+    """
+    previous = getattr(_local, "trace", None)
+    _local.trace = trace
+    try:
+        yield trace
+    finally:
+        _local.trace = previous
+
+
+def span(name, **attrs):
+    """
+    在当前追踪中记录一个步骤
+
+    Args:
+        name: 步骤名称
+        **attrs: 附加属性
+
+    Returns:
+        上下文管理器；当前线程没有追踪时为共享的空上下文
+    """
+    trace = getattr(_local, "trace", None)
+    if trace is None:
+        return _NULL_SPAN
+    return trace.span(name, **attrs)
+
+
+def _traced(method, name):
+    """包装模型方法：有当前追踪时记录为一个步骤"""
+    def wrapper(*args, **kwargs):
+        trace = getattr(_local, "trace", None)
+        if trace is None:
+            return method(*args, **kwargs)
+        with trace.span(name):
+            return method(*args, **kwargs)
+    return wrapper
+
+
+# faster-whisper 在解码每个 30 秒片段时调用的模型方法及对应的步骤名称
+MODEL_STEPS = (("encode", "encoder"), ("generate_with_fallback", "decoder"), ("find_alignment", "word_alignment"))
+
+
+def instrument_model(model):
+    """
+    为模型的编码、解码和词对齐方法加上追踪（在实例上包装，不影响其他模型）
+
+    Args:
+        model: WhisperModel 实例
+
+    Returns:
+        原模型实例
+    """
+    for method, name in MODEL_STEPS:
+        original = getattr(model, method, None)
+        if callable(original):
+            setattr(model, method, _traced(original, name))
+    return model
+
+
+def chrome_trace(traces):
+    """
+    把若干追踪导出为 Chrome trace JSON（可在 chrome://tracing 或 Perfetto 中打开）
+
+    Args:
+        traces: Trace 列表
+
+    Returns:
+        dict: {"traceEvents": [...], "displayTimeUnit": "ms"}
+    """
+    events = []
+    for trace in traces:
+        events.extend(trace.chrome_events())
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def folded_stacks(traces):
+    """
+    把若干追踪汇总为折叠调用栈（flamegraph.pl / speedscope 可直接读取）
+
+    Args:
+        traces: Trace 列表
+
+    Returns:
+        str: 每行为 "window;decode;whisper 自身耗时微秒"
+    """
+    totals = {}
+    for trace in traces:
+        for path, seconds in trace.folded():
+            totals[path] = totals.get(path, 0.0) + seconds
+    return "".join(f"{';'.join(path)} {round(seconds * 1e6)}\n" for path, seconds in sorted(totals.items()))
+
+
+def summarize(traces):
+    """
+    按调用路径汇总各步骤的耗时
+
+    Args:
+        traces: Trace 列表
+
+    Returns:
+        list: 各路径的次数、平均耗时、p95 耗时和自身耗时占比，按总耗时从大到小排列
+    """
+    durations, self_times = {}, {}
+    for trace in traces:
+        pending = [((trace.root.name,), trace.root)]
+        while pending:
+            path, span = pending.pop()
+            end = span.end if span.end is not None else span.start
+            durations.setdefault(path, []).append(end - span.start)
+            pending.extend((path + (child.name,), child) for child in span.children)
+        for path, seconds in trace.folded():
+            self_times[path] = self_times.get(path, 0.0) + seconds
+
+    total_self = sum(self_times.values()) or 1.0
+    rows = []
+    for path, values in durations.items():
+        values.sort()
+        rows.append({
+            "path": "/".join(path),
+            "count": len(values),
+            "avg_ms": round(sum(values) / len(values) * 1000, 3),
+            "p95_ms": round(values[min(int(len(values) * 0.95), len(values) - 1)] * 1000, 3),
+            "total_ms": round(sum(values) * 1000, 3),
+            "self_share": round(self_times.get(path, 0.0) / total_self, 4),
+        })
+    rows.sort(key=lambda row: row["total_ms"], reverse=True)
+    return rows
+
+
+# 创建全局追踪器实例
+tracer = Tracer(TRACING_CONFIG["enabled"], TRACING_CONFIG["sample_rate"], TRACING_CONFIG["buffer_size"])
@@ -0,0 +1,473 @@
+"""
+转写记录存储 - 追加写入 SQLite（WAL 模式），按音频时间建索引，内存中只保留每个会话最近的记录
+"""
+import asyncio
+import sqlite3
+import threading
+import time
+from collections import deque
+from app.core.logging import logger
+from app.config import TRANSCRIPT_STORE_CONFIG
+from app.services.search import index_tokens, match_expression, snippet
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    started_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_session ON runs (session_id, run_id);
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id INTEGER NOT NULL,
+    seconds REAL NOT NULL,
+    timestamp TEXT NOT NULL,
+    text TEXT NOT NULL,
+    confidence REAL NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_segments_run_seconds ON segments (run_id, seconds);
+CREATE INDEX IF NOT EXISTS idx_segments_run_id ON segments (run_id, id);
+"""
+
+# 全文索引：无内容（contentless）的 FTS5 表，rowid 即 segments.id，只存切分后的词
+FTS_SCHEMA = "CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(tokens, content='', prefix='1')"
+
+COLUMNS = "id, text, timestamp, seconds, confidence"
+
+
+def parse_timestamp(value):
+    """
+    解析时间参数
+
+    Args:
+        value: HH:MM:SS、MM:SS 或秒数（可带小数）
+
+    Returns:
+        float: 相对转写开始的秒数
+
+    Raises:
+        ValueError: 格式不正确
+    """
+    parts = str(value).strip().split(":")
+    if len(parts) > 3:
+        raise ValueError(f"无效的时间: {value}")
+    try:
+        seconds = 0.0
+        for part in parts:
+            seconds = seconds * 60 + float(part)
+    except ValueError:
+        raise ValueError(f"无效的时间: {value}") from None
+    if not seconds >= 0:
+        raise ValueError(f"无效的时间: {value}")
+    return seconds
+
+
+def _time_range(start, end):
+    """构造按音频时间过滤的 SQL 条件和参数"""
+    clause, params = "", []
+    if start is not None:
+        clause += " AND seconds >= ?"
+        params.append(start)
+    if end is not None:
+        clause += " AND seconds < ?"
+        params.append(end)
+    return clause, params
+
+
+class TranscriptStore:
+    """
+    所有会话共用的转写记录库
+
+    每次开始转写或清空记录即开启一个新的 run，旧记录保留在库中但不再出现在会话的查询结果里；
+    服务重启后会话沿用库中最近的 run，已有的转写记录不会丢失。
+    写入只有追加，查询走 (run_id, seconds) 索引，耗时与会话总时长无关。
+    """
+
+    def __init__(self, config):
+        """
+        初始化
+
+        Args:
+            config: TRANSCRIPT_STORE_CONFIG 形式的配置
+        """
+        self.path = config["path"]
+        self.tail_size = config["tail_size"]
+        self.page_size = config["page_size"]
+        self.max_page_size = config["max_page_size"]
+        self.search_window = config["search_window"]
+        self._conn = None
+        self._lock = threading.Lock()
+        self.searchable = False  # SQLite 是否支持 FTS5，打开数据库时确定
+
+    def _connection(self):
+        """首次使用时打开数据库（调用方持有锁）"""
+        if self._conn is None:
+            try:
+                self._conn = self._open(self.path or ":memory:")
+            except sqlite3.Error as e:
+                logger.error(f"打开转写记录库失败: {self.path} ({e})，转写记录仅保存在内存中")
+                self._conn = self._open(":memory:")
+        return self._conn
+
+    def _open(self, path):
+        """打开数据库、建表，并为尚未建立全文索引的记录补建索引"""
+        conn = sqlite3.connect(path, check_same_thread=False)
+        # WAL：追加写入顺序落盘，提交时不必同步整个数据库文件，外部进程读取也不会阻塞写入
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        try:
+            conn.execute(FTS_SCHEMA)
+        except sqlite3.OperationalError as e:
+            logger.warning(f"SQLite 不支持 FTS5（{e}），转写记录全文检索不可用")
+            self.searchable = False
+            return conn
+        self.searchable = True
+        conn.create_function("index_tokens", 1, index_tokens, deterministic=True)
+        conn.execute(
+            "INSERT INTO segments_fts (rowid, tokens) SELECT id, index_tokens(text) FROM segments "
+            "WHERE id > COALESCE((SELECT MAX(rowid) FROM segments_fts), 0)"
+        )
+        conn.commit()
+        return conn
+
+    def _query(self, sql, params=()):
+        """执行查询并返回全部行"""
+        with self._lock:
+            return self._connection().execute(sql, params).fetchall()
+
+    def _write(self, sql, params=()):
+        """执行写入并提交，返回新行的 ID"""
+        with self._lock:
+            conn = self._connection()
+            cursor = conn.execute(sql, params)
+            conn.commit()
+            return cursor.lastrowid
+
+    def latest_run(self, session_id):
+        """会话最近的 run，没有时返回 None"""
+        rows = self._query("SELECT MAX(run_id) FROM runs WHERE session_id = ?", (session_id,))
+        return rows[0][0]
+
+    def new_run(self, session_id):
+        """为会话开启一个新的 run"""
+        return self._write("INSERT INTO runs (session_id, started_at) VALUES (?, ?)", (session_id, time.time()))
+
+    def append(self, run_id, record):
+        """追加一条转写记录并更新全文索引（同一事务），返回其序号"""
+        tokens = index_tokens(record["text"])
+        with self._lock:
+            conn = self._connection()
+            seq = conn.execute(
+                "INSERT INTO segments (run_id, seconds, timestamp, text, confidence, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, record["seconds"], record["timestamp"], record["text"], record["confidence"], time.time())
+            ).lastrowid
+            if self.searchable:
+                conn.execute("INSERT INTO segments_fts (rowid, tokens) VALUES (?, ?)", (seq, tokens))
+            conn.commit()
+            return seq
+
+    def count(self, run_id, start=None, end=None):
+        """统计时间范围内的记录数"""
+        clause, params = _time_range(start, end)
+        return self._query(f"SELECT COUNT(*) FROM segments WHERE run_id = ?{clause}", [run_id, *params])[0][0]
+
+    def query(self, run_id, start=None, end=None, limit=None, offset=0):
+        """
+        按音频时间顺序查询记录
+
+        Args:
+            run_id: run ID
+            start: 起始秒数（含），None 为不限
+            end: 结束秒数（不含），None 为不限
+            limit: 最多返回的条数
+            offset: 跳过的条数
+
+        Returns:
+            list: 转写记录
+        """
+        clause, params = _time_range(start, end)
+        rows = self._query(
+            f"SELECT {COLUMNS} FROM segments WHERE run_id = ?{clause} ORDER BY seconds, id LIMIT ? OFFSET ?",
+            [run_id, *params, -1 if limit is None else limit, offset]
+        )
+        return [self._record(row) for row in rows]
+
+    def after(self, run_id, after, start=None, end=None, limit=None):
+        """
+        按序号查询 after 之后写入的记录（增量拉取）
+
+        Args:
+            run_id: run ID
+            after: 序号，只返回序号大于它的记录
+            start: 起始秒数（含），None 为不限
+            end: 结束秒数（不含），None 为不限
+            limit: 最多返回的条数
+
+        Returns:
+            list: 按序号排序的转写记录
+        """
+        clause, params = _time_range(start, end)
+        rows = self._query(
+            f"SELECT {COLUMNS} FROM segments WHERE run_id = ? AND id > ?{clause} ORDER BY id LIMIT ?",
+            [run_id, after, *params, -1 if limit is None else limit]
+        )
+        return [self._record(row) for row in rows]
+
+    def last_id(self, run_id):
+        """run 中最新记录的序号，没有记录时为 0"""
+        return self._query("SELECT MAX(id) FROM segments WHERE run_id = ?", (run_id,))[0][0] or 0
+
+    def search(self, expression, session_id, run_id=None, limit=20, offset=0):
+        """
+        全文检索
+
+        高频词可能匹配几十万条记录，对全部匹配计算 BM25 再排序耗时与匹配数成正比；
+        因此先按序号倒序取最近的 search_window 条匹配（FTS5 倒排表按 rowid 有序，只读取这一段），
+        再在其中按相关度排序，查询耗时与记录总数基本无关。
+
+        Args:
+            expression: FTS5 MATCH 表达式（由 search.match_expression 生成）
+            session_id: 会话ID
+            run_id: 只检索该 run，None 为检索会话的所有 run
+            limit: 最多返回的条数
+            offset: 跳过的条数
+
+        Returns:
+            list: 按相关度（BM25）排序的转写记录，附带 score（越大越相关），相关度相同时较新的在前
+        """
+        if run_id is None:
+            scope, params = "s.run_id IN (SELECT run_id FROM runs WHERE session_id = ?)", [session_id]
+        else:
+            scope, params = "s.run_id = ?", [run_id]
+        rows = self._query(
+            f"SELECT * FROM ("
+            f"SELECT s.id, s.text, s.timestamp, s.seconds, s.confidence, bm25(segments_fts) AS score "
+            f"FROM segments_fts JOIN segments s ON s.id = segments_fts.rowid "
+            f"WHERE segments_fts MATCH ? AND {scope} ORDER BY segments_fts.rowid DESC LIMIT ?"
+            f") ORDER BY score, id DESC LIMIT ? OFFSET ?",
+            [expression, *params, self.search_window, limit, offset]
+        )
+        return [{**self._record(row[:5]), "score": round(-row[5], 4)} for row in rows]
+
+    def tail(self, run_id, n):
+        """最近写入的 n 条记录（按写入顺序）"""
+        rows = self._query(f"SELECT {COLUMNS} FROM segments WHERE run_id = ? ORDER BY id DESC LIMIT ?", (run_id, n))
+        return [self._record(row) for row in reversed(rows)]
+
+    def iterate(self, run_id, batch=1000):
+        """
+        按写入顺序分批遍历记录（每批单独查询，不在遍历期间持有锁）
+
+        Args:
+            run_id: run ID
+            batch: 每批条数
+
+        Yields:
+            dict: 转写记录
+        """
+        last = 0
+        while True:
+            records = self.after(run_id, last, limit=batch)
+            yield from records
+            if len(records) < batch:
+                return
+            last = records[-1]["id"]
+
+    @staticmethod
+    def _record(row):
+        """数据库行转换为转写记录"""
+        seq, text, timestamp, seconds, confidence = row
+        return {"id": seq, "text": text, "timestamp": timestamp, "seconds": seconds, "confidence": confidence}
+
+    def has_session(self, session_id):
+        """库中是否有该会话的记录"""
+        return self.latest_run(session_id) is not None
+
+    def open(self, session_id):
+        """
+        打开会话的转写记录，沿用最近的 run
+
+        Args:
+            session_id: 会话ID
+
+        Returns:
+            TranscriptLog: 会话的转写记录
+        """
+        return TranscriptLog(self, session_id)
+
+
+class TranscriptLog:
+    """
+    一个会话的转写记录：写入追加到库中，内存里只保留最近 tail_size 条
+
+    每条记录有单调递增的序号（id），客户端按序号增量拉取；
+    长轮询的客户端在事件循环中等待，新记录写入时由转写线程唤醒。
+    """
+
+    def __init__(self, store, session_id):
+        """
+        初始化
+
+        Args:
+            store: TranscriptStore 实例
+            session_id: 会话ID
+        """
+        self.store = store
+        self.session_id = session_id
+        self.tail = deque(maxlen=store.tail_size)
+        self.run_id = store.latest_run(session_id)
+        if self.run_id is None:
+            self.run_id = store.new_run(session_id)
+        self.tail.extend(store.tail(self.run_id, store.tail_size))
+        self._count = store.count(self.run_id)
+        self.last_id = store.last_id(self.run_id)
+        self._waiters = []  # 长轮询的 (事件循环, future)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """当前 run 的记录数"""
+        return self._count
+
+    def reset(self):
+        """开启新的 run（之前的记录保留在库中，不再出现在查询结果里）"""
+        with self._lock:
+            self.run_id = self.store.new_run(self.session_id)
+            self.tail.clear()
+            self._count = 0
+            self.last_id = 0
+
+    def append(self, record):
+        """
+        追加一条转写记录
+
+        Args:
+            record: 包含 text、timestamp、seconds、confidence 的字典，写入后补上序号 id
+        """
+        # 推测式转写下解码线程和校正线程可能同时追加：写库、内存尾部和计数一起加锁，保证序号与顺序一致
+        with self._lock:
+            record["id"] = self.store.append(self.run_id, record)
+            self.tail.append(record)
+            self._count += 1
+            self.last_id = record["id"]
+            waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_wake, future)
+
+    def latest(self):
+        """最新的一条记录，没有时返回 None"""
+        return self.tail[-1] if self.tail else None
+
+    def page(self, start=None, end=None, limit=None, offset=0):
+        """
+        分页查询时间范围内的记录
+
+        Args:
+            start: 起始秒数（含），None 为不限
+            end: 结束秒数（不含），None 为不限
+            limit: 每页条数，默认 page_size，不超过 max_page_size
+            offset: 跳过的条数
+
+        Returns:
+            dict: total（范围内总条数）、transcripts（本页记录）和 next_offset（没有下一页时为 None）
+        """
+        limit = min(limit or self.store.page_size, self.store.max_page_size)
+        offset = max(offset, 0)
+        if start is None and end is None:
+            total = self._count
+        else:
+            total = self.store.count(self.run_id, start, end)
+        records = self.store.query(self.run_id, start, end, limit, offset)
+        next_offset = offset + len(records)
+        return {
+            "total": total,
+            "transcripts": records,
+            "next_offset": next_offset if next_offset < total else None
+        }
+
+    def since(self, after, start=None, end=None, limit=None):
+        """
+        增量拉取序号大于 after 的记录
+
+        Args:
+            after: 客户端已收到的最大序号，0 为从头开始
+            start: 起始秒数（含），None 为不限
+            end: 结束秒数（不含），None 为不限
+            limit: 每次最多返回的条数，默认 page_size，不超过 max_page_size
+
+        Returns:
+            dict: transcripts（按序号排序）、last_id（下次请求的 after）和 has_more（是否还有未返回的记录）
+        """
+        limit = min(limit or self.store.page_size, self.store.max_page_size)
+        records = self.store.after(self.run_id, max(after, 0), start, end, limit + 1)
+        return {
+            "transcripts": records[:limit],
+            "last_id": records[:limit][-1]["id"] if records else after,
+            "has_more": len(records) > limit
+        }
+
+    async def wait(self, after, timeout):
+        """
+        长轮询：等待序号大于 after 的记录写入（在事件循环中调用）
+
+        Args:
+            after: 客户端已收到的最大序号
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            bool: 是否有新记录
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            if self.last_id > after:
+                return True
+            self._waiters.append((loop, future))
+        try:
+            await asyncio.wait_for(future, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                if (loop, future) in self._waiters:
+                    self._waiters.remove((loop, future))
+
+    def search(self, query, limit=20, offset=0, history=False):
+        """
+        全文检索会话的转写记录
+
+        Args:
+            query: 查询字符串，中日韩文字按子串匹配，其他语言按单词前缀匹配，多个词之间为 AND
+            limit: 最多返回的条数，不超过 max_page_size
+            offset: 跳过的条数
+            history: 是否同时检索本会话之前的 run（开始转写或清空记录前的记录）
+
+        Returns:
+            list: 按相关度排序的转写记录，附带 score 和标出匹配的 snippet
+        """
+        expression = match_expression(query)
+        if expression is None:
+            return []
+        results = self.store.search(
+            expression, self.session_id, None if history else self.run_id,
+            min(limit, self.store.max_page_size), max(offset, 0)
+        )
+        for result in results:
+            result["snippet"] = snippet(result["text"], query)
+        return results
+
+    def __iter__(self):
+        """按写入顺序遍历全部记录"""
+        return self.store.iterate(self.run_id)
+
+
+def _wake(future):
+    """唤醒一个长轮询（在其事件循环中调用）"""
+    if not future.done():
+        future.set_result(None)
+
+
+# 创建全局转写记录库实例
+transcript_store = TranscriptStore(TRANSCRIPT_STORE_CONFIG)
@@ -1,47 +1,126 @@
 """
 语音转写服务
 """
+import contextlib
 import time
-import queue
 import threading
-import asyncio
 import numpy as np
-import re
 from app.core.logging import logger
+from app.core.ring_buffer import AudioRingBuffer
 from app.config import (
-    SAMPLE_RATE, BLOCK_SIZE, BUFFER_SECONDS, DEFAULT_LANGUAGE,
-    ANTI_HALLUCINATION_CONFIG, HALLUCINATION_PATTERNS
+    SAMPLE_RATE, BLOCK_SIZE, BUFFER_SECONDS, RING_BUFFER_HEADROOM_SECONDS, FEATURE_FRAME_SIZE,
+    DEFAULT_LANGUAGE, DEFAULT_SESSION_ID, ANTI_HALLUCINATION_CONFIG, STREAMING_CONFIG,
+    PIPELINE_CONFIG, WEBSOCKET_SEND_QUEUE_SIZE, ENDPOINTING_CONFIG, SPECULATIVE_CONFIG
 )
+from app.services import prometheus, tracing
 from app.services.whisper import whisper_service
 from app.services.audio import audio_service
+from app.services.streaming import LocalAgreement, StreamingWord, join_words, ends_sentence
+from app.services.pipeline import (
+    AudioWindow, DraftWindow, BoundedStageQueue, CorrectionQueue, StageMetrics, OVERLOAD_POLICIES
+)
+from app.services.broadcast import WebSocketBroadcaster
+from app.services.features import FrameFeatures, analyze, silence_rule
+from app.services.vad import SpeechTracker, create_vad_engine, collect_speech
+from app.services.transcript_store import transcript_store
+from app.services.hallucination import hallucination_filter
+from app.services.profiles import inference_profiles
+from app.services.tracing import tracer
+
+# 音频来源：本地输入设备，或由 feed_audio 写入的远程音频流（如 /ws/audio）
+AUDIO_SOURCES = ("device", "remote")
 
 class TranscriptionService:
     """语音转写服务类"""
     
-    def __init__(self):
-        """初始化转写服务"""
-        self.q = queue.Queue()
-        self.buffer = np.empty((0, 1), dtype='float32')
-        self.transcript = []
-        self.last_time = time.time()
+    def __init__(self, session_id=DEFAULT_SESSION_ID, language=None, device=None,
+                 streaming=None, thresholds=None, endpointing=None, profile=None, speculative=None):
+        """
+        初始化转写服务（一个实例即一个转写会话）
+        
+        Args:
+            session_id: 会话ID
+            language: 转写语言，默认为 DEFAULT_LANGUAGE
+            device: 音频输入设备ID，默认使用 audio_service 当前选择的设备
+            streaming: 是否启用流式转写，默认取 STREAMING_CONFIG
+            thresholds: 覆盖反幻觉配置中的检测阈值
+            endpointing: 固定窗口模式下是否按语音边界分段，默认取 ENDPOINTING_CONFIG
+            profile: 推理配置档名称，默认取 INFERENCE_PROFILE
+            speculative: 固定窗口模式下是否先推送草稿再由当前模型校正，默认取 SPECULATIVE_CONFIG
+        """
+        self.session_id = session_id
+        self.device = device
+        self.source = "device"
+        self.created_at = time.time()
+        # 预分配的环形缓冲区，音频回调直接写入，避免逐块 np.append 重新分配
+        window_seconds = max(BUFFER_SECONDS, STREAMING_CONFIG["window_seconds"], ENDPOINTING_CONFIG["max_segment_seconds"])
+        capacity = int(SAMPLE_RATE * (window_seconds + RING_BUFFER_HEADROOM_SECONDS))
+        self.buffer = AudioRingBuffer(capacity)
+        # 帧级特征随音频到达增量计算，覆盖整个缓冲区
+        self.features = FrameFeatures(FEATURE_FRAME_SIZE, capacity // FEATURE_FRAME_SIZE + 1, SAMPLE_RATE)
+        
+        # 特征/VAD 阶段与解码阶段之间的有界队列，以及各阶段指标
+        self.decode_queue = BoundedStageQueue(
+            PIPELINE_CONFIG["decode_queue_size"],
+            PIPELINE_CONFIG["overload_policy"],
+            int(PIPELINE_CONFIG["max_merge_seconds"] * SAMPLE_RATE)
+        )
+        self.metrics = {
+            "capture": StageMetrics(), "features": StageMetrics(), "vad": StageMetrics(), "decode": StageMetrics(),
+            "correction": StageMetrics()
+        }
+        self._in_speech = False  # 流式模式下上一个窗口是否包含语音
+        self._next_cut = 0  # 下一次切窗的缓冲区写入位置（按音频时钟，而非墙上时钟）
+        # 远程音频流结束后的排空状态
+        self._drain_requested = threading.Event()
+        self._drained = threading.Event()
+        self._vad_done = False
+        
+        # 流式转写状态
+        self.streaming = STREAMING_CONFIG["enabled"] if streaming is None else bool(streaming)
+        self.endpointing = ENDPOINTING_CONFIG["enabled"] if endpointing is None else bool(endpointing)
+        # 推测式双模型转写：解码线程用草稿模型推送 draft 事件，校正线程用当前模型重新解码后推送 correction 事件
+        self.speculative = SPECULATIVE_CONFIG["enabled"] if speculative is None else bool(speculative)
+        self.correction_queue = CorrectionQueue(SPECULATIVE_CONFIG["correction_queue_size"])
+        self._draft_seq = 0
+        self._decode_done = threading.Event()  # 解码线程已退出，或远程音频流的窗口已全部解码
+        self.agreement = LocalAgreement(STREAMING_CONFIG["agreement"])
+        self._stream_origin = 0  # 本次转写开始时的缓冲区写入位置
+        self._sentence = []  # 已提交但尚未组成完整句子的词
+        # 转写记录追加写入转写记录库，内存中只保留最近的若干条
+        self.transcript = transcript_store.open(session_id)
         self.running = False
-        self.current_language = DEFAULT_LANGUAGE
-        self.connected_websockets = set()
+        self.current_language = language or DEFAULT_LANGUAGE
+        self.broadcaster = WebSocketBroadcaster(WEBSOCKET_SEND_QUEUE_SIZE, on_fan_out=self._observe_fan_out)
         self.start_time = None  # 新增：记录录音开始时间
         self.display_mode = "segments"  # 显示模式
         self.continuous_text = ""  # 新增：用于存储连续显示的文本
         
-        # 从配置文件加载反幻觉参数
-        config = ANTI_HALLUCINATION_CONFIG
+        # 从配置文件加载反幻觉参数，会话可单独覆盖检测阈值
+        config = {**ANTI_HALLUCINATION_CONFIG, **(thresholds or {})}
         self.energy_threshold = config["energy_threshold"]
         self.confidence_threshold = config["confidence_threshold"]
         self.silence_threshold = config["silence_threshold"]
         self.zcr_threshold = config["zcr_threshold"]
-        self.hallucination_patterns = HALLUCINATION_PATTERNS
+
+        # 推理配置档决定解码参数和 VAD 参数；VAD 引擎在特征/VAD 阶段对每段音频运行一次，Whisper 只解码检测到的语音片段
+        self.profile = inference_profiles.get(profile) or inference_profiles.default
+        self.vad = self._create_vad()
+
+    def _create_vad(self):
+        """
+        按当前推理配置档的 VAD 参数创建语音片段检测器
+
+        能量引擎复用特征阶段已算好的帧特征，并在每次检测时读取会话当前的静音阈值。
+        """
+        config = self.profile.vad
+        return SpeechTracker(
+            create_vad_engine(config["engine"], config, lambda: self.silence_thresholds, self.features)
+        )
     
     def audio_callback(self, indata, frames, time_info, status):
         """
-        音频数据回调函数，将捕获的音频数据放入队列
+        音频数据回调函数，将捕获的音频数据直接写入环形缓冲区
         
         Args:
             indata: 输入的音频数据
@@ -51,56 +130,86 @@ class TranscriptionService:
         """
         if status:
             logger.warning(f"音频状态异常: {status}")
-        self.q.put(indata.copy())
+        self.feed_audio(indata)
+
+    def feed_audio(self, samples):
+        """
+        写入一段 16kHz 单声道 float32 音频（本地回调和远程音频流共用）
+        
+        Args:
+            samples: 音频样本
+        """
+        t0 = time.perf_counter()
+        self.buffer.write(samples)
+        self.metrics["capture"].record(time.perf_counter() - t0)
+
+    def backlogged(self, incoming=0):
+        """
+        远程音频流是否需要暂停写入（背压）
+        
+        远程客户端可能以快于实时的速度发送音频（如回放 WAV 文件），
+        缓冲区放不下新音频或解码队列已满时应等待，避免覆盖未处理的音频或丢弃窗口。
+        
+        Args:
+            incoming: 即将写入的样本数
+        
+        Returns:
+            bool: 是否积压
+        """
+        return (len(self.buffer) + incoming > self.buffer.capacity
+                or len(self.decode_queue) >= self.decode_queue.maxsize)
     
     async def broadcast_to_websockets(self, event_type, data):
         """
-        向所有连接的WebSocket客户端广播消息
+        向所有连接的WebSocket客户端广播消息（在服务器事件循环中调用）
         
         Args:
             event_type: 事件类型
             data: 要发送的数据
         """
-        for websocket in self.connected_websockets:
-            try:
-                await websocket.send_json({"event": event_type, "data": data})
-            except Exception as e:
-                logger.error(f"WebSocket发送消息失败: {str(e)}")
+        await self.broadcaster.broadcast(event_type, data)
     
-    def preprocess_audio(self, audio_data):
+    def preprocess_audio(self, audio_data, out=None):
         """
         音频预处理：去噪和归一化
         
         Args:
-            audio_data: 原始音频数据
+            audio_data: 原始音频数据（可以是环形缓冲区的只读视图）
+            out: 可选的预分配输出缓冲区，长度不小于 audio_data
             
         Returns:
             numpy.ndarray: 预处理后的音频数据 (float32)
         """
-        # 确保输入是 float32 类型
-        audio_data = audio_data.astype(np.float32)
+        # 确保输入是 float32 类型，已是 float32 时不复制
+        audio_data = np.asarray(audio_data, dtype=np.float32)
+        n = len(audio_data)
+        result = np.empty(n, dtype=np.float32) if out is None else out[:n]
+        if n == 0:
+            return result
         
-        # 归一化音频
-        max_val = np.max(np.abs(audio_data))
-        if max_val > 0:
-            audio_data = audio_data / max_val
+        # 归一化音频（不生成 np.abs 临时数组）
+        max_val = max(float(audio_data.max()), -float(audio_data.min()))
+        scale = 1.0 / max_val if max_val > 0 else 1.0
         
         # 简单的高通滤波器去除低频噪音
-        # 使用差分近似高通滤波
-        if len(audio_data) > 1:
-            filtered = np.diff(audio_data)
-            # 补齐长度
-            filtered = np.append(filtered, 0)
-            result = filtered * 0.5 + audio_data * 0.5
+        # 差分近似高通滤波：0.5 * diff(x) + 0.5 * x（末尾补 0）
+        # 逐项展开即 0.5 * x[i + 1]，末尾为 0.5 * x[-1]，直接写入输出缓冲区
+        if n > 1:
+            np.multiply(audio_data[1:], 0.5 * scale, out=result[:-1])
+            result[-1] = audio_data[-1] * (0.5 * scale)
         else:
-            result = audio_data
+            result[0] = audio_data[0] * scale
         
-        # 确保返回 float32 类型
-        return result.astype(np.float32)
+        return result
+
+    @property
+    def silence_thresholds(self):
+        """静音判定阈值 (silence_threshold, zcr_threshold, energy_threshold)"""
+        return (self.silence_threshold, self.zcr_threshold, self.energy_threshold)
 
     def is_silence(self, audio_data):
         """
-        增强的静音检测：结合能量和零交叉率
+        增强的静音检测：结合能量、零交叉率和频谱中心（按短帧 rfft 聚合）
         
         Args:
             audio_data: 音频数据
@@ -110,36 +219,44 @@ class TranscriptionService:
         """
         if len(audio_data) == 0:
             return True
-            
-        # 计算音频能量
-        energy = np.mean(np.abs(audio_data))
-        
-        # 计算零交叉率 (Zero Crossing Rate)
-        zero_crossings = np.sum(np.abs(np.diff(audio_data > 0)))
-        zcr = zero_crossings / max(len(audio_data) - 1, 1)
-        
-        # 计算频谱中心（简化版）
-        fft = np.fft.fft(audio_data)
-        magnitude = np.abs(fft)
-        freqs = np.fft.fftfreq(len(audio_data), 1/SAMPLE_RATE)
-        
-        # 避免除零错误
-        magnitude_sum = np.sum(magnitude[:len(magnitude)//2])
-        if magnitude_sum > 0:
-            spectral_centroid = np.sum(freqs[:len(freqs)//2] * magnitude[:len(magnitude)//2]) / magnitude_sum
-        else:
-            spectral_centroid = 0
-        
-        # 综合判断：低能量、低零交叉率且频谱中心异常
-        is_silent = (energy < self.silence_threshold and 
-                    zcr < self.zcr_threshold) or \
-                   (energy < self.energy_threshold and spectral_centroid < 100)
-        
+
+        energy, zcr, spectral_centroid = analyze(audio_data, self.features.frame_size, self.features.freqs)
+        return self._log_silence(energy, zcr, spectral_centroid)
+
+    def _log_silence(self, energy, zcr, spectral_centroid):
+        """按阈值判定静音并记录日志"""
+        is_silent = bool(silence_rule(energy, zcr, spectral_centroid, self.silence_thresholds))
         if is_silent:
             logger.debug(f"检测到静音: energy={energy:.4f}, zcr={zcr:.4f}, spectral_centroid={spectral_centroid:.2f}")
-        
         return is_silent
 
+    def _update_features(self):
+        """特征阶段：对新写入缓冲区的音频增量计算帧级特征"""
+        start, samples = self.buffer.since(self.features.position)
+        if start != self.features.position:
+            # 尚未计算的音频已被覆盖，从缓冲区中最早的样本重新开始
+            self.features.reset(start)
+        if len(samples):
+            t0 = time.perf_counter()
+            self.features.push(samples)
+            self.metrics["features"].record(time.perf_counter() - t0)
+
+    def _window_is_silence(self, start, end):
+        """
+        用帧级特征判断缓冲区 [start, end) 是否为静音，是对预处理后的窗口调用 is_silence 的近似
+
+        只聚合完全落在窗口内的帧（按特征存储的帧边界对齐，首尾不足一帧的样本不计入），
+        能量由原始音频的帧统计量按帧峰值换算，不经过预处理的高通平移；阈值附近的窗口可能与 is_silence 判断不同。
+        窗口内没有完整的帧时退回 is_silence。
+
+        Returns:
+            bool: 是否为静音
+        """
+        summary = self.features.window_summary(start, end)
+        if summary is None:
+            return self.is_silence(self.preprocess_audio(self.buffer.peek(end - start)))
+        return self._log_silence(*summary)
+
     def contains_hallucination(self, text):
         """
         检测文本是否包含已知的幻觉内容
@@ -150,32 +267,35 @@ class TranscriptionService:
         Returns:
             bool: 是否包含幻觉内容
         """
+        return self._hallucination_reason(text) is not None
+
+    def _hallucination_reason(self, text):
+        """
+        检测幻觉内容并记录日志
+
+        Args:
+            text: 要检测的文本
+
+        Returns:
+            str: pattern / repetition / non_linguistic，未检测到时为 None
+        """
         if not text or len(text.strip()) == 0:
-            return False
+            return None
             
         text_clean = text.strip()
         
-        # 检查是否包含幻觉关键词模式
-        for pattern in self.hallucination_patterns:
-            if re.search(pattern, text_clean, re.IGNORECASE):
-                logger.warning(f"检测到幻觉内容: '{text_clean}' 匹配模式: '{pattern}'")
-                return True
-        
-        # 检查重复内容（连续重复的字符或词组）
-        if len(text_clean) > 10:
-            # 检查字符重复
-            for i in range(len(text_clean) - 5):
-                substr = text_clean[i:i+3]
-                if text_clean.count(substr) > 3:
-                    logger.warning(f"检测到重复内容: '{text_clean}' 重复片段: '{substr}'")
-                    return True
-        
-        # 检查是否全是标点符号或特殊字符
-        if re.match(r'^[^\w\s]*$', text_clean):
+        # 幻觉关键词模式（合并为一个正则）、重复内容和非语言内容，见 HallucinationFilter
+        result = hallucination_filter.check(text_clean)
+        if result is None:
+            return None
+        reason, detail = result
+        if reason == "pattern":
+            logger.warning(f"检测到幻觉内容: '{text_clean}' 匹配模式: '{detail}'")
+        elif reason == "repetition":
+            logger.warning(f"检测到重复内容: '{text_clean}' 重复片段: '{detail}'")
+        else:
             logger.warning(f"检测到非语言内容: '{text_clean}'")
-            return True
-            
-        return False
+        return reason
 
     def validate_transcription_quality(self, text, confidence):
         """
@@ -194,110 +314,720 @@ class TranscriptionService:
         # 置信度过低
         if confidence < self.confidence_threshold:
             logger.debug(f"置信度过低: {confidence:.3f} < {self.confidence_threshold}")
+            prometheus.rejected_segments.inc(*self._metric_labels(), "low_confidence")
             return False
             
         # 包含幻觉内容
-        if self.contains_hallucination(text):
+        reason = self._hallucination_reason(text)
+        if reason is not None:
+            prometheus.rejected_segments.inc(*self._metric_labels(), reason)
             return False
             
         # 文本过短且置信度不是很高
         if len(text.strip()) < 3 and confidence < 0.8:
             logger.debug(f"文本过短且置信度不高: '{text}' confidence={confidence:.3f}")
+            prometheus.rejected_segments.inc(*self._metric_labels(), "too_short")
             return False
             
         return True
 
-    def listen_loop(self):
-        """语音转写主循环，从队列获取音频数据并进行转写"""
-        logger.info("开始语音转写线程")
-        with audio_service.create_input_stream(
+    def _metric_labels(self, fallback=False, draft=False):
+        """Prometheus 指标的标签值：(模型, 语言)"""
+        if fallback or draft:
+            model = PIPELINE_CONFIG["fallback_model"] if fallback else SPECULATIVE_CONFIG["draft_model"]
+        else:
+            model = whisper_service.model_name
+        return model, self.current_language
+
+    def _observe_fan_out(self, seconds):
+        """记录一条事件放入所有 WebSocket 客户端发送队列的耗时（在事件循环中调用）"""
+        prometheus.fan_out_seconds.observe(seconds, *self._metric_labels())
+
+    def _record_vad(self, samples, spans, window=True):
+        """
+        记录特征/VAD 阶段的结果
+
+        Args:
+            samples: 本次检查并移出（或切出）的样本数
+            spans: 送入解码的语音片段，None 或空表示全部跳过
+            window: 是否计为一个窗口
+        """
+        labels = self._metric_labels()
+        speech = sum(end - start for start, end in spans) if spans else 0
+        if window:
+            prometheus.vad_windows.inc(*labels, "speech" if speech else "skipped")
+        if speech:
+            prometheus.vad_audio_seconds.inc(*labels, "speech", amount=speech / SAMPLE_RATE)
+        if samples > speech:
+            prometheus.vad_audio_seconds.inc(*labels, "skipped", amount=(samples - speech) / SAMPLE_RATE)
+
+    def _publish(self, event_type, data):
+        """
+        从转写线程向WebSocket客户端推送事件（线程安全，不阻塞转写线程）
+
+        Args:
+            event_type: 事件类型
+            data: 要发送的数据
+        """
+        self.broadcaster.publish(event_type, data)
+
+    @staticmethod
+    def _format_timestamp(seconds):
+        """将秒数格式化为 HH:MM:SS"""
+        elapsed = int(seconds)
+        hours = elapsed // 3600
+        minutes = (elapsed % 3600) // 60
+        seconds = elapsed % 60
+        return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+    def _store_transcription(self, text, confidence, seconds):
+        """
+        写入一条最终转写结果
+
+        Args:
+            text: 转写文本
+            confidence: 置信度
+            seconds: 相对转写开始的秒数
+
+        Returns:
+            dict: 转写记录（含转写记录库分配的序号 id）
+        """
+        record = {
+            "text": text,
+            "timestamp": self._format_timestamp(seconds),
+            "seconds": round(seconds, 3),
+            "confidence": confidence
+        }
+        with tracing.span("store"):
+            self.transcript.append(record)
+        return record
+
+    def _emit_transcription(self, text, confidence, seconds):
+        """
+        推送一条最终转写结果并写入转写记录
+
+        Args:
+            text: 转写文本
+            confidence: 置信度
+            seconds: 相对转写开始的秒数
+        """
+        # 先写入记录取得序号，推送的事件带上同一序号，客户端可据此衔接 REST 增量拉取
+        record = self._store_transcription(text, confidence, seconds)
+        with tracing.span("publish"):
+            self._publish('transcription', {
+                'id': record["id"],
+                'text': text,
+                'timestamp': record["timestamp"],
+                'show_timestamp': True,
+                'confidence': confidence,
+                'mode': 'segments',
+                'final': True
+            })
+        logger.info(f"转写成功: '{text}' (confidence: {confidence:.3f})")
+
+    def _cut_window(self):
+        """
+        特征/VAD 阶段：从缓冲区切出一个窗口，预处理并做静音检测
+
+        固定窗口模式下每个窗口至多 BUFFER_SECONDS 秒，切出的样本立即从缓冲区消费，
+        超出的音频（如远程客户端快于实时推送）留给下一个窗口；流式模式下保留，
+        由解码阶段在提交后裁剪。
+
+        Returns:
+            AudioWindow: 待解码窗口；无需解码时返回 None
+        """
+        window_len = len(self.buffer)
+        if not self.streaming:
+            window_len = min(window_len, int(BUFFER_SECONDS * SAMPLE_RATE))
+        start = self.buffer.read_position
+        captured_at = self._captured_at(start)
+        if window_len < SAMPLE_RATE:
+            if not self.streaming:
+                self.buffer.consume(window_len)
+            return None
+
+        with tracing.span("features"):
+            self._update_features()
+        t0 = time.perf_counter()
+        # 静音判断只聚合已算好的帧级特征，静音窗口不再做预处理
+        with tracing.span("silence_check"):
+            silent = self._window_is_silence(start, start + window_len)
+        samples = spans = None
+        if not silent:
+            # 音频预处理：零拷贝视图输入，输出为窗口独占的数组
+            with tracing.span("preprocess"):
+                samples = self.preprocess_audio(self.buffer.peek(window_len))
+            with tracing.span("vad", engine=self.profile.vad["engine"]):
+                spans = self.vad.spans(start, samples)
+            silent = not spans
+        if not self.streaming or silent:
+            # 固定窗口模式只丢弃本窗口的样本，新采集的音频留给下一个窗口
+            self.buffer.consume(window_len)
+        self.metrics["vad"].record(time.perf_counter() - t0)
+        self._record_vad(window_len, None if silent else spans)
+
+        if silent:
+            logger.debug("检测到静音，跳过转写")
+            if self.streaming and self._in_speech:
+                self._in_speech = False
+                return AudioWindow(start, None, captured_at)  # 语音结束标记
+            return None
+        self._in_speech = True
+        return AudioWindow(start, samples, captured_at, spans=spans)
+
+    def _captured_at(self, start):
+        """
+        窗口首个样本写入环形缓冲区的时间（须在消费该样本之前调用）
+
+        Args:
+            start: 首个样本的绝对位置
+
+        Returns:
+            float: 写入时间，没有记录时为当前时间
+        """
+        written = self.buffer.write_time(start)
+        return time.time() if written is None else written
+
+    def _segmenting(self):
+        """是否按语音边界分段（端点检测只用于固定窗口模式）"""
+        return self.endpointing and not self.streaming
+
+    def _fixed_windows(self):
+        """是否按固定时长切窗（既不流式解码，也不按端点分段）"""
+        return not self.streaming and not self.endpointing
+
+    def _speculating(self):
+        """是否先推送草稿再校正（推测式转写只用于固定窗口模式）"""
+        return self.speculative and not self.streaming
+
+    def _cut_interval(self):
+        """两次切窗（或端点检查）之间的音频时长（秒）"""
+        if self.streaming:
+            return STREAMING_CONFIG["hop_seconds"]
+        if self.endpointing:
+            return ENDPOINTING_CONFIG["check_ms"] / 1000
+        return BUFFER_SECONDS
+
+    def _endpoint_window(self, final=False):
+        """
+        端点检测模式的特征/VAD 阶段：语音之后出现超过 silence_gap_ms 的静音时结束当前分段
+
+        分段超过 max_segment_seconds 时在最后一个已结束的语音片段处切分（没有则直接切分）；
+        语音总时长不足 min_speech_ms 的分段丢弃，不送入解码。
+
+        Args:
+            final: 音频流已结束，剩余音频作为最后一个分段
+
+        Returns:
+            AudioWindow: 已结束的分段；分段尚未结束或无需解码时返回 None
+        """
+        config = ENDPOINTING_CONFIG
+        pending = len(self.buffer)
+        start = self.buffer.read_position
+        if pending == 0:
+            return None
+        captured_at = self._captured_at(start)
+
+        with tracing.span("features"):
+            self._update_features()
+        t0 = time.perf_counter()
+        samples, spans = None, []
+        with tracing.span("silence_check"):
+            silent = self._window_is_silence(start, start + pending)
+        if not silent:
+            with tracing.span("preprocess"):
+                samples = self.preprocess_audio(self.buffer.peek(pending))
+            with tracing.span("vad", engine=self.profile.vad["engine"]):
+                spans = self.vad.spans(start, samples)
+
+        pad = int(self.profile.vad["speech_pad_ms"] * SAMPLE_RATE / 1000)
+        if not spans:
+            # 没有语音：只保留一段填充长度的音频作为下一个分段的开头
+            self.buffer.consume(max(pending - pad, 0))
+            self.metrics["vad"].record(time.perf_counter() - t0)
+            self._record_vad(max(pending - pad, 0), None, window=False)
+            return None
+
+        last_end = spans[-1][1]
+        gap = int(config["silence_gap_ms"] * SAMPLE_RATE / 1000)
+        cut = None
+        if final:
+            cut = pending
+        elif last_end < pending and pending - last_end + pad >= gap:
+            cut = last_end  # 片段末尾已含填充，静音超过 silence_gap_ms
+        elif pending >= int(config["max_segment_seconds"] * SAMPLE_RATE):
+            closed = [end for _, end in spans if end < pending]
+            cut = closed[-1] if closed else pending
+        if cut is None:
+            self.metrics["vad"].record(time.perf_counter() - t0)
+            return None
+
+        segment_spans = [(begin, min(end, cut)) for begin, end in spans if begin < cut]
+        speech = sum(max(end - begin - 2 * pad, 0) for begin, end in segment_spans)
+        self.buffer.consume(cut)
+        self.metrics["vad"].record(time.perf_counter() - t0)
+        if speech < config["min_speech_ms"] * SAMPLE_RATE / 1000:
+            logger.debug(f"分段语音过短（{speech / SAMPLE_RATE:.2f}s），跳过转写")
+            self._record_vad(cut, None)
+            return None
+        self._record_vad(cut, segment_spans)
+        return AudioWindow(start, samples[:cut], captured_at, spans=segment_spans)
+
+    def _decode_fixed_window(self, window, fallback=False):
+        """
+        固定窗口模式：转写整个窗口并推送通过质量验证的分段
+
+        Args:
+            window: 待解码窗口
+            fallback: 是否使用过载降级模型
+        """
+        with tracing.span("collect_speech"):
+            audio, span_map = collect_speech(window.samples, window.spans)
+        segments, _ = whisper_service.transcribe(audio, self.current_language, fallback=fallback, profile=self.profile)
+        # 时间戳按音频时钟计算，远程音频流快于实时发送时同样准确
+        window_start = (window.start - self._stream_origin) / SAMPLE_RATE
+        
+        # 验证转写质量，只推送高质量的分段内容
+        for text, confidence, seconds in self._valid_segments(segments, span_map, window_start):
+            self._emit_transcription(text, confidence, seconds)
+
+    def _valid_segments(self, segments, span_map, window_start):
+        """
+        筛选通过质量验证的分段
+
+        Args:
+            segments: 解码出的分段
+            span_map: 语音片段拼接的时间映射，None 表示未拼接
+            window_start: 窗口相对转写开始的秒数
+
+        Returns:
+            list: [(文本, 置信度, 相对转写开始的秒数), ...]
+        """
+        valid_segments = []
+        for seg in segments:
+            confidence = np.exp(seg.avg_logprob)
+            text = seg.text.strip()
+            with tracing.span("validate"):
+                valid = self.validate_transcription_quality(text, confidence)
+            if valid:
+                seg_start = seg.start if span_map is None else span_map.restore(seg.start)
+                valid_segments.append((text, confidence, window_start + seg_start))
+            else:
+                logger.debug(f"过滤低质量转写: '{text}' (confidence: {confidence:.3f})")
+        return valid_segments
+
+    def _decode_draft_window(self, window):
+        """
+        推测式转写：草稿模型解码窗口并立即推送草稿，再把同一段音频交给校正线程
+
+        校正积压（队列已满）时，最早的草稿不经校正直接作为最终结果提交。
+
+        Args:
+            window: 待解码窗口
+        """
+        with tracing.span("collect_speech"):
+            audio, span_map = collect_speech(window.samples, window.spans)
+        segments, _ = whisper_service.transcribe(audio, self.current_language, profile=self.profile, draft=True)
+        window_start = (window.start - self._stream_origin) / SAMPLE_RATE
+        drafts = self._valid_segments(segments, span_map, window_start)
+
+        self._draft_seq += 1
+        if drafts:
+            with tracing.span("publish"):
+                self._publish('draft', {
+                    'draft_id': self._draft_seq,
+                    'text': "".join(text for text, _, _ in drafts),  # 与最终结果一致，中文分段之间不加空格
+                    'timestamp': self._format_timestamp(drafts[0][2]),
+                    'show_timestamp': True,
+                    'confidence': float(np.mean([confidence for _, confidence, _ in drafts])),
+                    'mode': 'segments',
+                    'final': False
+                })
+            prometheus.capture_to_draft_seconds.observe(
+                time.time() - window.captured_at, *self._metric_labels(draft=True)
+            )
+        evicted = self.correction_queue.put(
+            DraftWindow(self._draft_seq, audio, span_map, window_start, drafts, window.captured_at)
+        )
+        if evicted is not None:
+            logger.warning(f"校正积压，草稿 {evicted.draft_id} 未经校正直接提交")
+            self._emit_correction(evicted, None)
+
+    def _emit_correction(self, draft, segments):
+        """
+        提交一个草稿窗口的最终结果并推送 correction 事件，客户端据 draft_id 原位替换草稿
+
+        Args:
+            draft: DraftWindow 实例
+            segments: 当前模型解码出的分段，None 表示未经校正、直接提交草稿中的分段
+        """
+        if segments is None:
+            finals, result = draft.segments, "promoted"
+        else:
+            finals = self._valid_segments(segments, draft.span_map, draft.window_start)
+            changed = [text for text, _, _ in finals] != [text for text, _, _ in draft.segments]
+            result = "changed" if changed else "unchanged"
+        prometheus.corrections.inc(*self._metric_labels(), result)
+        records = [self._store_transcription(*final) for final in finals]
+        if not records and not draft.segments:
+            # 没有推送过草稿，也没有最终结果
+            return
+        self._publish('correction', {
+            'draft_id': draft.draft_id,
+            'transcripts': [
+                {key: record[key] for key in ("id", "text", "timestamp", "confidence")} for record in records
+            ],
+            'corrected': segments is not None,
+            'show_timestamp': True,
+            'mode': 'segments',
+            'final': True
+        })
+        if records:
+            prometheus.capture_to_text_seconds.observe(time.time() - draft.captured_at, *self._metric_labels())
+        for record in records:
+            logger.info(f"转写成功: '{record['text']}' (confidence: {record['confidence']:.3f})")
+
+    def correction_loop(self):
+        """校正阶段：用当前模型重新解码已推送草稿的窗口，推送 correction 事件替换草稿"""
+        logger.info("开始校正线程")
+        while self.running:
+            draft = self.correction_queue.get(timeout=0.1 if self._vad_done else 1)
+            if draft is None:
+                if self._decode_done.is_set():
+                    # 远程音频流已解码完毕，剩余草稿也已校正
+                    self._drained.set()
+                continue
+            wait = time.time() - draft.enqueued_at
+            t0 = time.perf_counter()
+            try:
+                segments, _ = whisper_service.transcribe(draft.audio, self.current_language, profile=self.profile)
+                self._emit_correction(draft, list(segments))
+            except Exception as e:
+                logger.error(f"校正过程出错: {str(e)}")
+                self._publish('error', {'message': f'校正错误: {str(e)}'})
+                # 校正失败时保留草稿作为最终结果
+                self._emit_correction(draft, None)
+            elapsed = time.perf_counter() - t0
+            self.metrics["correction"].record(elapsed, wait=wait)
+            if len(draft.audio):
+                labels = self._metric_labels()
+                prometheus.decode_seconds.observe(elapsed, *labels)
+                prometheus.real_time_factor.observe(elapsed * SAMPLE_RATE / len(draft.audio), *labels)
+
+        # 停止时等解码线程放入最后一个草稿，尚未校正的草稿直接作为最终结果提交
+        self._decode_done.wait()
+        for draft in self.correction_queue.drain():
+            self._emit_correction(draft, None)
+        logger.info("校正线程已停止")
+
+    def _finalize_words(self, words, close=False):
+        """
+        将新提交的词并入当前句子，句子结束时作为最终结果推送
+
+        Args:
+            words: 新提交的词
+            close: 是否无论有无句末标点都结束当前句子
+        """
+        self._sentence.extend(words)
+        if close:
+            end = len(self._sentence)
+        else:
+            end = 0
+            for i, word in enumerate(self._sentence):
+                if ends_sentence([word]):
+                    end = i + 1
+        if end == 0:
+            return
+
+        sentence, self._sentence = self._sentence[:end], self._sentence[end:]
+        text = join_words(sentence)
+        confidence = float(np.mean([w.confidence for w in sentence]))
+        with tracing.span("validate"):
+            valid = self.validate_transcription_quality(text, confidence)
+        if valid:
+            self._emit_transcription(text, confidence, sentence[0].start)
+        else:
+            logger.debug(f"过滤低质量转写: '{text}' (confidence: {confidence:.3f})")
+
+    def _decode_streaming_window(self, window, fallback=False):
+        """
+        流式模式：解码全部未提交音频，提交稳定前缀并推送部分结果
+
+        已提交的音频会从缓冲区裁掉；未提交的音频超过 window_seconds 时，
+        强制提交重叠区之前的词，使窗口长度保持有界。
+
+        Args:
+            window: 待解码窗口，samples 为 None 时表示语音结束
+            fallback: 是否使用过载降级模型
+        """
+        config = STREAMING_CONFIG
+        if window.samples is None:
+            # 语音结束：提交剩余假设
+            self._finalize_words(self.agreement.flush(), close=True)
+            return
+
+        window_len = len(window.samples)
+        window_start = (window.start - self._stream_origin) / SAMPLE_RATE
+        window_end = window_start + window_len / SAMPLE_RATE
+        with tracing.span("collect_speech"):
+            audio, span_map = collect_speech(window.samples, window.spans)
+        segments, _ = whisper_service.transcribe(
+            audio, self.current_language, word_timestamps=True, fallback=fallback, profile=self.profile
+        )
+        restore = (lambda t, end=False: t) if span_map is None else span_map.restore
+        words = []
+        for seg in segments:
+            confidence = float(np.exp(seg.avg_logprob))
+            for w in seg.words or []:
+                words.append(StreamingWord(
+                    window_start + restore(w.start), window_start + restore(w.end, end=True), w.word, confidence
+                ))
+
+        committed = self.agreement.insert(words)
+        forced = window_len > config["window_seconds"] * SAMPLE_RATE
+        if forced:
+            committed += self.agreement.commit_until(window_end - config["overlap_seconds"])
+        self._finalize_words(committed, close=forced)
+
+        partial_words = self._sentence + self.agreement.pending
+        partial_text = join_words(partial_words)
+        if partial_text and not self.contains_hallucination(partial_text):
+            self._publish('partial', {
+                'text': partial_text,
+                'stable': join_words(self._sentence),
+                'timestamp': self._format_timestamp(partial_words[0].start),
+                'show_timestamp': True,
+                'mode': 'segments',
+                'final': False
+            })
+
+        # 裁掉已提交的音频，避免重复转写
+        committed_pos = self._stream_origin + int(self.agreement.committed_end * SAMPLE_RATE)
+        self.buffer.consume(committed_pos - self.buffer.read_position)
+        max_len = int(config["window_seconds"] * SAMPLE_RATE)
+        if len(self.buffer) > max_len:
+            # 没有可提交的词（如持续噪声），直接裁剪到重叠长度
+            self.buffer.consume(len(self.buffer) - int(config["overlap_seconds"] * SAMPLE_RATE))
+
+    def _open_source(self):
+        """打开音频来源：本地设备返回输入流；远程来源由 feed_audio 写入，无需打开设备"""
+        if self.source == "remote":
+            return contextlib.nullcontext()
+        return audio_service.create_input_stream(
             samplerate=SAMPLE_RATE, 
             channels=1, 
             dtype='float32',
             callback=self.audio_callback, 
-            blocksize=BLOCK_SIZE
-        ):
+            blocksize=BLOCK_SIZE,
+            device=self.device
+        )
+
+    def _next_window(self, final=False):
+        """
+        切出下一个窗口（端点检测或固定窗口/流式），按采样率为窗口创建追踪
+
+        Args:
+            final: 音频流已结束，剩余音频作为最后一个分段
+
+        Returns:
+            AudioWindow: 待解码窗口；无需解码时返回 None
+        """
+        trace = tracer.begin(
+            self.session_id, model=whisper_service.model_name, language=self.current_language, profile=self.profile.name
+        )
+        with tracing.activate(trace):
+            window = self._endpoint_window(final=final) if self._segmenting() else self._cut_window()
+        if window is None or trace is None:
+            # 静音等未送入解码的窗口不保留追踪
+            return window
+        trace.root.attrs["audio_seconds"] = 0 if window.samples is None else round(len(window.samples) / SAMPLE_RATE, 3)
+        return window._replace(trace=trace)
+
+    def _cut_final_window(self):
+        """远程音频流结束：切出剩余音频，流式模式下追加语音结束标记"""
+        window = self._next_window(final=True)
+        if window is not None:
+            self.decode_queue.put(window)
+        # 固定窗口模式每次只切一个窗口，积压的音频继续切完；音频流已结束，等解码队列有空位再放入，不丢弃窗口
+        while self._fixed_windows() and len(self.buffer):
+            while self.running and not self.decode_queue.wait_for_room(timeout=1):
+                continue
+            window = self._next_window(final=True)
+            if window is not None:
+                self.decode_queue.put(window)
+        if self.streaming and self._in_speech:
+            self._in_speech = False
+            start = self.buffer.read_position
+            self.decode_queue.put(AudioWindow(start, None, self._captured_at(start)))
+
+    def listen_loop(self):
+        """采集与特征/VAD 阶段：音频写入环形缓冲区，按音频时长切出窗口放入解码队列"""
+        logger.info("开始语音转写线程")
+        with self._open_source():
+            seen = self.buffer.write_position
             while self.running:
                 try:
-                    data = self.q.get(timeout=1)
-                    self.buffer = np.append(self.buffer, data, axis=0)
-
-                    if time.time() - self.last_time > BUFFER_SECONDS:
-                        if len(self.buffer) >= SAMPLE_RATE:
-                            samples = self.buffer[:, 0]
-                            
-                            # 音频预处理 - 确保数据类型正确
-                            samples = self.preprocess_audio(samples)
-                            # 再次确保是 float32 类型
-                            samples = samples.astype(np.float32)
-                            
-                            # 检查是否为静音
-                            if not self.is_silence(samples):
-                                try:
-                                    segments, _ = whisper_service.transcribe(samples, self.current_language)
-                                    segments_list = list(segments)
-                                    
-                                    for seg in segments_list:
-                                        confidence = np.exp(seg.avg_logprob)
-                                        text = seg.text.strip()
-                                        
-                                        # 验证转写质量
-                                        if self.validate_transcription_quality(text, confidence):
-                                            elapsed = int(time.time() - self.start_time)
-                                            hours = elapsed // 3600
-                                            minutes = (elapsed % 3600) // 60
-                                            seconds = elapsed % 60
-                                            timestamp = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-                                            
-                                            # 只推送高质量的分段内容
-                                            asyncio.run(self.broadcast_to_websockets('transcription', {
-                                                'text': text,
-                                                'timestamp': timestamp,
-                                                'show_timestamp': True,
-                                                'confidence': confidence,
-                                                'mode': 'segments'
-                                            }))
-                                            self.transcript.append({
-                                                "text": text,
-                                                "timestamp": timestamp,
-                                                "confidence": confidence
-                                            })
-                                            logger.info(f"转写成功: '{text}' (confidence: {confidence:.3f})")
-                                        else:
-                                            logger.debug(f"过滤低质量转写: '{text}' (confidence: {confidence:.3f})")
-                                            
-                                except Exception as e:
-                                    logger.error(f"转写过程出错: {str(e)}")
-                                    asyncio.run(self.broadcast_to_websockets('error', {'message': f'转写错误: {str(e)}'}))
-                            else:
-                                logger.debug("检测到静音，跳过转写")
-
-                        self.buffer = np.empty((0, 1), dtype='float32')
-                        self.last_time = time.time()
-                except queue.Empty:
-                    continue
+                    if self._drain_requested.is_set():
+                        self._cut_final_window()
+                        break
+                    if not self.buffer.wait_for_data(seen, timeout=0.1 if self.source == "remote" else 1):
+                        continue
+                    seen = self.buffer.write_position
+                    self._update_features()
+
+                    if seen >= self._next_cut:
+                        window = self._next_window()
+                        if window is not None:
+                            self.decode_queue.put(window)
+                        self._next_cut = seen + int(self._cut_interval() * SAMPLE_RATE)
+                        if self._fixed_windows() and len(self.buffer) >= SAMPLE_RATE * BUFFER_SECONDS:
+                            # 固定窗口模式积压了超过一个窗口的音频：收到新数据后立即再切
+                            self._next_cut = seen
                 except Exception as e:
                     logger.error(f"转写线程异常: {str(e)}")
-                    asyncio.run(self.broadcast_to_websockets('error', {'message': f'系统错误: {str(e)}'}))
+                    self._publish('error', {'message': f'系统错误: {str(e)}'})
+            self._vad_done = True
                     
         logger.info("语音转写线程已停止")
+
+    def decode_loop(self):
+        """解码阶段：从有界队列取出窗口，调用 Whisper 转写并推送结果"""
+        logger.info("开始解码线程")
+        while self.running:
+            window = self.decode_queue.get(timeout=0.1 if self._vad_done else 1)
+            if window is None:
+                if self._vad_done:
+                    # 远程音频流已切完并解码完毕（推测式转写还需等校正线程处理完剩余草稿）
+                    (self._decode_done if self._speculating() else self._drained).set()
+                continue
+            wait = time.time() - window.enqueued_at
+            emitted = len(self.transcript)
+            # downgrade 策略下，队列过载期间改用轻量模型（直接作为最终结果，不再推送草稿）
+            fallback = self.decode_queue.policy == "downgrade" and self.decode_queue.overloaded
+            draft = self._speculating() and not fallback
+            trace = window.trace
+            if trace is not None:
+                trace.add("queue_wait", trace.wall_to_perf(window.enqueued_at), time.perf_counter())
+            t0 = time.perf_counter()
+            with tracing.activate(trace), tracing.span("decode", fallback=fallback):
+                try:
+                    if self.streaming:
+                        self._decode_streaming_window(window, fallback)
+                    elif draft:
+                        self._decode_draft_window(window)
+                    else:
+                        self._decode_fixed_window(window, fallback)
+                except Exception as e:
+                    logger.error(f"转写过程出错: {str(e)}")
+                    self._publish('error', {'message': f'转写错误: {str(e)}'})
+            elapsed = time.perf_counter() - t0
+            self.metrics["decode"].record(elapsed, wait=wait)
+            self._observe_decode(window, elapsed, fallback, len(self.transcript) > emitted, draft)
+            tracer.finish(trace)
+
+        if self.streaming:
+            # 停止时提交尚未稳定的部分结果
+            self._finalize_words(self.agreement.flush(), close=True)
+        self._decode_done.set()
+        logger.info("解码线程已停止")
+
+    def _observe_decode(self, window, elapsed, fallback, emitted, draft=False):
+        """
+        记录解码耗时、实时率和采集到出字的延迟（从窗口首个样本写入环形缓冲区算起）
+
+        Args:
+            window: 已解码的窗口
+            elapsed: 解码耗时（秒）
+            fallback: 是否使用了过载降级模型
+            emitted: 本窗口是否产生了最终转写结果
+            draft: 是否为推测式转写的草稿解码
+        """
+        if window.samples is None or not len(window.samples):
+            return
+        labels = self._metric_labels(fallback, draft)
+        prometheus.decode_seconds.observe(elapsed, *labels)
+        prometheus.real_time_factor.observe(elapsed * SAMPLE_RATE / len(window.samples), *labels)
+        if emitted:
+            prometheus.capture_to_text_seconds.observe(time.time() - window.captured_at, *labels)
+
+    def get_pipeline_metrics(self):
+        """
+        获取流水线各阶段的队列深度和耗时
+
+        Returns:
+            dict: 队列状态和各阶段指标
+        """
+        return {
+            "status": "success",
+            "running": self.running,
+            "queues": {
+                "capture_to_vad": {
+                    "depth_samples": len(self.buffer),
+                    "depth_seconds": round(len(self.buffer) / SAMPLE_RATE, 3),
+                    "capacity_seconds": round(self.buffer.capacity / SAMPLE_RATE, 3),
+                    "dropped_samples": self.buffer.dropped,
+                },
+                "vad_to_decode": self.decode_queue.snapshot(),
+                "draft_to_correction": self.correction_queue.snapshot(),
+            },
+            "stages": {name: metrics.snapshot() for name, metrics in self.metrics.items()},
+        }
+
+    def set_overload_policy(self, policy):
+        """
+        设置解码队列的过载策略
+
+        Args:
+            policy: drop_oldest / merge / downgrade
+
+        Returns:
+            dict: 操作状态和消息
+        """
+        if policy not in OVERLOAD_POLICIES:
+            return {"status": "error", "message": f"不支持的过载策略: {policy}"}
+        self.decode_queue.policy = policy
+        return {"status": "success", "message": f"已切换过载策略: {policy}"}
     
-    def start(self):
+    def start(self, source="device"):
         """
         开始语音转写
         
+        Args:
+            source: 音频来源，device 为本地输入设备，remote 为 feed_audio 写入的远程音频流
+        
         Returns:
             dict: 操作状态
         """
+        if source not in AUDIO_SOURCES:
+            return {"status": "error", "message": f"不支持的音频来源: {source}"}
         if not self.running:
             self.running = True
-            self.transcript = []  # 清空之前的转写记录
+            self.source = source
+            self.transcript.reset()  # 开启新的转写记录（之前的记录保留在库中）
             self.start_time = time.time()  # 新增：记录开始时间
-            # 启动后台线程
-            thread = threading.Thread(target=self.listen_loop)
-            thread.daemon = True
-            thread.start()
-            logger.info("开始语音转写")
+            self.buffer.clear()
+            self.features.reset(self.buffer.write_position)
+            self.vad.reset()
+            self.decode_queue.clear()
+            self._stream_origin = self.buffer.write_position
+            self.agreement.reset()
+            self._sentence = []
+            self._in_speech = False
+            self._next_cut = self.buffer.write_position + int(self._cut_interval() * SAMPLE_RATE)
+            self._drain_requested.clear()
+            self._drained.clear()
+            self._vad_done = False
+            self._decode_done.clear()
+            self.correction_queue.drain()
+            # 启动采集/VAD 线程和解码线程，推测式转写另启动校正线程
+            targets = [self.listen_loop, self.decode_loop]
+            if self._speculating():
+                targets.append(self.correction_loop)
+            for target in targets:
+                thread = threading.Thread(target=target)
+                thread.daemon = True
+                thread.start()
+            logger.info(f"开始语音转写 (会话: {self.session_id})")
             return {"status": "started"}
         return {"status": "already_started"}
     
@@ -310,9 +1040,26 @@ class TranscriptionService:
         """
         if self.running:
             self.running = False
-            logger.info("停止语音转写")
+            logger.info(f"停止语音转写 (会话: {self.session_id})")
             return {"status": "stopped"}
         return {"status": "already_stopped"}
+
+    def drain(self, timeout=None):
+        """
+        远程音频流结束：切出并解码剩余音频后停止（阻塞调用）
+        
+        Args:
+            timeout: 最长等待时间（秒）
+            
+        Returns:
+            bool: 是否在超时前处理完所有音频
+        """
+        if not self.running:
+            return True
+        self._drain_requested.set()
+        finished = self._drained.wait(timeout)
+        self.stop()
+        return finished
     
     def clear(self):
         """
@@ -321,30 +1068,33 @@ class TranscriptionService:
         Returns:
             dict: 操作状态
         """
-        self.transcript = []
+        self.transcript.reset()
         self.continuous_text = ""  # 清空连续文本
         logger.info("清空转写记录")
         return {"status": "cleared"}
     
-    def save(self, file_path='transcript_output.txt'):
+    def save(self, file_path=None):
         """
         保存转写结果为文本文件
         
         Args:
-            file_path: 保存的文件路径
+            file_path: 保存的文件路径，默认按会话区分
             
         Returns:
             str: 文件路径或错误信息
         """
+        if file_path is None:
+            if self.session_id == DEFAULT_SESSION_ID:
+                file_path = 'transcript_output.txt'
+            else:
+                file_path = f'transcript_{self.session_id}.txt'
         if self.transcript:
             try:
                 with open(file_path, "w", encoding="utf-8") as f:
+                    # 从转写记录库分批读取，长时间会话也不会一次性载入内存
                     for item in self.transcript:
-                        if isinstance(item, dict):
-                            # 只保存时间戳和文本，不保存置信度
-                            f.write(f"[{item['timestamp']}] {item['text']}\n")
-                        else:
-                            f.write(f"{item}\n")
+                        # 只保存时间戳和文本，不保存置信度
+                        f.write(f"[{item['timestamp']}] {item['text']}\n")
                 logger.info(f"转写结果已保存到: {file_path}")
                 return file_path
             except Exception as e:
@@ -365,6 +1115,24 @@ class TranscriptionService:
         self.current_language = language
         return {"status": "success", "message": f"已切换到语言: {language}"}
 
+    def set_profile(self, name):
+        """
+        切换推理配置档（转写中也可切换，从下一个窗口起生效）
+
+        Args:
+            name: 配置档名称
+
+        Returns:
+            dict: 操作状态和消息
+        """
+        profile = inference_profiles.get(name)
+        if profile is None:
+            return {"status": "error", "message": f"不支持的推理配置档: {name}"}
+        self.profile = profile
+        # 新检测器不沿用旧参数检测出的片段，采集线程在下一个窗口读到它
+        self.vad = self._create_vad()
+        return {"status": "success", "message": f"已切换推理配置档: {name}"}
+
     def set_display_mode(self, mode):
         """
         设置显示模式
@@ -381,5 +1149,78 @@ class TranscriptionService:
         self.display_mode = mode
         return {"status": "success", "message": f"已切换到{self.display_mode}模式"}
 
+    def set_streaming(self, enabled):
+        """
+        设置流式转写模式
+        
+        Args:
+            enabled: 是否启用滑动窗口流式转写
+            
+        Returns:
+            dict: 操作状态和消息
+        """
+        if self.running:
+            return {"status": "error", "message": "请先停止转写再切换流式模式"}
+        
+        self.streaming = bool(enabled)
+        mode = "流式" if self.streaming else "固定窗口"
+        return {"status": "success", "message": f"已切换到{mode}转写模式"}
+
+    def set_endpointing(self, enabled):
+        """
+        设置端点检测分段（固定窗口模式下按语音边界切分）
+        
+        Args:
+            enabled: 是否启用端点检测
+            
+        Returns:
+            dict: 操作状态和消息
+        """
+        if self.running:
+            return {"status": "error", "message": "请先停止转写再切换分段模式"}
+        
+        self.endpointing = bool(enabled)
+        mode = "端点检测" if self.endpointing else "固定时长"
+        return {"status": "success", "message": f"已切换到{mode}分段"}
+
+    def set_speculative(self, enabled):
+        """
+        设置推测式双模型转写（草稿模型先出结果，当前模型校正后替换）
+        
+        Args:
+            enabled: 是否启用
+            
+        Returns:
+            dict: 操作状态和消息
+        """
+        if self.running:
+            return {"status": "error", "message": "请先停止转写再切换推测式转写"}
+        
+        self.speculative = bool(enabled)
+        state = "启用" if self.speculative else "关闭"
+        return {"status": "success", "message": f"已{state}推测式转写（草稿模型: {SPECULATIVE_CONFIG['draft_model']}）"}
+
+    def info(self):
+        """
+        获取会话概要信息
+        
+        Returns:
+            dict: 会话ID、运行状态和配置
+        """
+        return {
+            "session_id": self.session_id,
+            "running": self.running,
+            "language": self.current_language,
+            "streaming": self.streaming,
+            "endpointing": self.endpointing,
+            "speculative": self.speculative,
+            "profile": self.profile.name,
+            "source": self.source,
+            "device": self.device,
+            "transcripts": len(self.transcript),
+            "clients": len(self.broadcaster),
+            "created_at": self.created_at
+        }
+
 # 创建全局转写服务实例
 transcription_service = TranscriptionService()
\ No newline at end of file
@@ -0,0 +1,410 @@
+"""
+语音活动检测（VAD）- 可替换的检测引擎，在特征/VAD 阶段运行一次，只把语音片段送入 Whisper
+"""
+import bisect
+import numpy as np
+from app.core.logging import logger
+from app.config import SAMPLE_RATE, ANTI_HALLUCINATION_CONFIG, FEATURE_FRAME_SIZE
+from app.services.features import frame_stats, centroid_bins, speech_frames
+
+# 支持的 VAD 引擎
+VAD_ENGINES = ("energy", "silero", "webrtc")
+
+
+def mask_to_spans(mask, frame_size, min_speech, min_silence, pad, length):
+    """
+    把逐帧语音掩码转换为语音片段
+
+    Args:
+        mask: 布尔数组，True 表示该帧为语音
+        frame_size: 每帧样本数
+        min_speech: 最短语音片段（样本数），更短的片段丢弃
+        min_silence: 片段之间短于该长度（样本数）的静音会被合并
+        pad: 每个片段两侧的填充（样本数）
+        length: 音频总样本数
+
+    Returns:
+        list: [(起始样本, 结束样本), ...]
+    """
+    mask = np.asarray(mask, dtype=bool)
+    if not mask.any():
+        return []
+    edges = np.diff(np.concatenate(([False], mask, [False])).astype(np.int8))
+    starts = np.flatnonzero(edges == 1) * frame_size
+    ends = np.minimum(np.flatnonzero(edges == -1) * frame_size, length)
+
+    spans = []
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        if spans and start - spans[-1][1] < min_silence:
+            spans[-1][1] = end
+        else:
+            spans.append([start, end])
+    return pad_spans([(s, e) for s, e in spans if e - s >= min_speech], pad, length)
+
+
+def pad_spans(spans, pad, length):
+    """
+    片段两侧加填充，并合并因填充而重叠的片段
+
+    Args:
+        spans: [(起始样本, 结束样本), ...]
+        pad: 填充样本数
+        length: 音频总样本数
+
+    Returns:
+        list: 填充后的片段
+    """
+    padded = []
+    for start, end in spans:
+        start, end = max(0, start - pad), min(length, end + pad)
+        if padded and start <= padded[-1][1]:
+            padded[-1] = (padded[-1][0], max(end, padded[-1][1]))
+        else:
+            padded.append((start, end))
+    return padded
+
+
+class VADEngine:
+    """VAD 引擎基类：子类实现 speech_spans"""
+
+    name = None
+
+    def __init__(self, min_speech_ms=250, min_silence_ms=500, speech_pad_ms=400):
+        """
+        初始化引擎
+
+        Args:
+            min_speech_ms: 最短语音片段
+            min_silence_ms: 片段之间短于该时长的静音会被合并
+            speech_pad_ms: 每个片段两侧的填充
+        """
+        self.min_speech_ms = min_speech_ms
+        self.min_silence_ms = min_silence_ms
+        self.speech_pad_ms = speech_pad_ms
+
+    @staticmethod
+    def _samples(ms):
+        """毫秒换算为样本数"""
+        return int(ms * SAMPLE_RATE / 1000)
+
+    def speech_spans(self, audio):
+        """
+        检测语音片段
+
+        Args:
+            audio: 16kHz float32 音频
+
+        Returns:
+            list: [(起始样本, 结束样本), ...]，相对 audio 开头
+        """
+        raise NotImplementedError
+
+    def detect(self, start, audio):
+        """
+        检测从缓冲区绝对位置 start 开始的一段音频中的语音片段
+
+        默认直接调用 speech_spans；能复用已缓存特征的引擎按位置查找，不再处理音频。
+
+        Args:
+            start: audio 首个样本的绝对位置
+            audio: 16kHz float32 音频
+
+        Returns:
+            list: [(起始样本, 结束样本), ...]，相对 audio 开头
+        """
+        return self.speech_spans(audio)
+
+
+class FrameMaskVAD(VADEngine):
+    """按固定帧长逐帧判断语音、再合并为片段的引擎"""
+
+    frame_size = FEATURE_FRAME_SIZE
+
+    def frame_mask(self, audio):
+        """
+        逐帧判断是否为语音
+
+        Args:
+            audio: 16kHz float32 音频
+
+        Returns:
+            numpy.ndarray: 每个完整帧一个布尔值
+        """
+        raise NotImplementedError
+
+    def speech_spans(self, audio):
+        """按帧掩码检测语音片段"""
+        mask = self.frame_mask(audio)
+        return mask_to_spans(
+            mask, self.frame_size, self._samples(self.min_speech_ms),
+            self._samples(self.min_silence_ms), self._samples(self.speech_pad_ms), len(audio)
+        )
+
+
+class EnergyVAD(FrameMaskVAD):
+    """能量启发式：与静音门限相同的帧级能量、零交叉率和频谱中心规则，几乎没有额外开销"""
+
+    name = "energy"
+
+    def __init__(self, thresholds=None, features=None, **options):
+        """
+        初始化引擎
+
+        Args:
+            thresholds: (silence_threshold, zcr_threshold, energy_threshold)，或每次检测时调用、
+                返回该元组的函数（阈值可在运行时调整）；默认取反幻觉配置
+            features: 会话的 FrameFeatures（帧长须为 FEATURE_FRAME_SIZE），提供时 detect 直接使用
+                已增量算好的帧统计量；None 表示每次对传入的音频计算（如整段文件）
+            **options: 传给 VADEngine 的片段参数
+        """
+        super().__init__(**options)
+        config = ANTI_HALLUCINATION_CONFIG
+        self._thresholds = thresholds or (
+            config["silence_threshold"], config["zcr_threshold"], config["energy_threshold"]
+        )
+        self.features = features
+        self.freqs = centroid_bins(self.frame_size, SAMPLE_RATE)
+
+    @property
+    def thresholds(self):
+        """当前的静音判定阈值 (silence_threshold, zcr_threshold, energy_threshold)"""
+        return self._thresholds() if callable(self._thresholds) else self._thresholds
+
+    def frame_mask(self, audio):
+        """逐帧应用静音规则（能量按整段峰值归一化）"""
+        n_frames = len(audio) // self.frame_size
+        if not n_frames:
+            return np.zeros(0, dtype=bool)
+        frames = np.asarray(audio[:n_frames * self.frame_size], dtype=np.float32).reshape(n_frames, self.frame_size)
+        return speech_frames(frame_stats(frames, self.freqs), self.frame_size, self.thresholds)
+
+    def detect(self, start, audio):
+        """
+        用会话已算好的帧特征检测语音片段（帧按特征存储的帧边界对齐，首尾不足一帧的音频不参与判断）
+
+        预处理只做缩放和一个样本的平移，能量按峰值归一化、零交叉率和频谱中心与幅度无关，
+        因此原始音频的帧统计量可直接使用。缓存的帧不完整（已被覆盖或从窗口中间重新开始计算）时，
+        对传入的音频重新计算。
+
+        Args:
+            start: audio 首个样本的绝对位置
+            audio: 预处理后的窗口音频
+
+        Returns:
+            list: [(起始样本, 结束样本), ...]，相对 audio 开头
+        """
+        if self.features is None:
+            return self.speech_spans(audio)
+        end = start + len(audio)
+        first, mask = self.features.speech_mask(start, end, self.thresholds)
+        offset = self.features.frame_start(first) - start
+        if offset >= self.frame_size or end - (start + offset + len(mask) * self.frame_size) >= self.frame_size:
+            return self.speech_spans(audio)
+        spans = mask_to_spans(
+            mask, self.frame_size, self._samples(self.min_speech_ms),
+            self._samples(self.min_silence_ms), self._samples(self.speech_pad_ms), len(audio) - offset
+        )
+        # 从首帧开始的片段（填充已到达首帧边界）延伸到窗口开头，与逐窗口计算一致
+        return [(begin + offset if begin else 0, stop + offset) for begin, stop in spans]
+
+
+class SileroVAD(VADEngine):
+    """Silero VAD（faster-whisper 自带的 ONNX 模型）"""
+
+    name = "silero"
+
+    def __init__(self, threshold=0.5, **options):
+        """
+        初始化引擎
+
+        Args:
+            threshold: 语音概率阈值
+            **options: 传给 VADEngine 的片段参数
+        """
+        super().__init__(**options)
+        from faster_whisper.vad import VadOptions, get_speech_timestamps, get_vad_model
+        get_vad_model()  # 预先加载 ONNX 模型，避免首个窗口承担加载耗时
+        self._detect = get_speech_timestamps
+        self._options = VadOptions(
+            threshold=threshold,
+            min_speech_duration_ms=self.min_speech_ms,
+            min_silence_duration_ms=self.min_silence_ms,
+            speech_pad_ms=self.speech_pad_ms,
+        )
+
+    def speech_spans(self, audio):
+        """调用 Silero 检测语音片段"""
+        timestamps = self._detect(np.asarray(audio, dtype=np.float32), self._options, sampling_rate=SAMPLE_RATE)
+        return [(ts["start"], ts["end"]) for ts in timestamps]
+
+
+class WebRTCVAD(FrameMaskVAD):
+    """WebRTC VAD（GMM 模型，需安装 webrtcvad），按 30ms 帧判断"""
+
+    name = "webrtc"
+    frame_size = SAMPLE_RATE * 30 // 1000
+
+    def __init__(self, mode=2, **options):
+        """
+        初始化引擎
+
+        Args:
+            mode: 激进程度 0-3，越大越容易判为非语音
+            **options: 传给 VADEngine 的片段参数
+        """
+        super().__init__(**options)
+        import webrtcvad
+        self._vad = webrtcvad.Vad(int(mode))
+
+    def frame_mask(self, audio):
+        """逐帧调用 WebRTC VAD"""
+        n_frames = len(audio) // self.frame_size
+        pcm = (np.clip(audio[:n_frames * self.frame_size], -1.0, 1.0) * 32767).astype("<i2").tobytes()
+        step = self.frame_size * 2
+        return np.array(
+            [self._vad.is_speech(pcm[i * step:(i + 1) * step], SAMPLE_RATE) for i in range(n_frames)],
+            dtype=bool
+        )
+
+
+def create_vad_engine(name, config, thresholds=None, features=None):
+    """
+    按名称创建 VAD 引擎；依赖不可用时退回能量引擎
+
+    Args:
+        name: energy / silero / webrtc
+        config: VAD_CONFIG 形式的参数
+        thresholds: 能量引擎使用的静音阈值（元组或返回元组的函数）
+        features: 能量引擎复用的会话帧特征（FrameFeatures），None 表示每次重新计算
+
+    Returns:
+        VADEngine: 引擎实例
+    """
+    options = {
+        "min_speech_ms": config["min_speech_ms"],
+        "min_silence_ms": config["min_silence_ms"],
+        "speech_pad_ms": config["speech_pad_ms"],
+    }
+    if name not in VAD_ENGINES:
+        raise ValueError(f"不支持的 VAD 引擎: {name}")
+    try:
+        if name == "silero":
+            return SileroVAD(threshold=config["threshold"], **options)
+        if name == "webrtc":
+            return WebRTCVAD(mode=config["webrtc_mode"], **options)
+    except ImportError as e:
+        logger.warning(f"VAD 引擎 {name} 不可用（{e}），改用 energy 引擎")
+    return EnergyVAD(thresholds, features, **options)
+
+
+class SpeechTracker:
+    """
+    对重叠的连续窗口增量地检测语音片段
+
+    流式模式下每次切出的窗口与上一个窗口大部分重叠。已检测过的音频沿用缓存的片段，
+    只对新音频（加上一段回看上下文）运行引擎，因此每段音频大致只检测一次。
+    固定窗口模式下窗口互不重叠，等同于逐窗口检测。
+    """
+
+    def __init__(self, engine, context_samples=SAMPLE_RATE):
+        """
+        初始化
+
+        Args:
+            engine: VADEngine 实例
+            context_samples: 重新检测时回看的样本数
+        """
+        self.engine = engine
+        self.context = int(context_samples)
+        self.reset()
+
+    def reset(self):
+        """清空缓存的片段"""
+        self._spans = []
+        self._position = None
+
+    def spans(self, start, samples):
+        """
+        检测窗口内的语音片段
+
+        Args:
+            start: 窗口首个样本的绝对位置
+            samples: 窗口音频
+
+        Returns:
+            list: [(起始样本, 结束样本), ...]，相对窗口开头
+        """
+        end = start + len(samples)
+        if self._position is None or not start < self._position <= end:
+            begin, kept = start, []
+        else:
+            begin = max(start, self._position - self.context)
+            kept = [(a, b) for a, b in self._spans if b > start]
+        detected = [(begin + a, begin + b) for a, b in self.engine.detect(begin, samples[begin - start:])]
+        # 与缓存的片段取并集，间隔短于 min_silence 的片段合并（跨越回看边界的片段重新连接）
+        gap = VADEngine._samples(self.engine.min_silence_ms)
+        spans = []
+        for a, b in sorted(kept + detected):
+            if spans and a - spans[-1][1] < gap:
+                spans[-1] = (spans[-1][0], max(b, spans[-1][1]))
+            else:
+                spans.append((a, b))
+        self._spans = spans
+        self._position = end
+        return [(max(a, start) - start, b - start) for a, b in self._spans]
+
+
+class SpanMap:
+    """
+    语音片段拼接后的时间映射
+
+    只把语音片段拼接起来送入 Whisper，解码结果的时间戳需要映射回原窗口。
+    """
+
+    def __init__(self, spans):
+        """
+        初始化
+
+        Args:
+            spans: [(起始样本, 结束样本), ...]，相对窗口开头
+        """
+        self._origins = [start / SAMPLE_RATE for start, _ in spans]
+        self._offsets = []
+        offset = 0
+        for start, end in spans:
+            self._offsets.append(offset / SAMPLE_RATE)
+            offset += end - start
+
+    def restore(self, t, end=False):
+        """
+        把拼接音频中的时间换算为原窗口中的时间
+
+        Args:
+            t: 拼接音频中的时间（秒）
+            end: t 是否为结束时间（恰好落在片段交界处时归入前一个片段）
+
+        Returns:
+            float: 原窗口中的时间（秒）
+        """
+        find = bisect.bisect_left if end else bisect.bisect_right
+        index = max(find(self._offsets, t) - 1, 0)
+        return self._origins[index] + t - self._offsets[index]
+
+
+def collect_speech(samples, spans):
+    """
+    拼接窗口中的语音片段
+
+    Args:
+        samples: 窗口音频
+        spans: 相对窗口开头的语音片段，None 表示整段送入
+
+    Returns:
+        tuple: (拼接后的音频, SpanMap 或 None)
+    """
+    if spans is None:
+        return samples, None
+    if len(spans) == 1 and spans[0] == (0, len(samples)):
+        return samples, None
+    audio = np.concatenate([samples[start:end] for start, end in spans])
+    return audio, SpanMap(spans)
@@ -1,9 +1,332 @@
 """
 Whisper 模型服务
 """
-from faster_whisper import WhisperModel
+import bisect
+import contextlib
+import dataclasses
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from faster_whisper import BatchedInferencePipeline
 from app.core.logging import logger
-from app.config import DEFAULT_MODEL, ANTI_HALLUCINATION_CONFIG
+from app.config import (
+    SAMPLE_RATE, DEFAULT_MODEL, DEFAULT_LANGUAGE, ANTI_HALLUCINATION_CONFIG, PIPELINE_CONFIG, BATCHING_CONFIG,
+    MODEL_POOL_CONFIG, MODEL_SWAP_CONFIG, MODEL_CACHE_CONFIG, AVAILABLE_MODELS, SPECULATIVE_CONFIG
+)
+from app.services.model_pool import ModelPool, load_model, replica_core_sets
+from app.services.model_cache import ModelCache
+from app.services.profiles import inference_profiles
+from app.services import tracing
+
+
+def decode_options(profile=None):
+    """
+    单窗口和批量解码共用的推理参数
+
+    Args:
+        profile: 推理配置档，None 为默认配置档（beam_size、best_of 取自配置档）
+
+    Returns:
+        dict: transcribe 的关键字参数
+    """
+    config = ANTI_HALLUCINATION_CONFIG
+    profile = profile or inference_profiles.default
+    return dict(
+        beam_size=profile.beam_size,
+        best_of=profile.best_of,
+        temperature=config["temperature"],
+        no_speech_threshold=config["no_speech_threshold"],
+        condition_on_previous_text=config["condition_on_previous_text"],
+        compression_ratio_threshold=config["compression_ratio_threshold"],
+        log_prob_threshold=config["log_prob_threshold"],
+        initial_prompt=config["initial_prompt"],
+    )
+
+
+class DecodeRequest:
+    """提交给批处理调度器的单个窗口解码请求"""
+
+    def __init__(self, samples, language, word_timestamps, fallback, profile=None, draft=False):
+        """
+        初始化解码请求
+
+        Args:
+            samples: 音频样本
+            language: 语言代码，None 表示自动检测
+            word_timestamps: 是否生成词级时间戳
+            fallback: 是否使用过载降级模型
+            profile: 推理配置档，None 为默认配置档
+            draft: 是否使用推测式转写的草稿模型
+        """
+        self.samples = samples
+        self.language = language
+        self.word_timestamps = word_timestamps
+        self.fallback = fallback
+        self.profile = profile or inference_profiles.default
+        self.draft = draft
+        self.trace = tracing.current()  # 提交窗口所属的追踪，执行线程据此记录推理步骤
+        self.submitted_at = time.perf_counter()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+    @property
+    def key(self):
+        """只有模型、推理配置档、语言和词级时间戳设置相同的请求才能合并为一批"""
+        return (self.fallback, self.draft, self.profile.name, self.language, self.word_timestamps)
+
+
+class BatchScheduler:
+    """
+    跨会话的动态批处理调度器
+
+    各会话的解码线程提交窗口后阻塞等待结果；调度线程收到第一个请求后，
+    最多再等待 max_delay_ms 或凑满 max_batch_size 个请求，按 DecodeRequest.key
+    分组。每组窗口拼接为一段音频，用 clip_timestamps 标出各窗口边界，经
+    BatchedInferencePipeline 一次批量解码，再按时间偏移把分段还给各自的请求。
+    只有一个请求的组走普通的单窗口解码。
+
+    同时执行的批次数不超过 workers（即模型池副本数）；所有副本都忙时，
+    新窗口继续在队列中积累，下一批因此更大。
+    """
+
+    def __init__(self, service, max_batch_size=8, max_delay_ms=20, workers=1):
+        """
+        初始化调度器
+
+        Args:
+            service: WhisperService 实例
+            max_batch_size: 每批最多合并的窗口数
+            max_delay_ms: 收到第一个窗口后最多等待的毫秒数
+            workers: 同时执行的批次数
+        """
+        self.service = service
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_delay = max(0.0, max_delay_ms / 1000)
+        self.workers = max(1, int(workers))
+        self._pending = deque()
+        self._cond = threading.Condition(threading.Lock())
+        self._thread = None
+        self._slots = threading.Semaphore(self.workers)
+        self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="whisper-batch")
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.requests = 0
+        self.batched_requests = 0  # 以批量方式（批大小 > 1）解码的请求数
+        self.max_batch_seen = 0
+
+    def submit(self, samples, language, word_timestamps=False, fallback=False, profile=None, draft=False):
+        """
+        提交一个窗口并等待解码完成（由各会话的解码线程调用）
+
+        Args:
+            samples: 音频样本
+            language: 语言代码，None 表示自动检测
+            word_timestamps: 是否生成词级时间戳
+            fallback: 是否使用过载降级模型
+            profile: 推理配置档，None 为默认配置档
+            draft: 是否使用推测式转写的草稿模型
+
+        Returns:
+            tuple: (segments, info)，segments 为分段列表，时间相对于本窗口
+        """
+        request = DecodeRequest(samples, language, word_timestamps, fallback, profile, draft)
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._pending.append(request)
+            self._cond.notify()
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _collect(self):
+        """等待第一个请求，再在延迟上限内收集更多请求"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._pending)
+            deadline = self._pending[0].submitted_at + self.max_delay
+            while len(self._pending) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0 or not self._cond.wait(remaining):
+                    break
+            count = min(len(self._pending), self.max_batch_size)
+            return [self._pending.popleft() for _ in range(count)]
+
+    def _run(self):
+        """调度线程：等待空闲的执行槽位，收集请求并分组交给执行线程"""
+        while True:
+            self._slots.acquire()
+            requests = self._collect()
+            groups = {}
+            for request in requests:
+                groups.setdefault(request.key, []).append(request)
+            for i, group in enumerate(groups.values()):
+                if i > 0:
+                    self._slots.acquire()
+                self._executor.submit(self._run_group, group)
+
+    def _run_group(self, group):
+        """执行线程：解码一组请求，释放槽位并唤醒等待的解码线程"""
+        started = time.perf_counter()
+        for request in group:
+            if request.trace is not None:
+                request.trace.add("batch_wait", request.submitted_at, started, batch_size=len(group))
+        try:
+            if len(group) == 1:
+                request = group[0]
+                with tracing.activate(request.trace):
+                    request.result = self.service.transcribe_window(
+                        request.samples, request.language, request.word_timestamps, request.fallback, request.profile,
+                        request.draft
+                    )
+            else:
+                self._decode_batch(group)
+                finished = time.perf_counter()
+                for request in group:
+                    if request.trace is not None:
+                        request.trace.add("batched_inference", started, finished, batch_size=len(group))
+        except Exception as e:
+            for request in group:
+                request.error = e
+        finally:
+            self._slots.release()
+        with self._stats_lock:
+            self.batches += 1
+            self.requests += len(group)
+            if len(group) > 1:
+                self.batched_requests += len(group)
+            self.max_batch_seen = max(self.max_batch_seen, len(group))
+        for request in group:
+            request.done.set()
+
+    def _decode_batch(self, group):
+        """
+        批量解码一组窗口并按时间偏移拆分结果
+
+        Args:
+            group: 键相同的 DecodeRequest 列表
+        """
+        first = group[0]
+        offsets, clips, position = [], [], 0
+        for request in group:
+            offsets.append(position / SAMPLE_RATE)
+            clips.append({"start": position / SAMPLE_RATE, "end": (position + len(request.samples)) / SAMPLE_RATE})
+            position += len(request.samples)
+        audio = np.concatenate([request.samples for request in group])
+
+        # 窗口已经过特征/VAD 阶段的静音检测，批量路径按 clip_timestamps 解码，不再做 VAD 过滤
+        with self.service.acquire_model(first.fallback, first.profile, first.draft) as model:
+            segments, info = BatchedInferencePipeline(model).transcribe(
+                audio,
+                language=first.language,
+                multilingual=first.language is None,  # 自动检测语言时逐窗口检测
+                clip_timestamps=clips,
+                batch_size=len(group),
+                without_timestamps=False,
+                word_timestamps=first.word_timestamps,
+                **decode_options(first.profile)
+            )
+            segments = list(segments)
+        results = [[] for _ in group]
+        for seg in segments:
+            # 分段时间为拼接音频中的绝对时间，据此找到所属窗口并换算为窗口内时间
+            index = max(bisect.bisect_right(offsets, seg.start + 0.01) - 1, 0)
+            offset = offsets[index]
+            words = None
+            if seg.words is not None:
+                words = [
+                    dataclasses.replace(w, start=round(w.start - offset, 3), end=round(w.end - offset, 3))
+                    for w in seg.words
+                ]
+            results[index].append(dataclasses.replace(
+                seg, start=round(seg.start - offset, 3), end=round(seg.end - offset, 3), words=words
+            ))
+        for request, segments_list in zip(group, results):
+            request.result = (segments_list, info)
+
+    def snapshot(self):
+        """
+        导出批处理统计
+
+        Returns:
+            dict: 批次数、请求数、平均批大小等
+        """
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_delay_ms": round(self.max_delay * 1000, 3),
+            "pending": len(self._pending),
+            "batches": self.batches,
+            "requests": self.requests,
+            "batched_requests": self.batched_requests,
+            "avg_batch_size": round(self.requests / self.batches, 3) if self.batches else 0.0,
+            "max_batch_seen": self.max_batch_seen,
+        }
+
+
+class ModelSwapJob:
+    """后台模型切换任务：加载 -> 预热 -> 切换 -> 释放旧模型"""
+
+    def __init__(self, model_name, previous_model):
+        """
+        初始化切换任务
+
+        Args:
+            model_name: 目标模型名称
+            previous_model: 切换前的模型名称
+        """
+        self.job_id = uuid.uuid4().hex[:12]
+        self.model_name = model_name
+        self.previous_model = previous_model
+        self.status = "pending"
+        self.progress = 0.0
+        self.message = "等待加载"
+        self.created_at = time.time()
+        self.finished_at = None
+
+    @property
+    def done(self):
+        """任务是否已结束（成功或失败）"""
+        return self.status in ("completed", "failed")
+
+    def update(self, status, progress, message):
+        """
+        更新任务进度
+
+        Args:
+            status: 当前阶段
+            progress: 进度（0-1）
+            message: 进度说明
+        """
+        self.status = status
+        self.progress = progress
+        self.message = message
+        if self.done:
+            self.finished_at = time.time()
+        logger.info(f"模型切换任务 {self.job_id}: {message}")
+
+    def snapshot(self):
+        """
+        导出任务状态
+
+        Returns:
+            dict: 任务ID、目标模型、阶段、进度和耗时
+        """
+        return {
+            "job_id": self.job_id,
+            "model": self.model_name,
+            "previous_model": self.previous_model,
+            "status": self.status,
+            "progress": round(self.progress, 3),
+            "message": self.message,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
 
 class WhisperService:
     """Whisper 模型服务类"""
@@ -11,7 +334,26 @@ class WhisperService:
     def __init__(self):
         """初始化 Whisper 服务"""
         self.model = None
+        self.pool = None  # 模型副本池，推理分发给负载最小的副本
+        # 已加载模型的 LRU 缓存，模型池的副本从这里获取
+        self.cache = ModelCache(MODEL_CACHE_CONFIG["memory_budget_mb"], load_model)
         self.model_name = DEFAULT_MODEL
+        # 常驻的轻量模型（过载降级模型、推测式转写的草稿模型），首次需要时加载
+        self._resident = {}
+        self._resident_lock = threading.Lock()
+        # 后台模型切换任务，保留最近的若干个供查询
+        self.swap_jobs = OrderedDict()
+        self._active_swap = None
+        self._swap_lock = threading.Lock()
+        # 多个会话同时解码时合并为批量推理
+        self.batcher = None
+        if BATCHING_CONFIG["enabled"]:
+            self.batcher = BatchScheduler(
+                self,
+                BATCHING_CONFIG["max_batch_size"],
+                BATCHING_CONFIG["max_delay_ms"],
+                MODEL_POOL_CONFIG["replicas"]
+            )
         self.load_model(DEFAULT_MODEL)
     
     def load_model(self, model_name):
@@ -22,18 +364,13 @@ class WhisperService:
             model_name: 模型名称
             
         Returns:
-            WhisperModel: 加载的模型实例
+            WhisperModel: 加载的模型实例（模型池中第一个副本）
         """
         try:
-            logger.info(f"正在加载模型: {model_name} ")
-            self.model = WhisperModel(
-                model_name, 
-                device="cpu",           
-                compute_type="int8",   
-                cpu_threads=8,             
-                num_workers=1 
-            )
-            self.model_name = model_name
+            logger.info(f"正在加载模型: {model_name} (副本数: {MODEL_POOL_CONFIG['replicas']})")
+            old_pool = self._install_pool(self._build_pool(model_name))
+            if old_pool is not None:
+                old_pool.close(MODEL_SWAP_CONFIG["release_timeout"])
             logger.info(f"模型 {model_name} 加载成功")
             return self.model
         except Exception as e:
@@ -41,24 +378,213 @@ class WhisperService:
             # 如果加载失败，尝试加载默认模型
             if model_name != DEFAULT_MODEL:
                 logger.info(f"尝试加载默认模型: {DEFAULT_MODEL}")
-                self.model = WhisperModel(
-                    DEFAULT_MODEL, 
-                    device="cpu", 
-                    compute_type="int8", 
-                    cpu_threads=8, 
-                    num_workers=1
-                )
-                self.model_name = DEFAULT_MODEL
+                old_pool = self._install_pool(self._build_pool(DEFAULT_MODEL))
+                if old_pool is not None:
+                    old_pool.close(MODEL_SWAP_CONFIG["release_timeout"])
                 return self.model
             raise
+
+    def _build_pool(self, model_name):
+        """按 MODEL_POOL_CONFIG 和默认推理配置档从模型缓存构建模型池"""
+        config, profile = MODEL_POOL_CONFIG, inference_profiles.default
+        return ModelPool(
+            model_name,
+            replicas=config["replicas"],
+            cpu_threads=profile.cpu_threads,
+            pin_cores=config["pin_cores"],
+            compute_type=profile.compute_type,
+            cache=self.cache
+        )
+
+    def preload_models(self, model_names=None):
+        """
+        把模型预加载到缓存（每个副本槽位一份），之后切换到这些模型无需等待加载
+
+        Args:
+            model_names: 模型名称列表，默认取 MODEL_CACHE_CONFIG["preload"]
+        """
+        config, profile = MODEL_POOL_CONFIG, inference_profiles.default
+        core_sets = replica_core_sets(max(1, int(config["replicas"])), profile.cpu_threads, config["pin_cores"])
+        for model_name in MODEL_CACHE_CONFIG["preload"] if model_names is None else model_names:
+            if model_name not in AVAILABLE_MODELS:
+                logger.warning(f"跳过预加载不支持的模型: {model_name}")
+                continue
+            try:
+                for slot, cores in enumerate(core_sets):
+                    self.cache.acquire(model_name, profile.compute_type, profile.cpu_threads, slot, cores)
+                    self.cache.release(model_name, profile.compute_type, profile.cpu_threads, slot)
+                logger.info(f"模型已预加载: {model_name}")
+            except Exception as e:
+                logger.error(f"预加载模型失败: {model_name}: {str(e)}")
+
+    def start_preload(self):
+        """在后台线程中预加载配置的模型，不阻塞服务启动"""
+        if MODEL_CACHE_CONFIG["preload"]:
+            threading.Thread(target=self.preload_models, daemon=True).start()
+
+    def _install_pool(self, pool):
+        """
+        原子地切换到新的模型池
+
+        每个窗口在开始解码时读取一次 self.pool，因此切换发生在窗口之间：
+        进行中的窗口继续使用旧模型池，之后的窗口使用新模型池。
+
+        Args:
+            pool: 新的模型池
+
+        Returns:
+            ModelPool: 被替换下来的旧模型池（首次加载时为 None）
+        """
+        old_pool, self.pool = self.pool, pool
+        self.model = pool.model
+        self.model_name = pool.model_name
+        return old_pool
+
+    def swap_model(self, model_name):
+        """
+        在后台加载并预热新模型，然后在窗口之间原子切换，不中断转写
+
+        Args:
+            model_name: 模型名称
+
+        Returns:
+            dict: 操作状态和任务信息（可通过 get_swap_job 查询进度）
+        """
+        with self._swap_lock:
+            active = self._active_swap
+            if active is not None and not active.done:
+                return {
+                    "status": "error",
+                    "message": f"已有模型切换任务在进行: {active.job_id}",
+                    "job": active.snapshot()
+                }
+            job = ModelSwapJob(model_name, self.model_name)
+            self._active_swap = job
+            self.swap_jobs[job.job_id] = job
+            while len(self.swap_jobs) > MODEL_SWAP_CONFIG["history"]:
+                self.swap_jobs.popitem(last=False)
+        threading.Thread(target=self._run_swap, args=(job,), daemon=True).start()
+        return {
+            "status": "accepted",
+            "message": f"正在后台切换到模型: {model_name}",
+            "job_id": job.job_id,
+            "job": job.snapshot()
+        }
+
+    def _run_swap(self, job):
+        """后台线程：执行模型切换任务"""
+        try:
+            job.update("loading", 0.1, f"正在加载模型: {job.model_name}")
+            pool = self._build_pool(job.model_name)
+            job.update("warming_up", 0.6, "正在预热模型")
+            pool.warm_up(DEFAULT_LANGUAGE)
+            job.update("swapping", 0.9, "正在切换模型")
+            old_pool = self._install_pool(pool)
+            job.update("releasing", 0.95, "等待旧模型上的推理结束")
+            if old_pool is not None and not old_pool.close(MODEL_SWAP_CONFIG["release_timeout"]):
+                logger.warning("旧模型仍有推理未结束，将在推理完成后释放")
+            job.update("completed", 1.0, f"已切换到模型: {job.model_name}")
+        except Exception as e:
+            logger.error(f"模型切换失败: {str(e)}")
+            job.update("failed", job.progress, f"切换模型失败: {str(e)}")
+
+    def get_swap_job(self, job_id):
+        """
+        查询模型切换任务
+
+        Args:
+            job_id: 任务ID
+
+        Returns:
+            ModelSwapJob: 任务，不存在时返回 None
+        """
+        return self.swap_jobs.get(job_id)
     
-    def transcribe(self, audio_samples, language):
+    def get_fallback_model(self):
+        """
+        获取过载降级使用的轻量模型，首次调用时加载
+
+        Returns:
+            WhisperModel: 降级模型实例
+        """
+        return self._resident_model(PIPELINE_CONFIG["fallback_model"], "降级模型")
+
+    def get_draft_model(self):
+        """
+        获取推测式转写出草稿的轻量模型，首次调用时加载
+
+        Returns:
+            WhisperModel: 草稿模型实例
+        """
+        return self._resident_model(SPECULATIVE_CONFIG["draft_model"], "草稿模型")
+
+    def _resident_model(self, model_name, role):
+        """
+        获取常驻的轻量模型（降级模型和草稿模型相同时共用一个实例）
+
+        Args:
+            model_name: 模型名称
+            role: 模型用途，用于日志
+
+        Returns:
+            WhisperModel: 模型实例
+        """
+        with self._resident_lock:
+            model = self._resident.get(model_name)
+            if model is None:
+                logger.info(f"正在加载{role}: {model_name}")
+                # 轻量模型常驻使用，持有缓存引用不释放
+                profile = inference_profiles.default
+                model = self._resident[model_name] = self.cache.acquire(
+                    model_name, profile.compute_type, profile.cpu_threads
+                )
+            return model
+
+    @contextlib.contextmanager
+    def acquire_model(self, fallback=False, profile=None, draft=False):
         """
-        转写音频
+        获取一次推理使用的模型：降级模型、草稿模型，或模型池中负载最小的副本；
+        配置档的计算精度或线程数与模型池不同时，从模型缓存获取当前模型的对应实例
+
+        Args:
+            fallback: 是否使用过载降级模型
+            profile: 推理配置档，None 为默认配置档
+            draft: 是否使用推测式转写的草稿模型
+
+        Yields:
+            WhisperModel: 模型实例
+        """
+        if fallback or draft:
+            yield self.get_fallback_model() if fallback else self.get_draft_model()
+            return
+        pool = self.pool
+        if profile is not None and (profile.compute_type, profile.cpu_threads) != (pool.compute_type, pool.cpu_threads):
+            model_name = pool.model_name
+            model = self.cache.acquire(model_name, profile.compute_type, profile.cpu_threads)
+            try:
+                yield model
+            finally:
+                self.cache.release(model_name, profile.compute_type, profile.cpu_threads)
+            return
+        with self.pool.acquire() as replica:
+            if replica is not None:
+                yield replica.model
+                return
+        # 取到的是刚被切换下来的旧模型池，改用当前模型池
+        with self.pool.acquire() as replica:
+            yield replica.model
+
+    def transcribe(self, audio_samples, language, word_timestamps=False, fallback=False, profile=None, draft=False):
+        """
+        转写音频（启用批处理时经调度器与其他会话的窗口合并解码）
 
         Args:
             audio_samples: 音频样本数据
             language: 语言代码 ('auto' 将被转换为 None 以启用自动检测)
+            word_timestamps: 是否生成词级时间戳（流式模式提交时需要）
+            fallback: 是否使用过载降级模型
+            profile: 推理配置档，None 为默认配置档
+            draft: 是否使用推测式转写的草稿模型
 
         Returns:
             tuple: (segments, info) 转写结果和信息
@@ -67,26 +593,40 @@ class WhisperService:
         if language == 'auto':
             language = None
 
-        # 使用速度优化的推理参数
-        config = ANTI_HALLUCINATION_CONFIG
-        return self.model.transcribe(
-            audio_samples,
-            language=language,
-            beam_size=1,                          # 从默认5降到1，大幅提升速度
-            best_of=1,                           # 从默认5降到1，提升速度
-            temperature=config["temperature"],
-            no_speech_threshold=config["no_speech_threshold"],
-            condition_on_previous_text=config["condition_on_previous_text"],
-            compression_ratio_threshold=config["compression_ratio_threshold"],
-            log_prob_threshold=config["log_prob_threshold"],
-            initial_prompt=config["initial_prompt"],
-            word_timestamps=False,                # 不生成词级时间戳，提升速度
-            vad_filter=True,                     # 启用 VAD 过滤，减少无效推理
-            vad_parameters=dict(
-                min_silence_duration_ms=500,      # 最小静音持续时间
-                speech_pad_ms=400                 # 语音填充时间
-            )
-        )
+        with tracing.span("whisper", audio_seconds=round(len(audio_samples) / SAMPLE_RATE, 3)):
+            if self.batcher is not None:
+                return self.batcher.submit(audio_samples, language, word_timestamps, fallback, profile, draft)
+            return self.transcribe_window(audio_samples, language, word_timestamps, fallback, profile, draft)
+
+    def transcribe_window(self, audio_samples, language, word_timestamps=False, fallback=False, profile=None,
+                          draft=False):
+        """
+        单独转写一个窗口（不经过批处理调度器）
+
+        Args:
+            audio_samples: 音频样本数据
+            language: 语言代码，None 表示自动检测
+            word_timestamps: 是否生成词级时间戳
+            fallback: 是否使用过载降级模型
+            profile: 推理配置档，None 为默认配置档
+            draft: 是否使用推测式转写的草稿模型
+
+        Returns:
+            tuple: (segments, info) 转写结果（分段列表）和信息
+        """
+        with self.acquire_model(fallback, profile, draft) as model:
+            # 追踪中的 prepare 为梅尔频谱和语言检测，generate 为逐片段的编码和解码
+            with tracing.span("prepare"):
+                segments, info = model.transcribe(
+                    audio_samples,
+                    language=language,
+                    word_timestamps=word_timestamps,      # 默认不生成词级时间戳，提升速度
+                    vad_filter=False,                    # 窗口已在特征/VAD 阶段只保留语音片段，不再重复 VAD
+                    **decode_options(profile)
+                )
+            # 分段是惰性生成的，需在占用副本期间完成解码
+            with tracing.span("generate"):
+                return list(segments), info
 
 # 创建全局 Whisper 服务实例
 whisper_service = WhisperService()
\ No newline at end of file
@@ -0,0 +1,120 @@
+"""
+幻觉过滤基准：逐模式 re.search + O(n²) 重复检测 vs 合并正则 + 线性重复检测
+
+生成一组样本分段（正常语句、命中幻觉模式、重复内容、纯标点，以及较长的拼接分段），
+分别用旧实现（逐个模式调用 re.search，对每个位置调用 text.count）和 HallucinationFilter 检测，
+先核对两者的判定完全一致，再输出每条分段的平均耗时。也可以用 --corpus 指定文本文件（每行一个分段）。
+
+用法（在仓库根目录）:
+    python -m benchmarks.bench_hallucination
+    python -m benchmarks.bench_hallucination --corpus segments.txt --json hallucination.json
+"""
+import argparse
+import json
+import re
+import time
+import numpy as np
+from app.config import HALLUCINATION_PATTERNS
+from app.services.hallucination import HallucinationFilter
+
+SENTENCES = [
+    "大家好，我们开始今天的会议。", "首先回顾一下上周的进度。", "这个接口的延迟还需要再优化一下。",
+    "客户反馈说新版本的安装流程比较复杂。", "我们下周三之前把测试报告发出来。", "OK, let's move on to the next item.",
+    "预算方面目前还有一些不确定的地方。", "好的", "嗯", "The deployment is scheduled for Friday night.",
+]
+HALLUCINATIONS = [
+    "请不吝点赞 订阅 转发 打赏支持明镜与点点栏目", "优优独播剧场——YoYo Television Series Exclusive",
+    "感谢观看", "字幕由网友们提供，感谢支持", "……", "？！",
+    "谢谢谢谢谢谢谢谢谢谢谢谢谢谢谢谢", "我们我们我们我们我们我们我们我们",
+]
+
+
+def legacy_check(text, patterns):
+    """旧实现：逐个模式 re.search，对每个位置调用 text.count"""
+    for pattern in patterns:
+        if re.search(pattern, text, re.IGNORECASE):
+            return True
+    if len(text) > 10:
+        for i in range(len(text) - 5):
+            if text.count(text[i:i + 3]) > 3:
+                return True
+    return bool(re.match(r'^[^\w\s]*$', text))
+
+
+def build_corpus(n, seed=0):
+    """生成样本分段：约 85% 正常语句（部分为多句拼接的长分段，少量为数百字且几乎不重复的超长分段），其余为各类幻觉内容"""
+    rng = np.random.default_rng(seed)
+    corpus = []
+    for _ in range(n):
+        roll = rng.random()
+        if roll < 0.15:
+            corpus.append(HALLUCINATIONS[rng.integers(len(HALLUCINATIONS))])
+        elif roll < 0.17:
+            # 超长且几乎没有重复片段的文本（如合并后的长窗口），旧实现的重复检测在这里退化为 O(n²)
+            codes = rng.integers(0x4E00, 0x9FA5, rng.integers(300, 1000))
+            corpus.append("".join(map(chr, codes.tolist())))
+        elif roll < 0.3:
+            picks = rng.choice(len(SENTENCES), rng.integers(4, 12))
+            corpus.append("".join(SENTENCES[i] for i in picks))
+        else:
+            corpus.append(SENTENCES[rng.integers(len(SENTENCES))])
+    return corpus
+
+
+def timed(check, corpus, repeat):
+    """返回 (每条分段的平均微秒数, 判定结果)"""
+    results = [check(text) for text in corpus]  # 预热
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for text in corpus:
+            check(text)
+    return (time.perf_counter() - t0) / (repeat * len(corpus)) * 1e6, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="幻觉过滤耗时基准")
+    parser.add_argument("--corpus", default=None, help="文本文件，每行一个分段")
+    parser.add_argument("--segments", type=int, default=5000, help="未指定语料时生成的分段数")
+    parser.add_argument("--repeat", type=int, default=5, help="重复次数")
+    parser.add_argument("--json", default=None, help="结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    if args.corpus:
+        with open(args.corpus, encoding="utf-8") as f:
+            corpus = [line.strip() for line in f if line.strip()]
+    else:
+        corpus = build_corpus(args.segments)
+
+    hallucination_filter = HallucinationFilter(HALLUCINATION_PATTERNS)
+    legacy_us, legacy = timed(lambda text: legacy_check(text, HALLUCINATION_PATTERNS), corpus, args.repeat)
+    compiled_us, compiled = timed(lambda text: hallucination_filter.check(text) is not None, corpus, args.repeat)
+    mismatches = sum(a != b for a, b in zip(legacy, compiled))
+    if mismatches:
+        raise SystemExit(f"判定不一致: {mismatches} 条分段")
+
+    # 按长度分组比较，重复检测的差距随分段长度增大
+    lengths = np.array([len(text) for text in corpus])
+    groups = []
+    for label, mask in (("短（≤30 字）", lengths <= 30), ("长（31-200 字）", (lengths > 30) & (lengths <= 200)),
+                        ("超长（>200 字）", lengths > 200)):
+        subset = [text for text, keep in zip(corpus, mask) if keep]
+        if subset:
+            old, _ = timed(lambda text: legacy_check(text, HALLUCINATION_PATTERNS), subset, args.repeat)
+            new, _ = timed(lambda text: hallucination_filter.check(text) is not None, subset, args.repeat)
+            groups.append({"group": label, "segments": len(subset), "legacy_us": round(old, 2), "compiled_us": round(new, 2)})
+
+    print(f"分段: {len(corpus)}  模式: {len(HALLUCINATION_PATTERNS)}  判定为幻觉: {sum(compiled)}  判定一致")
+    print(f"{'分组':<10} {'分段数':>7} {'旧实现(µs)':>11} {'新实现(µs)':>11} {'加速比':>7}")
+    for g in [{"group": "全部", "segments": len(corpus), "legacy_us": round(legacy_us, 2), "compiled_us": round(compiled_us, 2)}] + groups:
+        print(f"{g['group']:<10} {g['segments']:>7} {g['legacy_us']:>11.2f} {g['compiled_us']:>11.2f} "
+              f"{g['legacy_us'] / g['compiled_us']:>7.1f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"segments": len(corpus), "legacy_us": legacy_us, "compiled_us": compiled_us, "groups": groups},
+                      f, ensure_ascii=False, indent=2)
+        print(f"结果已写入: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
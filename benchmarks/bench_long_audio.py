@@ -0,0 +1,84 @@
+"""
+长音频多进程解码基准：实时率随进程数的变化
+
+读取本地 16kHz 16 位单声道 WAV 文件（可多个，依次拼接；--repeat 可循环加长），
+用 VAD 引擎检测语音片段并在静音处切块，然后对每个进程数 N 启动一个
+LongAudioDecoder（每个进程分得 total_threads / N 个线程，可选绑定核心）解码整段音频。
+输出实时率（处理耗时 / 音频时长，越小越快）、相对 N=1 的加速比和扩展效率。
+进程启动和模型加载不计入耗时。
+
+用法（在仓库根目录）:
+    python -m benchmarks.bench_long_audio --wav meeting.wav --workers 1,2,4
+    python -m benchmarks.bench_long_audio --wav a.wav b.wav --repeat 4 --workers 1,2,4,8 --pin --json long.json
+"""
+import argparse
+import json
+import wave
+import numpy as np
+from app.config import SAMPLE_RATE, VAD_CONFIG
+from app.services.long_audio import LongAudioDecoder, plan_chunks
+from app.services.model_pool import available_cores
+from app.services.vad import create_vad_engine
+
+
+def load_wavs(paths, repeat):
+    """读取并拼接 WAV 文件"""
+    parts = []
+    for path in paths:
+        with wave.open(path, "rb") as wav:
+            if wav.getframerate() != SAMPLE_RATE or wav.getsampwidth() != 2 or wav.getnchannels() != 1:
+                raise SystemExit(f"仅支持 16kHz 16 位单声道 WAV 文件: {path}")
+            parts.append(np.frombuffer(wav.readframes(wav.getnframes()), dtype="<i2").astype(np.float32) / 32768)
+    return np.tile(np.concatenate(parts), repeat)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="长音频多进程解码实时率 vs 进程数基准")
+    parser.add_argument("--wav", nargs="+", required=True, help="16kHz 16 位单声道 WAV 文件")
+    parser.add_argument("--repeat", type=int, default=1, help="音频循环次数")
+    parser.add_argument("--model", default="tiny", help="模型名称")
+    parser.add_argument("--workers", default="1,2,4", help="逗号分隔的进程数列表")
+    parser.add_argument("--total-threads", type=int, default=len(available_cores()),
+                        help="所有进程共享的线程总数，每个进程分得 total/N")
+    parser.add_argument("--pin", action="store_true", help="把每个进程绑定到互不重叠的核心")
+    parser.add_argument("--chunk-seconds", type=float, default=30, help="每块最大时长")
+    parser.add_argument("--language", default="zh")
+    parser.add_argument("--json", default=None, help="结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    audio = load_wavs(args.wav, args.repeat)
+    duration = len(audio) / SAMPLE_RATE
+    spans = create_vad_engine(VAD_CONFIG["engine"], VAD_CONFIG).speech_spans(audio)
+    chunks = plan_chunks(spans, int(args.chunk_seconds * SAMPLE_RATE), len(audio))
+    speech = sum(end - start for start, end in spans) / SAMPLE_RATE
+    options = dict(beam_size=1, best_of=1, temperature=0.0, condition_on_previous_text=False)
+
+    results = []
+    for n in [int(x) for x in args.workers.split(",")]:
+        threads = max(1, args.total_threads // n)
+        decoder = LongAudioDecoder(args.model, n, cpu_threads=threads, pin_cores=args.pin)
+        # 预热：每个进程解码一块，完成进程启动和模型加载
+        decoder.transcribe(audio, chunks[:n], args.language, options)
+        segments, stats = decoder.transcribe(audio, chunks, args.language, options)
+        decoder.close()
+        results.append({**stats, "segments": len(segments)})
+
+    print(f"模型: {args.model}  音频: {duration:.0f}s（语音 {speech:.0f}s）  块: {len(chunks)}  线程总数: {args.total_threads}")
+    print(f"{'进程':>4} {'线程/进程':>8} {'耗时(s)':>9} {'实时率':>8} {'加速比':>7} {'效率':>6}")
+    base = results[0]
+    for r in results:
+        speedup = base["elapsed_seconds"] / r["elapsed_seconds"]
+        r["speedup"] = round(speedup, 3)
+        r["efficiency"] = round(speedup * base["workers"] / r["workers"], 3)
+        print(f"{r['workers']:>4} {r['cpu_threads']:>8} {r['elapsed_seconds']:>9.2f} "
+              f"{r['real_time_factor']:>8.4f} {speedup:>7.2f} {r['efficiency']:>6.2f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"model": args.model, "audio_seconds": duration, "speech_seconds": speech,
+                       "chunks": len(chunks), "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"结果已写入: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
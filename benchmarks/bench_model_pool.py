@@ -0,0 +1,125 @@
+"""
+模型池吞吐基准：吞吐量随副本数 K 的变化
+
+对每个 K 加载一个 ModelPool（每个副本分得 total_threads / K 个线程，可选绑定核心），
+由若干并发“流”各自循环提交固定长度的音频窗口，经 acquire() 分发给负载最小的副本解码。
+输出每秒处理的音频秒数（实时倍数）、相对 K=1 的加速比和扩展效率。
+
+音频默认取自 --wav 指定的 16kHz 16 位单声道 WAV 文件（循环切成窗口）；
+未指定时使用合成信号，只能反映编码器和短解码的开销。
+
+用法（在仓库根目录）:
+    python -m benchmarks.bench_model_pool --model tiny --replicas 1,2,4,8 --wav speech.wav
+    python -m benchmarks.bench_model_pool --replicas 1,2,4,8 --total-threads 32 --pin --json pool.json
+"""
+import argparse
+import json
+import threading
+import time
+import wave
+import numpy as np
+from app.config import SAMPLE_RATE
+from app.services.model_pool import ModelPool, available_cores
+
+
+def load_windows(path, window_seconds, count):
+    """从 WAV 文件切出 count 个窗口（不足时循环），未指定文件时生成合成信号"""
+    window_len = int(window_seconds * SAMPLE_RATE)
+    if path:
+        with wave.open(path, "rb") as wav:
+            if wav.getframerate() != SAMPLE_RATE or wav.getsampwidth() != 2 or wav.getnchannels() != 1:
+                raise SystemExit("仅支持 16kHz 16 位单声道 WAV 文件")
+            audio = np.frombuffer(wav.readframes(wav.getnframes()), dtype="<i2").astype(np.float32) / 32768
+        if len(audio) < window_len:
+            audio = np.tile(audio, window_len // max(len(audio), 1) + 1)
+    else:
+        rng = np.random.default_rng(0)
+        t = np.arange(window_len * 4) / SAMPLE_RATE
+        audio = (0.3 * np.sin(2 * np.pi * 220 * t) * np.sin(2 * np.pi * 3 * t)
+                 + 0.02 * rng.standard_normal(len(t))).astype(np.float32)
+    starts = [(i * window_len) % max(len(audio) - window_len, 1) for i in range(count)]
+    return [audio[s:s + window_len] for s in starts]
+
+
+def run_streams(pool, windows, streams, language):
+    """并发流循环提交窗口，返回总耗时"""
+    cursor = iter(range(len(windows)))
+    lock = threading.Lock()
+
+    def stream():
+        while True:
+            with lock:
+                index = next(cursor, None)
+            if index is None:
+                return
+            with pool.acquire() as replica:
+                segments, _ = replica.model.transcribe(
+                    windows[index], language=language, beam_size=1, best_of=1,
+                    temperature=0.0, condition_on_previous_text=False, vad_filter=False
+                )
+                list(segments)
+
+    threads = [threading.Thread(target=stream) for _ in range(streams)]
+    t0 = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="模型池吞吐量 vs 副本数基准")
+    parser.add_argument("--model", default="tiny", help="模型名称")
+    parser.add_argument("--replicas", default="1,2,4", help="逗号分隔的副本数列表")
+    parser.add_argument("--total-threads", type=int, default=len(available_cores()),
+                        help="所有副本共享的线程总数，每个副本分得 total/K")
+    parser.add_argument("--pin", action="store_true", help="把每个副本绑定到互不重叠的核心")
+    parser.add_argument("--streams", type=int, default=0, help="并发流数量，默认等于 2*K")
+    parser.add_argument("--windows", type=int, default=32, help="每轮解码的窗口总数")
+    parser.add_argument("--window-seconds", type=float, default=3.0, help="窗口长度")
+    parser.add_argument("--wav", default=None, help="16kHz 16 位单声道 WAV 文件")
+    parser.add_argument("--language", default="zh")
+    parser.add_argument("--json", default=None, help="结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    windows = load_windows(args.wav, args.window_seconds, args.windows)
+    audio_seconds = len(windows) * args.window_seconds
+    results = []
+    for k in [int(x) for x in args.replicas.split(",")]:
+        threads = max(1, args.total_threads // k)
+        pool = ModelPool(args.model, replicas=k, cpu_threads=threads, pin_cores=args.pin)
+        streams = args.streams or 2 * k
+        run_streams(pool, windows[:k], k, args.language)  # 预热每个副本
+        elapsed = run_streams(pool, windows, streams, args.language)
+        results.append({
+            "replicas": k,
+            "threads_per_replica": threads,
+            "pinned": any(r.cores for r in pool.replicas),
+            "streams": streams,
+            "audio_seconds": audio_seconds,
+            "elapsed_seconds": round(elapsed, 3),
+            "throughput_x_realtime": round(audio_seconds / elapsed, 3),
+            "per_replica_processed": [r.processed for r in pool.replicas],
+        })
+        del pool
+
+    base = results[0]["throughput_x_realtime"] / results[0]["replicas"]
+    print(f"模型: {args.model}  线程总数: {args.total_threads}  窗口: {len(windows)} x {args.window_seconds}s")
+    print(f"{'K':>3} {'线程/副本':>8} {'并发流':>6} {'耗时(s)':>9} {'吞吐(x实时)':>12} {'加速比':>7} {'效率':>6}")
+    for r in results:
+        speedup = r["throughput_x_realtime"] / results[0]["throughput_x_realtime"]
+        r["speedup"] = round(speedup, 3)
+        r["efficiency"] = round(r["throughput_x_realtime"] / (base * r["replicas"]), 3)
+        print(f"{r['replicas']:>3} {r['threads_per_replica']:>8} {r['streams']:>6} {r['elapsed_seconds']:>9.2f} "
+              f"{r['throughput_x_realtime']:>12.2f} {speedup:>7.2f} {r['efficiency']:>6.2f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"model": args.model, "total_threads": args.total_threads, "results": results},
+                      f, ensure_ascii=False, indent=2)
+        print(f"结果已写入: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+"""
+实时转写基准：实时率、采集到出字延迟、CPU 时间和内存峰值随模型和参数的变化
+
+把 WAV 文件按实时或加速的速度回放给 TranscriptionService：模拟的输入流代替 sounddevice，
+按 BLOCK_SIZE 分块在后台线程中调用 audio_callback，与本地设备采集走同一条路径（不需要声卡）。
+对每个模型 × 计算精度启动一个独立进程（模型内存和内存峰值互不影响），在进程内依次测量
+每个 BLOCK_SIZE × BUFFER_SECONDS 组合。每个组合输出：
+  - 实时率：解码阶段总耗时 / 音频时长（越小越快，超过 1 表示跟不上实时）
+  - 采集到出字延迟：窗口最后一个样本被回调送入到该窗口的转写结果推送之间的时间，p50/p95/p99
+  - CPU 时间（进程所有线程）和每秒音频的 CPU 时间
+  - 内存峰值（进程的最大 RSS，包含模型，同一进程内的各组合共用）
+结果写入 JSON，--baseline 指定上一次的结果文件时逐项对比并标出退化的组合。
+
+用法（在仓库根目录）:
+    python -m benchmarks.bench_realtime --wav meeting.wav
+    python -m benchmarks.bench_realtime --wav a.wav b.wav --models tiny,small --block-sizes 2000,4000 \\
+        --buffer-seconds 3,5 --compute-types int8,float32 --speed 4 --json realtime.json
+    python -m benchmarks.bench_realtime --wav meeting.wav --models tiny --json new.json --baseline realtime.json
+"""
+import argparse
+import json
+import multiprocessing
+import resource
+import sys
+import threading
+import time
+import wave
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from app.config import SAMPLE_RATE, AVAILABLE_MODELS, BLOCK_SIZE, BUFFER_SECONDS
+
+# 与基线对比的指标（越大越差）
+REGRESSION_METRICS = ("real_time_factor", "latency_p95_ms", "cpu_seconds", "peak_rss_mb")
+
+
+def load_wavs(paths):
+    """读取并拼接 WAV 文件"""
+    parts = []
+    for path in paths:
+        with wave.open(path, "rb") as wav:
+            if wav.getframerate() != SAMPLE_RATE or wav.getsampwidth() != 2 or wav.getnchannels() != 1:
+                raise SystemExit(f"仅支持 16kHz 16 位单声道 WAV 文件: {path}")
+            parts.append(np.frombuffer(wav.readframes(wav.getnframes()), dtype="<i2").astype(np.float32) / 32768)
+    return np.concatenate(parts)
+
+
+class ReplayStream:
+    """模拟 sounddevice.InputStream：在后台线程中按 speed 倍速把音频分块交给回调"""
+
+    def __init__(self, audio, callback, blocksize, speed):
+        self.audio = audio
+        self.callback = callback
+        self.blocksize = blocksize
+        self.speed = speed
+        self.delivered = []  # 每个块送入回调的时间
+        self.finished = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+    def _run(self):
+        t0 = time.perf_counter()
+        for start in range(0, len(self.audio), self.blocksize):
+            if self._stop.is_set():
+                break
+            block = self.audio[start:start + self.blocksize]
+            # 一个块在其最后一个样本"录完"之后才交给回调，与声卡的行为一致
+            delay = t0 + (start + len(block)) / SAMPLE_RATE / self.speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            self.delivered.append(time.perf_counter())
+            self.callback(block.reshape(-1, 1), len(block), None, None)
+        self.finished.set()
+
+    def delivered_at(self, position):
+        """第 position 个样本（相对回放开头）送入回调的时间"""
+        index = min(max(position - 1, 0) // self.blocksize, len(self.delivered) - 1)
+        return self.delivered[index]
+
+
+def percentile_ms(values, q):
+    """分位数（毫秒），没有样本时为 None"""
+    return round(float(np.percentile(values, q)) * 1000, 1) if values else None
+
+
+def peak_rss_mb():
+    """本进程的最大 RSS（MB）"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / 2**20 if sys.platform == "darwin" else peak / 1024, 1)  # macOS 为字节，Linux 为 KB
+
+
+def run_combination(transcription, audio_service, audio, block_size, buffer_seconds, options):
+    """在当前进程中回放一次音频，返回该组合的指标"""
+    # BLOCK_SIZE / BUFFER_SECONDS 在转写模块中按模块全局变量读取，新建会话前替换
+    transcription.BLOCK_SIZE = block_size
+    transcription.BUFFER_SECONDS = buffer_seconds
+    service = transcription.TranscriptionService(
+        session_id="benchmark", language=options["language"], endpointing=options["endpointing"]
+    )
+    holder, latencies, window_end = {}, [], {}
+
+    def create_input_stream(**kwargs):
+        holder["stream"] = ReplayStream(audio, kwargs["callback"], kwargs["blocksize"], options["speed"])
+        return holder["stream"]
+
+    decode_window, emit = service._decode_fixed_window, service._emit_transcription
+
+    def timed_decode(window, fallback=False):
+        window_end["position"] = window.start + len(window.samples) - service._stream_origin
+        decode_window(window, fallback)
+
+    def timed_emit(text, confidence, seconds):
+        emit(text, confidence, seconds)
+        latencies.append(time.perf_counter() - holder["stream"].delivered_at(window_end["position"]))
+
+    audio_service.create_input_stream = create_input_stream
+    service._decode_fixed_window, service._emit_transcription = timed_decode, timed_emit
+
+    duration = len(audio) / SAMPLE_RATE
+    cpu0, t0 = time.process_time(), time.perf_counter()
+    service.start()
+    while "stream" not in holder:
+        time.sleep(0.01)
+    holder["stream"].finished.wait()
+    drained = service.drain(timeout=max(60.0, duration))
+    wall = time.perf_counter() - t0
+    cpu = time.process_time() - cpu0
+
+    decode = service.metrics["decode"]
+    return {
+        "block_size": block_size,
+        "buffer_seconds": buffer_seconds,
+        "audio_seconds": round(duration, 3),
+        "wall_seconds": round(wall, 3),
+        "real_time_factor": round(decode.total_seconds / duration, 4),
+        "windows": decode.processed,
+        "dropped_windows": service.decode_queue.dropped,
+        "segments": len(latencies),
+        "latency_p50_ms": percentile_ms(latencies, 50),
+        "latency_p95_ms": percentile_ms(latencies, 95),
+        "latency_p99_ms": percentile_ms(latencies, 99),
+        "cpu_seconds": round(cpu, 3),
+        "cpu_per_audio_second": round(cpu / duration, 4),
+        "peak_rss_mb": peak_rss_mb(),
+        "drained": drained,
+    }
+
+
+def run_model(model, compute_type, wav_paths, combinations, options):
+    """
+    子进程入口：加载一个模型（指定计算精度），依次测量各组合
+
+    在导入转写服务之前修改配置：启动时只加载被测模型，转写记录只保存在内存中。
+    """
+    import app.config as config
+    config.DEFAULT_MODEL = model
+    config.INFERENCE_PROFILES[config.INFERENCE_PROFILE]["compute_type"] = compute_type
+    config.MODEL_CACHE_CONFIG["preload"] = []
+    config.TRANSCRIPT_STORE_CONFIG["path"] = None
+    if options["vad"]:
+        config.VAD_CONFIG["engine"] = options["vad"]
+    from app.services import transcription
+    from app.services.audio import audio_service
+    from app.services.whisper import whisper_service
+
+    audio = load_wavs(wav_paths)
+    language = None if options["language"] == "auto" else options["language"]
+    # 预热：首次推理包含内存分配等一次性开销
+    whisper_service.transcribe(audio[:SAMPLE_RATE * 2], language)
+    results = []
+    for block_size, buffer_seconds in combinations:
+        result = run_combination(transcription, audio_service, audio, block_size, buffer_seconds, options)
+        results.append({"model": model, "compute_type": compute_type, **result})
+    return results
+
+
+def result_key(result):
+    """对比基线时匹配组合的键"""
+    return (result["model"], result["compute_type"], result["block_size"], result["buffer_seconds"])
+
+
+def compare(results, baseline_path, tolerance):
+    """
+    与基线结果逐项对比
+
+    Returns:
+        list: 退化的 (组合键, 指标, 基线值, 本次值)
+    """
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {result_key(r): r for r in json.load(f)["results"]}
+    regressions = []
+    print(f"\n与基线对比: {baseline_path}（容差 {tolerance:.0%}）")
+    for result in results:
+        old = baseline.get(result_key(result))
+        if old is None:
+            continue
+        changes = []
+        for metric in REGRESSION_METRICS:
+            before, after = old.get(metric), result.get(metric)
+            if not before or after is None:
+                continue
+            change = after / before - 1
+            mark = " ↑退化" if change > tolerance else ""
+            changes.append(f"{metric} {before}→{after} ({change:+.1%}){mark}")
+            if change > tolerance:
+                regressions.append((result_key(result), metric, before, after))
+        print(f"  {'/'.join(map(str, result_key(result)))}: " + "；".join(changes))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="实时转写：实时率、采集到出字延迟、CPU 和内存基准")
+    parser.add_argument("--wav", nargs="+", required=True, help="16kHz 16 位单声道 WAV 文件（依次拼接回放）")
+    parser.add_argument("--models", default=",".join(AVAILABLE_MODELS), help="逗号分隔的模型列表")
+    parser.add_argument("--compute-types", default="int8", help="逗号分隔的计算精度列表，如 int8,float32")
+    parser.add_argument("--block-sizes", default=f"{BLOCK_SIZE},4000", help="逗号分隔的 BLOCK_SIZE 列表（样本数）")
+    parser.add_argument("--buffer-seconds", default=f"{BUFFER_SECONDS},5", help="逗号分隔的 BUFFER_SECONDS 列表")
+    parser.add_argument("--speed", type=float, default=1.0, help="回放速度，1 为实时，大于 1 为加速")
+    parser.add_argument("--endpointing", action="store_true", help="按语音边界分段（ENDPOINTING_CONFIG）")
+    parser.add_argument("--vad", default=None, help="VAD 引擎 energy / silero / webrtc，默认取 VAD_CONFIG")
+    parser.add_argument("--language", default="zh")
+    parser.add_argument("--json", default=None, help="结果写入 JSON 文件")
+    parser.add_argument("--baseline", default=None, help="上一次的 JSON 结果，逐项对比")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="对比时允许的相对增幅")
+    args = parser.parse_args()
+    if args.speed <= 0:
+        raise SystemExit("--speed 必须大于 0")
+
+    duration = len(load_wavs(args.wav)) / SAMPLE_RATE
+    combinations = [
+        (int(block), float(buffer))
+        for block in dict.fromkeys(args.block_sizes.split(","))
+        for buffer in dict.fromkeys(args.buffer_seconds.split(","))
+    ]
+    options = {"language": args.language, "speed": args.speed, "endpointing": args.endpointing, "vad": args.vad}
+    print(f"音频: {duration:.1f}s  回放速度: {args.speed}x  组合: {len(combinations)}  "
+          f"预计耗时: 每个模型约 {duration * len(combinations) / args.speed:.0f}s")
+
+    results = []
+    spawn = multiprocessing.get_context("spawn")
+    for model in args.models.split(","):
+        for compute_type in args.compute_types.split(","):
+            print(f"测量 {model} / {compute_type} ...", flush=True)
+            # 每个模型 × 精度使用新进程，内存峰值和模型缓存互不影响
+            with ProcessPoolExecutor(1, mp_context=spawn) as executor:
+                results += executor.submit(run_model, model, compute_type, args.wav, combinations, options).result()
+
+    print(f"\n{'模型':<16} {'精度':<8} {'块':>5} {'窗口(s)':>7} {'实时率':>7} {'p50(ms)':>8} {'p95(ms)':>8} "
+          f"{'p99(ms)':>8} {'CPU(s)':>7} {'RSS(MB)':>8} {'丢弃':>4}")
+    for r in results:
+        print(f"{r['model']:<16} {r['compute_type']:<8} {r['block_size']:>5} {r['buffer_seconds']:>7g} "
+              f"{r['real_time_factor']:>7.3f} {r['latency_p50_ms'] or 0:>8.0f} {r['latency_p95_ms'] or 0:>8.0f} "
+              f"{r['latency_p99_ms'] or 0:>8.0f} {r['cpu_seconds']:>7.1f} {r['peak_rss_mb']:>8.0f} "
+              f"{r['dropped_windows']:>4}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"wav": args.wav, "audio_seconds": duration, "speed": args.speed,
+                       "endpointing": args.endpointing, "vad": args.vad, "language": args.language,
+                       "results": results},
+                      f, ensure_ascii=False, indent=2)
+        print(f"结果已写入: {args.json}")
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        print(f"退化: {len(regressions)} 项" if regressions else "没有超过容差的退化")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+音频累积路径微基准：np.append 累积 vs 预分配环形缓冲区
+
+模拟 listen_loop 的累积与交接过程：每个窗口写入若干个 BLOCK_SIZE 音频块，
+然后将窗口交给预处理。对比两种实现的累积缓冲区重新分配次数、
+tracemalloc 统计的窗口处理峰值分配字节数（不含预分配）以及每窗口耗时。
+
+用法（在仓库根目录）:
+    python -m benchmarks.bench_ring_buffer --windows 200
+"""
+import argparse
+import time
+import tracemalloc
+import numpy as np
+from app.config import SAMPLE_RATE, BLOCK_SIZE, BUFFER_SECONDS, RING_BUFFER_HEADROOM_SECONDS
+from app.core.ring_buffer import AudioRingBuffer
+
+
+def _data_ptr(arr):
+    """返回数组底层数据指针，用于检测重新分配"""
+    return arr.__array_interface__['data'][0]
+
+
+def _reset_trace():
+    """重置 tracemalloc 峰值，返回当前已分配字节数作为基线"""
+    if not tracemalloc.is_tracing():
+        return 0
+    tracemalloc.reset_peak()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def legacy_preprocess(audio_data):
+    """改动前的预处理实现（astype + 归一化 + diff/append）"""
+    audio_data = audio_data.astype(np.float32)
+    max_val = np.max(np.abs(audio_data))
+    if max_val > 0:
+        audio_data = audio_data / max_val
+    filtered = np.append(np.diff(audio_data), 0)
+    return (filtered * 0.5 + audio_data * 0.5).astype(np.float32)
+
+
+def ring_preprocess(audio_data, out):
+    """改动后的预处理实现（与 TranscriptionService.preprocess_audio 一致）"""
+    n = len(audio_data)
+    result = out[:n]
+    max_val = max(float(audio_data.max()), -float(audio_data.min()))
+    scale = 1.0 / max_val if max_val > 0 else 1.0
+    np.multiply(audio_data[1:], 0.5 * scale, out=result[:-1])
+    result[-1] = audio_data[-1] * (0.5 * scale)
+    return result
+
+
+def run_legacy(blocks, blocks_per_window):
+    """改动前：每块 np.append 累积，窗口结束后重建空缓冲区"""
+    reallocs = 0
+    latencies = []
+    buffer = np.empty((0, 1), dtype='float32')
+    baseline = _reset_trace()
+    for start in range(0, len(blocks), blocks_per_window):
+        t0 = time.perf_counter()
+        for block in blocks[start:start + blocks_per_window]:
+            ptr = _data_ptr(buffer)
+            buffer = np.append(buffer, block, axis=0)
+            reallocs += _data_ptr(buffer) != ptr
+        legacy_preprocess(buffer[:, 0])
+        buffer = np.empty((0, 1), dtype='float32')
+        latencies.append(time.perf_counter() - t0)
+    return reallocs, latencies, baseline
+
+
+def run_ring(blocks, blocks_per_window):
+    """改动后：写入预分配环形缓冲区，零拷贝视图交给预处理"""
+    capacity = SAMPLE_RATE * (BUFFER_SECONDS + RING_BUFFER_HEADROOM_SECONDS)
+    ring = AudioRingBuffer(capacity)
+    scratch = np.empty(capacity, dtype=np.float32)
+    base_ptr = _data_ptr(ring._data)
+    latencies = []
+    baseline = _reset_trace()
+    for start in range(0, len(blocks), blocks_per_window):
+        t0 = time.perf_counter()
+        for block in blocks[start:start + blocks_per_window]:
+            ring.write(block)
+        window_len = len(ring)
+        ring_preprocess(ring.peek(window_len), scratch)
+        ring.consume(window_len)
+        latencies.append(time.perf_counter() - t0)
+    reallocs = int(_data_ptr(ring._data) != base_ptr)
+    return reallocs, latencies, baseline
+
+
+def measure(name, runner, blocks, blocks_per_window):
+    """运行一次基准并打印结果"""
+    runner(blocks[:blocks_per_window * 2], blocks_per_window)  # 预热
+    tracemalloc.start()
+    reallocs, _, baseline = runner(blocks, blocks_per_window)
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+    # tracemalloc 会拖慢分配，耗时单独测量
+    _, latencies, _ = runner(blocks, blocks_per_window)
+    lat = np.array(latencies) * 1000
+    windows = len(latencies)
+    print(f"{name:<8} 累积缓冲区重新分配: {reallocs:>6} ({reallocs / windows:.1f}/窗口)  "
+          f"窗口处理峰值分配: {peak / 1024:>8.1f} KiB  "
+          f"每窗口耗时 p50={np.percentile(lat, 50):.3f}ms p99={np.percentile(lat, 99):.3f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="np.append 与环形缓冲区累积路径对比")
+    parser.add_argument("--windows", type=int, default=200, help="模拟的窗口数")
+    parser.add_argument("--window-seconds", type=float, default=BUFFER_SECONDS, help="每个窗口的音频时长")
+    args = parser.parse_args()
+
+    blocks_per_window = max(1, int(args.window_seconds * SAMPLE_RATE / BLOCK_SIZE))
+    rng = np.random.default_rng(0)
+    blocks = [
+        (rng.standard_normal((BLOCK_SIZE, 1)) * 0.1).astype(np.float32)
+        for _ in range(blocks_per_window * args.windows)
+    ]
+    print(f"BLOCK_SIZE={BLOCK_SIZE} 每窗口 {blocks_per_window} 块, 共 {args.windows} 个窗口")
+    measure("before", run_legacy, blocks, blocks_per_window)
+    measure("after", run_ring, blocks, blocks_per_window)
+
+
+if __name__ == "__main__":
+    main()
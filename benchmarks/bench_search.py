@@ -0,0 +1,120 @@
+"""
+转写记录全文检索基准：百万条记录下的查询延迟
+
+在临时目录中生成一个转写记录库（合成的中文句子，词频近似长尾分布），
+先直接写入 segments 表，再打开 TranscriptStore，由其补建全文索引（计入建索引耗时），
+然后对高频词、低频词、多字短语、单字和多词组合分别查询，输出每类查询的 p50/p95 延迟。
+
+用法（在仓库根目录）:
+    python -m benchmarks.bench_search
+    python -m benchmarks.bench_search --segments 1000000 --json search.json
+"""
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+import numpy as np
+from app.config import TRANSCRIPT_STORE_CONFIG
+from app.services.transcript_store import SCHEMA, TranscriptStore
+
+# 合成句子的词表：前面的词出现频率高
+VOCABULARY = (
+    "我们 今天 这个 会议 项目 问题 时间 需要 可以 一下 进度 方案 客户 数据 测试 上线 讨论 确认 预算 风险 "
+    "模型 接口 服务器 延迟 部署 文档 设计 评审 版本 发布 用户 反馈 性能 优化 内存 线程 缓存 索引 日志 监控 "
+    "合同 采购 招聘 培训 季度 目标 指标 复盘 纪要 周报 里程碑 依赖 排期 资源 预案 故障 告警 回滚 灰度 迁移"
+).split()
+
+QUERIES = {
+    "高频词": ["我们", "今天", "会议", "项目"],
+    "低频词": ["回滚", "灰度", "迁移", "告警"],
+    "短语": ["会议纪要", "性能优化", "上线进度", "客户反馈"],
+    "单字": ["们", "滚"],
+    "多词": ["会议 纪要", "客户 预算 风险", "部署 回滚"],
+}
+
+
+def build_database(path, n_segments, seed=0):
+    """直接写入 n_segments 条合成记录（不建全文索引）"""
+    rng = np.random.default_rng(seed)
+    weights = 1.0 / np.arange(1, len(VOCABULARY) + 1)
+    weights /= weights.sum()
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    run_id = conn.execute("INSERT INTO runs (session_id, started_at) VALUES ('bench', ?)", (time.time(),)).lastrowid
+    batch = 10000
+    for begin in range(0, n_segments, batch):
+        count = min(batch, n_segments - begin)
+        lengths = rng.integers(4, 12, count)
+        words = rng.choice(len(VOCABULARY), int(lengths.sum()), p=weights)
+        rows, offset = [], 0
+        for i, length in enumerate(lengths.tolist()):
+            text = "".join(VOCABULARY[w] for w in words[offset:offset + length]) + "。"
+            offset += length
+            seconds = float(begin + i) * 2.0
+            rows.append((run_id, seconds, f"{int(seconds) // 3600:02d}:{int(seconds) % 3600 // 60:02d}:{int(seconds) % 60:02d}",
+                         text, 0.9, time.time()))
+        conn.executemany(
+            "INSERT INTO segments (run_id, seconds, timestamp, text, confidence, created_at) VALUES (?, ?, ?, ?, ?, ?)", rows
+        )
+        conn.commit()
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="转写记录全文检索延迟基准")
+    parser.add_argument("--segments", type=int, default=1000000, help="记录条数")
+    parser.add_argument("--repeat", type=int, default=20, help="每个查询重复次数")
+    parser.add_argument("--limit", type=int, default=20, help="每次查询返回的条数")
+    parser.add_argument("--json", default=None, help="结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        t0 = time.perf_counter()
+        build_database(path, args.segments)
+        generated = time.perf_counter() - t0
+
+        store = TranscriptStore({**TRANSCRIPT_STORE_CONFIG, "path": path})
+        t0 = time.perf_counter()
+        log = store.open("bench")  # 首次打开时补建全文索引
+        indexed = time.perf_counter() - t0
+        if not store.searchable:
+            raise SystemExit("当前 SQLite 不支持 FTS5")
+
+        results = []
+        for kind, queries in QUERIES.items():
+            latencies, hits = [], 0
+            for query in queries:
+                log.search(query, args.limit)  # 预热
+                for _ in range(args.repeat):
+                    t0 = time.perf_counter()
+                    hits += len(log.search(query, args.limit))
+                    latencies.append((time.perf_counter() - t0) * 1000)
+            latencies.sort()
+            results.append({
+                "kind": kind,
+                "queries": queries,
+                "p50_ms": round(statistics.median(latencies), 3),
+                "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 3),
+                "max_ms": round(latencies[-1], 3),
+                "avg_hits": round(hits / len(latencies), 1),
+            })
+        size_mb = sum(os.path.getsize(os.path.join(tmp, f)) for f in os.listdir(tmp)) / 2**20
+
+    print(f"记录: {args.segments}  生成: {generated:.1f}s  建全文索引: {indexed:.1f}s  数据库: {size_mb:.0f}MB")
+    print(f"{'查询类型':<6} {'p50(ms)':>9} {'p95(ms)':>9} {'max(ms)':>9} {'命中/次':>8}")
+    for r in results:
+        print(f"{r['kind']:<6} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['max_ms']:>9.2f} {r['avg_hits']:>8}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"segments": args.segments, "index_seconds": round(indexed, 2), "results": results},
+                      f, ensure_ascii=False, indent=2)
+        print(f"结果已写入: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
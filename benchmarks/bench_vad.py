@@ -0,0 +1,104 @@
+"""
+VAD 引擎基准：每小时音频的 CPU 耗时
+
+把音频按固定窗口（默认 3 秒，与 BUFFER_SECONDS 相同）逐个送入各 VAD 引擎，
+统计进程 CPU 时间并换算为每小时音频的 CPU 秒数，同时输出检测为语音、
+需要送入 Whisper 的音频比例。无法创建的引擎（如未安装 webrtcvad）会跳过。
+
+音频默认取自 --wav 指定的 16kHz 16 位单声道 WAV 文件；未指定时使用合成信号
+（语音状的调制音与静音交替，只用于比较开销，不反映检测准确率）。
+
+用法（在仓库根目录）:
+    python -m benchmarks.bench_vad --wav speech.wav
+    python -m benchmarks.bench_vad --engines energy,silero --seconds 600 --json vad.json
+"""
+import argparse
+import json
+import time
+import wave
+import numpy as np
+from app.config import SAMPLE_RATE, BUFFER_SECONDS, VAD_CONFIG
+from app.services.vad import VAD_ENGINES, EnergyVAD, SileroVAD, WebRTCVAD
+
+
+def load_audio(path, seconds):
+    """读取 WAV 文件（不足时循环），未指定文件时生成交替的调制音与静音"""
+    length = int(seconds * SAMPLE_RATE)
+    if path:
+        with wave.open(path, "rb") as wav:
+            if wav.getframerate() != SAMPLE_RATE or wav.getsampwidth() != 2 or wav.getnchannels() != 1:
+                raise SystemExit("仅支持 16kHz 16 位单声道 WAV 文件")
+            audio = np.frombuffer(wav.readframes(wav.getnframes()), dtype="<i2").astype(np.float32) / 32768
+        return np.tile(audio, length // max(len(audio), 1) + 1)[:length]
+    rng = np.random.default_rng(0)
+    t = np.arange(length) / SAMPLE_RATE
+    voiced = np.sin(2 * np.pi * 0.1 * t) > 0  # 5 秒语音、5 秒静音交替
+    tone = 0.3 * np.sin(2 * np.pi * 180 * t) * (0.6 + 0.4 * np.sin(2 * np.pi * 4 * t))
+    return (tone * voiced + 0.003 * rng.standard_normal(length)).astype(np.float32)
+
+
+def build_engine(name):
+    """按 VAD_CONFIG 创建引擎，依赖缺失时返回 None（不退回 energy 引擎）"""
+    options = {key: VAD_CONFIG[key] for key in ("min_speech_ms", "min_silence_ms", "speech_pad_ms")}
+    try:
+        if name == "silero":
+            return SileroVAD(threshold=VAD_CONFIG["threshold"], **options)
+        if name == "webrtc":
+            return WebRTCVAD(mode=VAD_CONFIG["webrtc_mode"], **options)
+        return EnergyVAD(**options)
+    except ImportError as e:
+        print(f"跳过 {name}: {e}")
+        return None
+
+
+def run_engine(engine, audio, window_len):
+    """逐窗口运行引擎，返回 (CPU 秒数, 墙上时间秒数, 语音样本数)"""
+    speech = 0
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    for start in range(0, len(audio) - window_len + 1, window_len):
+        spans = engine.speech_spans(audio[start:start + window_len])
+        speech += sum(end - begin for begin, end in spans)
+    return time.process_time() - cpu0, time.perf_counter() - wall0, speech
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VAD 引擎 CPU 开销基准")
+    parser.add_argument("--engines", default=",".join(VAD_ENGINES), help="逗号分隔的引擎列表")
+    parser.add_argument("--wav", default=None, help="16kHz 16 位单声道 WAV 文件")
+    parser.add_argument("--seconds", type=float, default=300, help="参与测试的音频时长")
+    parser.add_argument("--window-seconds", type=float, default=BUFFER_SECONDS, help="窗口长度")
+    parser.add_argument("--json", default=None, help="结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    audio = load_audio(args.wav, args.seconds)
+    window_len = int(args.window_seconds * SAMPLE_RATE)
+    audio_seconds = (len(audio) // window_len) * window_len / SAMPLE_RATE
+    results = []
+    for name in args.engines.split(","):
+        engine = build_engine(name.strip())
+        if engine is None:
+            continue
+        run_engine(engine, audio[:window_len], window_len)  # 预热
+        cpu, wall, speech = run_engine(engine, audio, window_len)
+        results.append({
+            "engine": engine.name,
+            "audio_seconds": audio_seconds,
+            "cpu_seconds": round(cpu, 4),
+            "wall_seconds": round(wall, 4),
+            "cpu_seconds_per_audio_hour": round(cpu / audio_seconds * 3600, 3),
+            "speech_ratio": round(speech / SAMPLE_RATE / audio_seconds, 3),
+        })
+
+    print(f"音频: {audio_seconds:.0f}s  窗口: {args.window_seconds}s")
+    print(f"{'引擎':<8} {'CPU(s)':>9} {'CPU秒/音频小时':>15} {'语音占比':>9}")
+    for r in results:
+        print(f"{r['engine']:<8} {r['cpu_seconds']:>9.3f} {r['cpu_seconds_per_audio_hour']:>15.2f} {r['speech_ratio']:>9.1%}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"window_seconds": args.window_seconds, "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"结果已写入: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
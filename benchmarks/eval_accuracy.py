@@ -0,0 +1,216 @@
+"""
+准确率与速度评估：各模型和解码参数组合的字错率（CER）/ 词错率（WER）与实时率，输出帕累托表
+
+读取本地标注语料（JSONL 清单，每行一条：{"audio": "zh/0001.wav", "text": "参考文本", "language": "zh"}，
+audio 为相对清单文件的 16kHz 16 位单声道 WAV 路径），用 app/services/whisper.py 中 decode_options()
+的解码参数（即默认推理配置档下实时转写使用的参数）逐条解码，再按 --beam-sizes / --context 覆盖 beam_size、best_of 和
+condition_on_previous_text 得到其他组合。中文、日文、韩文按字计算 CER，其他语言按词计算 WER，
+均为整个语料的编辑距离之和 / 参考文本长度之和；比较前统一做 NFKC、小写并去掉标点。
+评估的是解码器本身的输出，不经过幻觉过滤和置信度过滤。
+
+每种语言输出一张按实时率排序的表，★ 标出帕累托最优的组合（没有其他组合同时更快且错误率更低），
+可据此为不同部署选择参数。
+
+用法（在仓库根目录）:
+    python -m benchmarks.eval_accuracy --corpus corpus/manifest.jsonl
+    python -m benchmarks.eval_accuracy --corpus corpus/manifest.jsonl --models tiny,small,large-v3-turbo \\
+        --beam-sizes 1,5 --context off,on --compute-types int8,float32 --json accuracy.json
+"""
+import argparse
+import json
+import os
+import re
+import time
+import unicodedata
+import wave
+import numpy as np
+import app.config as config
+
+# 按字计算错误率的语言
+CHARACTER_LANGUAGES = ("zh", "ja", "ko", "yue")
+
+
+def load_corpus(path, languages=None, limit=None):
+    """
+    读取 JSONL 清单和对应的音频
+
+    Args:
+        path: 清单文件路径
+        languages: 只保留这些语言，None 为全部
+        limit: 每种语言最多读取的条数
+
+    Returns:
+        list: [{"audio": 样本, "text": 参考文本, "language": 语言, "path": 路径}, ...]
+    """
+    base = os.path.dirname(os.path.abspath(path))
+    items, counts = [], {}
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            language = entry.get("language", config.DEFAULT_LANGUAGE)
+            if languages and language not in languages:
+                continue
+            if limit and counts.get(language, 0) >= limit:
+                continue
+            audio_path = os.path.join(base, entry["audio"])
+            with wave.open(audio_path, "rb") as wav:
+                if wav.getframerate() != config.SAMPLE_RATE or wav.getsampwidth() != 2 or wav.getnchannels() != 1:
+                    raise SystemExit(f"仅支持 16kHz 16 位单声道 WAV 文件: {audio_path}（第 {line_no} 行）")
+                samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype="<i2").astype(np.float32) / 32768
+            items.append({"audio": samples, "text": entry["text"], "language": language, "path": entry["audio"]})
+            counts[language] = counts.get(language, 0) + 1
+    return items
+
+
+def normalize(text):
+    """NFKC（全角转半角）、小写，标点和符号替换为空格"""
+    text = unicodedata.normalize("NFKC", text).lower()
+    return "".join(" " if unicodedata.category(ch)[0] in "PS" else ch for ch in text)
+
+
+def units(text, language):
+    """比较单位：中日韩按字（忽略空白），其他语言按词"""
+    text = normalize(text)
+    if language in CHARACTER_LANGUAGES:
+        return list(re.sub(r"\s+", "", text))
+    return text.split()
+
+
+def edit_distance(reference, hypothesis):
+    """两个序列的编辑距离（替换、插入、删除代价均为 1）"""
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref in enumerate(reference, 1):
+        current = [i] + [0] * len(hypothesis)
+        for j, hyp in enumerate(hypothesis, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref != hyp))
+        previous = current
+    return previous[-1]
+
+
+def pareto_front(points):
+    """
+    帕累托最优的点
+
+    Args:
+        points: [(实时率, 错误率), ...]
+
+    Returns:
+        list: 每个点是否帕累托最优
+    """
+    return [
+        not any(
+            other[0] <= point[0] and other[1] <= point[1] and other != point
+            for other in points
+        )
+        for point in points
+    ]
+
+
+def evaluate(model, items, options):
+    """
+    用一组解码参数解码整个语料
+
+    Returns:
+        dict: 实时率和各语言的编辑距离、参考长度
+    """
+    decode_seconds, audio_seconds, scores = 0.0, 0.0, {}
+    for item in items:
+        language = item["language"]
+        t0 = time.perf_counter()
+        segments, _ = model.transcribe(item["audio"], language=language, vad_filter=False, **options)
+        hypothesis = " ".join(segment.text.strip() for segment in segments)
+        decode_seconds += time.perf_counter() - t0
+        audio_seconds += len(item["audio"]) / config.SAMPLE_RATE
+        reference = units(item["text"], language)
+        score = scores.setdefault(language, {"errors": 0, "reference_units": 0, "utterances": 0})
+        score["errors"] += edit_distance(reference, units(hypothesis, language))
+        score["reference_units"] += len(reference)
+        score["utterances"] += 1
+    for language, score in scores.items():
+        score["metric"] = "cer" if language in CHARACTER_LANGUAGES else "wer"
+        score["error_rate"] = round(score["errors"] / max(score["reference_units"], 1), 4)
+    return {
+        "audio_seconds": round(audio_seconds, 3),
+        "decode_seconds": round(decode_seconds, 3),
+        "real_time_factor": round(decode_seconds / audio_seconds, 4),
+        "languages": scores,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="准确率（CER/WER）与实时率评估，输出帕累托表")
+    parser.add_argument("--corpus", required=True, help="JSONL 清单：每行 audio（相对路径）、text、language")
+    parser.add_argument("--models", default=",".join(config.AVAILABLE_MODELS), help="逗号分隔的模型列表")
+    parser.add_argument("--compute-types", default=config.INFERENCE_PROFILES[config.INFERENCE_PROFILE]["compute_type"],
+                        help="逗号分隔的计算精度列表，默认取默认推理配置档")
+    parser.add_argument("--beam-sizes", default="1,5", help="逗号分隔的 beam_size 列表（best_of 取相同值）")
+    parser.add_argument("--context", default="config",
+                        help="condition_on_previous_text: config（取配置值）/ off / on，可逗号分隔多个；只影响超过 30 秒的音频")
+    parser.add_argument("--languages", default=None, help="只评估这些语言，如 zh,en")
+    parser.add_argument("--limit", type=int, default=None, help="每种语言最多评估的条数")
+    parser.add_argument("--threads", type=int, default=None, help="推理线程数，默认按 CPU 亲和性取可用核心数")
+    parser.add_argument("--json", default=None, help="结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    models = args.models.split(",")
+    compute_types = args.compute_types.split(",")
+    # 服务启动时只加载第一个被测模型，之后的模型都从同一个缓存获取
+    config.DEFAULT_MODEL = models[0]
+    profile = config.INFERENCE_PROFILES[config.INFERENCE_PROFILE]
+    profile["compute_type"] = compute_types[0]
+    profile["cpu_threads"] = args.threads
+    config.MODEL_CACHE_CONFIG["preload"] = []
+    from app.services.whisper import whisper_service, decode_options
+    threads = whisper_service.pool.cpu_threads
+
+    items = load_corpus(args.corpus, args.languages and args.languages.split(","), args.limit)
+    if not items:
+        raise SystemExit("语料为空")
+    base_options = decode_options()
+    contexts = [
+        base_options["condition_on_previous_text"] if value == "config" else value == "on"
+        for value in args.context.split(",")
+    ]
+    print(f"语料: {len(items)} 条，{sum(len(i['audio']) for i in items) / config.SAMPLE_RATE:.0f}s  "
+          f"语言: {', '.join(sorted({i['language'] for i in items}))}")
+
+    results = []
+    for model_name in models:
+        for compute_type in compute_types:
+            model = whisper_service.cache.acquire(model_name, compute_type, threads)
+            try:
+                model.transcribe(items[0]["audio"][:config.SAMPLE_RATE], language=items[0]["language"])  # 预热
+                for beam in dict.fromkeys(int(x) for x in args.beam_sizes.split(",")):
+                    for context in dict.fromkeys(contexts):
+                        options = dict(base_options, beam_size=beam, best_of=beam, condition_on_previous_text=context)
+                        print(f"评估 {model_name} / {compute_type} / beam={beam} / context={context} ...", flush=True)
+                        result = evaluate(model, items, options)
+                        results.append({"model": model_name, "compute_type": compute_type, "beam_size": beam,
+                                        "condition_on_previous_text": context, **result})
+            finally:
+                whisper_service.cache.release(model_name, compute_type, threads)
+
+    for language in sorted({language for r in results for language in r["languages"]}):
+        rows = sorted((r for r in results if language in r["languages"]), key=lambda r: r["real_time_factor"])
+        front = pareto_front([(r["real_time_factor"], r["languages"][language]["error_rate"]) for r in rows])
+        metric = rows[0]["languages"][language]["metric"].upper()
+        print(f"\n语言: {language}（{metric}）")
+        print(f"{'':2}{'模型':<16} {'精度':<13} {'beam':>4} {'上文':>4} {'实时率':>8} {metric:>8}")
+        for r, optimal in zip(rows, front):
+            score = r["languages"][language]
+            score["pareto"] = optimal
+            print(f"{'★' if optimal else '':2}{r['model']:<16} {r['compute_type']:<13} {r['beam_size']:>4} "
+                  f"{'是' if r['condition_on_previous_text'] else '否':>4} {r['real_time_factor']:>8.3f} "
+                  f"{score['error_rate']:>8.2%}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"corpus": args.corpus, "utterances": len(items), "results": results},
+                      f, ensure_ascii=False, indent=2)
+        print(f"结果已写入: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
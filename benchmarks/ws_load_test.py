@@ -0,0 +1,147 @@
+"""
+WebSocket 广播负载测试
+
+在本进程内启动一个只包含 /ws 端点的 uvicorn 服务（端点逻辑与
+app/api/endpoints/websocket.py 相同，使用同一个 WebSocketBroadcaster），
+由一个模拟转写线程按固定频率调用 publish()，同时连接数百个模拟客户端。
+其中一部分是“慢客户端”，每条消息处理都会延迟，用于验证慢客户端不会拖慢其他客户端。
+
+输出正常客户端的投递延迟分位数、收到的消息数，以及慢客户端的丢弃计数。
+
+用法（在仓库根目录）:
+    python -m benchmarks.ws_load_test --clients 300 --slow-clients 10 --rate 20 --seconds 10
+"""
+import argparse
+import asyncio
+import json
+import threading
+import time
+import numpy as np
+import uvicorn
+import websockets
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from app.services.broadcast import WebSocketBroadcaster, bind_event_loop
+
+
+def build_app(broadcaster):
+    """构建只包含 /ws 端点的测试应用"""
+    app = FastAPI()
+
+    @app.on_event("startup")
+    async def startup():
+        bind_event_loop(asyncio.get_running_loop())
+
+    @app.websocket("/ws")
+    async def websocket_endpoint(websocket: WebSocket):
+        await websocket.accept()
+        try:
+            await websocket.send_json({"event": "status", "data": {"status": "connected"}})
+            await broadcaster.register(websocket)
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            pass
+        finally:
+            await broadcaster.unregister(websocket)
+
+    return app
+
+
+def publisher(broadcaster, rate, seconds, started):
+    """模拟转写线程：按固定频率从普通线程发布事件"""
+    started.wait()
+    interval = 1.0 / rate
+    end = time.time() + seconds
+    seq = 0
+    while time.time() < end:
+        broadcaster.publish("transcription", {"text": "负载测试消息", "seq": seq, "sent_at": time.time()})
+        seq += 1
+        time.sleep(interval)
+    return seq
+
+
+async def client(url, duration, slow_delay, latencies, counts):
+    """模拟客户端：接收消息并记录投递延迟"""
+    received = 0
+    # 慢客户端只缓冲一条消息，其余积压在 TCP 和服务端发送队列中
+    async with websockets.connect(url, max_queue=1 if slow_delay else None) as ws:
+        await ws.recv()  # status
+        end = time.time() + duration
+        while time.time() < end:
+            try:
+                message = await asyncio.wait_for(ws.recv(), timeout=end - time.time())
+            except asyncio.TimeoutError:
+                break
+            data = json.loads(message)["data"]
+            if slow_delay:
+                await asyncio.sleep(slow_delay)
+            else:
+                latencies.append(time.time() - data["sent_at"])
+            received += 1
+    counts.append(received)
+
+
+async def run_clients(args, ready):
+    """连接所有客户端，全部连接后通知发布线程开始"""
+    url = f"ws://127.0.0.1:{args.port}/ws"
+    fast_latencies, fast_counts, slow_counts = [], [], []
+    duration = args.seconds + 2
+    tasks = [
+        asyncio.create_task(client(url, duration, 0, fast_latencies, fast_counts))
+        for _ in range(args.clients - args.slow_clients)
+    ] + [
+        asyncio.create_task(client(url, duration, args.slow_delay, [], slow_counts))
+        for _ in range(args.slow_clients)
+    ]
+    await asyncio.sleep(2)  # 等待所有客户端完成连接
+    ready.set()
+    await asyncio.gather(*tasks)
+    return fast_latencies, fast_counts, slow_counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WebSocket 广播负载测试")
+    parser.add_argument("--clients", type=int, default=300, help="模拟客户端总数")
+    parser.add_argument("--slow-clients", type=int, default=10, help="其中的慢客户端数量")
+    parser.add_argument("--slow-delay", type=float, default=0.5, help="慢客户端每条消息的处理延迟（秒）")
+    parser.add_argument("--rate", type=float, default=20, help="每秒发布的事件数")
+    parser.add_argument("--seconds", type=float, default=10, help="发布持续时间")
+    parser.add_argument("--queue-size", type=int, default=64, help="每个客户端的发送队列容量")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    broadcaster = WebSocketBroadcaster(args.queue_size)
+    config = uvicorn.Config(build_app(broadcaster), host="127.0.0.1", port=args.port,
+                            log_level="warning", ws_max_queue=1024)
+    server = uvicorn.Server(config)
+    server_thread = threading.Thread(target=server.run, daemon=True)
+    server_thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    ready = threading.Event()
+    result = {}
+    pub = threading.Thread(
+        target=lambda: result.update(sent=publisher(broadcaster, args.rate, args.seconds, ready)),
+        daemon=True
+    )
+    pub.start()
+    fast_latencies, fast_counts, slow_counts = asyncio.run(run_clients(args, ready))
+    pub.join()
+    dropped = broadcaster.total_dropped
+    server.should_exit = True
+    server_thread.join(timeout=5)
+
+    lat = np.array(fast_latencies) * 1000 if fast_latencies else np.zeros(1)
+    sent = result.get("sent", 0)
+    print(f"客户端: {args.clients} (慢客户端 {args.slow_clients})  发布事件: {sent}")
+    print(f"正常客户端 平均收到 {np.mean(fast_counts):.1f}/{sent} 条  "
+          f"投递延迟 p50={np.percentile(lat, 50):.2f}ms p95={np.percentile(lat, 95):.2f}ms "
+          f"p99={np.percentile(lat, 99):.2f}ms max={lat.max():.2f}ms")
+    if slow_counts:
+        print(f"慢客户端 平均收到 {np.mean(slow_counts):.1f}/{sent} 条  "
+              f"发送队列累计丢弃 {dropped} 条")
+
+
+if __name__ == "__main__":
+    main()
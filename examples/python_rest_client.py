@@ -25,10 +25,10 @@ def get_latest_transcription():
         print(f"❌ 获取失败: {str(e)}")
         return None
 
-def get_transcriptions_since(timestamp):
-    """获取指定时间后的转写记录"""
+def poll_transcriptions(after):
+    """长轮询获取序号大于 after 的转写记录（没有新记录时服务端最多挂起 25 秒）"""
     try:
-        response = requests.get(f"{API_BASE}/api/transcripts/since/{timestamp}")
+        response = requests.get(f"{API_BASE}/api/transcripts/poll", params={"after": after}, timeout=35)
         return response.json()
     except Exception as e:
         print(f"❌ 获取失败: {str(e)}")
@@ -58,12 +58,12 @@ def poll_mode():
     print("按 Ctrl+C 停止")
     print("=" * 50)
 
-    last_timestamp = "00:00:00"
+    last_id = 0
 
     try:
         while True:
             # 获取新的转写记录
-            result = get_transcriptions_since(last_timestamp)
+            result = poll_transcriptions(last_id)
 
             if result and result['status'] == 'success':
                 count = result.get('count', 0)
@@ -84,9 +84,9 @@ def poll_mode():
                             indicator = "❓"
 
                         print(f"{indicator} [{timestamp}] {text} (置信度: {confidence:.2%})")
-                        last_timestamp = timestamp
-
-            time.sleep(1)  # 每秒轮询一次
+                last_id = result['last_id']
+            else:
+                time.sleep(1)  # 请求失败时稍后重试
 
     except KeyboardInterrupt:
         print("\n\n⏹️ 已停止轮询")
@@ -0,0 +1,99 @@
+"""
+WhisprRT 音频推送客户端示例 (Python)
+将 WAV 文件通过 /ws/audio 推送给服务端，并在同一连接上接收转写结果
+"""
+import argparse
+import asyncio
+import json
+import time
+import wave
+import websockets
+
+CHUNK_SECONDS = 0.1  # 每个二进制帧的音频时长
+
+
+async def send_audio(websocket, wav, speed):
+    """按指定速度发送 WAV 文件中的 PCM 帧，发送完毕后发送 end 消息"""
+    frames_per_chunk = int(wav.getframerate() * CHUNK_SECONDS)
+    started = time.time()
+    sent_seconds = 0.0
+    while True:
+        data = wav.readframes(frames_per_chunk)
+        if not data:
+            break
+        await websocket.send(data)
+        sent_seconds += CHUNK_SECONDS
+        if speed > 0:
+            # 按音频时长控制发送节奏，speed=1 即实时
+            delay = started + sent_seconds / speed - time.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+    await websocket.send(json.dumps({"type": "end"}))
+    print(f"📤 音频发送完毕 ({sent_seconds:.1f} 秒)，等待剩余结果...")
+
+
+async def stream_wav(path, uri, speed, language, streaming):
+    """推送 WAV 文件并打印转写结果"""
+    with wave.open(path, "rb") as wav:
+        if wav.getsampwidth() != 2:
+            print("❌ 仅支持 16 位 PCM WAV 文件")
+            return
+        if wav.getframerate() != 16000:
+            print(f"❌ 仅支持 16kHz 采样率，当前文件为 {wav.getframerate()} Hz")
+            return
+
+        async with websockets.connect(uri) as websocket:
+            config = {
+                "type": "config",
+                "format": "int16",
+                "sample_rate": wav.getframerate(),
+                "channels": wav.getnchannels(),
+                "streaming": streaming
+            }
+            if language:
+                config["language"] = language
+            await websocket.send(json.dumps(config))
+
+            reply = json.loads(await websocket.recv())
+            if reply["event"] != "config":
+                print(f"❌ 服务端拒绝: {reply['data'].get('message')}")
+                return
+            print(f"✅ 已接入会话 {reply['data']['session_id']} (模型: {reply['data']['model']})")
+            print("=" * 50)
+
+            sender = asyncio.create_task(send_audio(websocket, wav, speed))
+            started = time.time()
+            async for message in websocket:
+                data = json.loads(message)
+                event, payload = data["event"], data["data"]
+                if event == "transcription":
+                    print(f"✅ [{payload['timestamp']}] {payload['text']} (置信度: {payload['confidence']:.2%})")
+                elif event == "partial":
+                    print(f"… [{payload['timestamp']}] {payload['text']}")
+                elif event == "error":
+                    print(f"❌ 错误: {payload.get('message', '未知错误')}")
+                elif event == "end":
+                    elapsed = time.time() - started
+                    duration = wav.getnframes() / wav.getframerate()
+                    print("=" * 50)
+                    print(f"🏁 完成: {payload['transcripts']} 条结果，音频 {duration:.1f} 秒，"
+                          f"耗时 {elapsed:.1f} 秒 (实时率 {elapsed / max(duration, 1e-9):.2f})")
+                    break
+            await sender
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="通过 /ws/audio 推送 WAV 文件并接收转写结果")
+    parser.add_argument("wav", help="16kHz 16 位 PCM WAV 文件")
+    parser.add_argument("--uri", default="ws://localhost:8000/ws/audio", help="音频接入端点")
+    parser.add_argument("--speed", type=float, default=1.0, help="发送速度倍数，1 为实时，0 为不限速")
+    parser.add_argument("--language", default=None, help="转写语言，默认使用服务端配置")
+    parser.add_argument("--streaming", action="store_true", help="启用流式转写（推送部分结果）")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(stream_wav(args.wav, args.uri, args.speed, args.language, args.streaming))
+    except ConnectionRefusedError:
+        print("❌ 无法连接到服务器，请确保WhisprRT服务正在运行")
+    except KeyboardInterrupt:
+        print("\n\n👋 已断开连接")